@@ -18,120 +18,3329 @@
 
 
 from __future__ import absolute_import, division, print_function
-from collections import Counter, defaultdict
+from array import array
+from binascii import hexlify
+from bisect import bisect_left, bisect_right
+from collections import (Counter, OrderedDict, defaultdict, deque,
+                         namedtuple)
 from distutils.spawn import find_executable
 from functools import reduce, wraps
-from math import floor
-from shutil import rmtree
-from string import ascii_letters
+from heapq import heappush, heappushpop, merge
+from io import BytesIO
+from math import ceil, floor
+from operator import add
+from shutil import copyfile, move, rmtree
+from string import ascii_letters, ascii_uppercase
 from time import time
 import json
+import mmap
 import os
 import re
 import requests
+import struct
 import subprocess
 import sys
+import tempfile
+import zlib
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    # Python 2 needs the `futures` backport. Without it, searches always run
+    # within the current process.
+    ProcessPoolExecutor = None
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, where files are never reflinked.
+    fcntl = None
+
+try:
+    import sqlite3
+except ImportError:
+    # Python may be built without sqlite, in which case indexes can't be
+    # saved or loaded as SQLite databases.
+    sqlite3 = None
+
+try:
+    import lzma
+except ImportError:
+    # Python 2 needs the `backports.lzma` package. Without it, indexes can't
+    # be saved or loaded with lzma compression.
+    lzma = None
 
 if sys.version_info >= (3, 0):
+    from collections.abc import Mapping, MutableMapping
     from contextlib import ContextDecorator
     import pickle
     unicode = str
     long = int
+    _intern = sys.intern
 else:
+    from __builtin__ import intern as _intern_bytes
+    from collections import Mapping, MutableMapping
     import cPickle as pickle
 
+    def _intern(word):
+        # Python 2's intern only accepts byte strings.
+        try:
+            return _intern_bytes(word)
+        except TypeError:
+            return word
+
     class ContextDecorator(object):
         """
-        A base class or mixin that enables context managers to work as
-        decorators.
+        A base class or mixin that enables context managers to work as
+        decorators.
+
+        Code is from Python's source:
+        https://hg.python.org/cpython/file/3.6/Lib/contextlib.py
+        """
+        def _recreate_cm(self):
+            return self
+
+        def __call__(self, func):
+            @wraps(func)
+            def inner(*args, **kwds):
+                with self._recreate_cm():
+                    return func(*args, **kwds)
+            return inner
+
+
+if hasattr(unicode, "casefold"):
+    def _casefold(word):
+        return word.casefold()
+else:
+    def _casefold(word):
+        return word.lower()
+
+
+class _PrettyDefaultDict(defaultdict):
+    # When printing the output of search_results, normally the defaultdict
+    # type would be shown as well. To print the `search_results` normally,
+    # defining a PrettyDefaultDict type that is printable the same way as a
+    # dict, is easier/faster than json.load(json.dump(x)) etc. and we don't
+    # actually have to deal with encoding either.
+    __repr__ = dict.__repr__
+
+
+class _WordBlock(object):
+    """
+    Holds a word with its starting second and ending second (with respect to
+    an audio file)
+
+    Attributes
+    ----------
+    word : str
+    start : float
+    end : float
+    confidence : float or None
+        The confidence of the speech to text engine in the word, between 0 and
+        1. `None` if it's unknown. It doesn't affect equality.
+    alternatives : ((str, float or None))
+        Other hypotheses of the speech to text engine for the same time slot,
+        along with their confidence. It doesn't affect equality.
+    """
+    __slots__ = ("word", "start", "end", "confidence", "alternatives")
+
+    def __init__(self, word, start, end, confidence=None, alternatives=()):
+        self.word = word
+        self.start = round(start, 2)
+        self.end = round(end, 2)
+        self.confidence = (None if confidence is None else
+                           round(confidence, 4))
+        self.alternatives = tuple(alternatives)
+
+    def __eq__(self, other):
+        if type(other) is not _WordBlock:
+            raise TypeError
+        return (self.word == other.word and
+                self.start == other.start and
+                self.end == other.end)
+
+    def __getitem__(self, i):
+        if type(i) is not int:
+            raise TypeError
+        if i == 0:
+            return self.word
+        elif i == 1:
+            return self.start
+        elif i == 2:
+            return self.end
+        raise IndexError
+
+    def __getstate__(self):
+        return {"word": self.word, "start": self.start, "end": self.end,
+                "confidence": self.confidence,
+                "alternatives": self.alternatives}
+
+    def __setstate__(self, state):
+        # Word blocks that were pickled before having `__slots__` have their
+        # `__dict__` as their state. Those pickled before having confidences
+        # or alternatives don't have them.
+        if isinstance(state, tuple):
+            state = state[-1]
+        for attribute in _WordBlock.__slots__:
+            setattr(self, attribute, state.get(attribute))
+        if self.alternatives is None:
+            self.alternatives = tuple()
+
+    def __repr__(self):
+        return "(\"{}\", {}, {})".format(self.word, self.start, self.end)
+
+
+def _anagram_signature(word):
+    """
+    Parameters
+    ----------
+    word : str
+
+    Returns
+    -------
+    str
+        The letters of `word` in sorted order. Two words are anagrams of each
+        other if and only if they have the same signature.
+    """
+    return ''.join(sorted(word))
+
+
+def _is_subsequence(sub, sup):
+    """
+    Parameters
+    ----------
+    sub : str
+    sup : str
+
+    Returns
+    -------
+    bool
+        `True` if the characters of `sub` appear within `sup` in the same
+        order, not necessarily consecutively.
+    """
+    characters = iter(sup)
+    return all(char in characters for char in sub)
+
+
+def _edit_distance(word, other_word):
+    """
+    Parameters
+    ----------
+    word : str
+    other_word : str
+
+    Returns
+    -------
+    int
+        The Levenshtein distance of `word` and `other_word` i.e. the least
+        number of single character insertions, deletions or substitutions
+        that turn one into the other.
+    """
+    previous_row = list(range(len(other_word) + 1))
+    for i, char in enumerate(word):
+        current_row = [i + 1]
+        for j, other_char in enumerate(other_word):
+            current_row.append(min(previous_row[j + 1] + 1,
+                                   current_row[j] + 1,
+                                   previous_row[j] + (char != other_char)))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+def _phonetic_key(word):
+    """
+    Computes the Metaphone key [1]_ of `word`, so that words that sound alike
+    (e.g. "right" and "write") have the same key.
+
+    Parameters
+    ----------
+    word : str
+
+    Returns
+    -------
+    str
+        Only consists of the consonant sounds of `word` (and its first letter,
+        if it's a vowel). It's empty if `word` is e.g. "why".
+
+    References
+    ----------
+    .. [1] : Lawrence Philips. "Hanging on the Metaphone". Computer Language
+       7(12), 1990.
+    """
+    vowels = ("A", "E", "I", "O", "U")
+    word = ''.join(char for char in word.upper() if char in ascii_uppercase)
+    if word[:2] in ("AE", "GN", "KN", "PN", "WR"):
+        word = word[1:]
+    elif word[:1] == "X":
+        word = "S" + word[1:]
+    elif word[:2] == "WH":
+        word = "W" + word[2:]
+    key = list()
+    for i, char in enumerate(word):
+        if i > 0 and char == word[i - 1] and char != "C":
+            continue
+        previous_char = word[i - 1] if i > 0 else None
+        next_char = word[i + 1] if i + 1 < len(word) else None
+        next_chars = word[i + 1:i + 3]
+        if char in vowels:
+            if i == 0:
+                key.append(char)
+        elif char == "B":
+            if not (previous_char == "M" and next_char is None):
+                key.append("B")
+        elif char == "C":
+            if next_char == "H" or next_chars == "IA":
+                key.append("K" if previous_char == "S" else "X")
+            elif next_char in ("E", "I", "Y"):
+                if previous_char != "S":
+                    key.append("S")
+            else:
+                key.append("K")
+        elif char == "D":
+            if next_char == "G" and word[i + 2:i + 3] in ("E", "I", "Y"):
+                key.append("J")
+            else:
+                key.append("T")
+        elif char == "G":
+            if next_char == "H" and not (
+                    i + 2 == len(word) or word[i + 2] in vowels):
+                pass
+            elif word[i + 1:] in ("N", "NED"):
+                pass
+            elif next_char in ("E", "I", "Y"):
+                if previous_char != "D":
+                    key.append("J")
+            else:
+                key.append("K")
+        elif char == "H":
+            if previous_char in ("C", "G", "P", "S", "T"):
+                pass
+            elif previous_char in vowels and next_char not in vowels:
+                pass
+            else:
+                key.append("H")
+        elif char == "K":
+            if previous_char != "C":
+                key.append("K")
+        elif char == "P":
+            key.append("F" if next_char == "H" else "P")
+        elif char == "Q":
+            key.append("K")
+        elif char == "S":
+            if next_char == "H" or next_chars in ("IA", "IO"):
+                key.append("X")
+            else:
+                key.append("S")
+        elif char == "T":
+            if next_chars in ("IA", "IO"):
+                key.append("X")
+            elif next_char == "H":
+                key.append("0")
+            elif next_chars != "CH":
+                key.append("T")
+        elif char == "V":
+            key.append("F")
+        elif char in ("W", "Y"):
+            if next_char in vowels:
+                key.append(char)
+        elif char == "X":
+            key.append("KS")
+        elif char == "Z":
+            key.append("S")
+        else:
+            key.append(char)
+    return ''.join(key)
+
+
+def _to_centiseconds(seconds):
+    """
+    Parameters
+    ----------
+    seconds : float
+
+    Returns
+    -------
+    int
+    """
+    return int(round(seconds * 100))
+
+
+def _to_seconds(centiseconds):
+    """
+    Parameters
+    ----------
+    centiseconds : int
+
+    Returns
+    -------
+    float
+    """
+    return centiseconds / 100
+
+
+# Stored in place of the confidence of the words whose confidence is unknown.
+# Being larger than any known confidence, such words are never filtered out by
+# a minimum confidence.
+_UNKNOWN_CONFIDENCE = 0xFFFF
+
+
+def _clamp_confidence(confidence):
+    """
+    Parameters
+    ----------
+    confidence : float or None
+
+    Returns
+    -------
+    float or None
+        `confidence` clamped to [0, 1], since speech to text engines may
+        report values slightly out of it. `None` if it's unknown or NaN.
+    """
+    if confidence is None or confidence != confidence:
+        return None
+    return min(max(confidence, 0.0), 1.0)
+
+
+def _to_ten_thousandths(confidence):
+    """
+    Parameters
+    ----------
+    confidence : float or None
+        It's clamped to [0, 1] (see `_clamp_confidence`), so that it fits
+        within an unsigned short and can't be mistaken for
+        `_UNKNOWN_CONFIDENCE`.
+
+    Returns
+    -------
+    int
+    """
+    confidence = _clamp_confidence(confidence)
+    if confidence is None:
+        return _UNKNOWN_CONFIDENCE
+    return int(round(confidence * 10000))
+
+
+def _to_confidence_threshold(min_confidence):
+    """
+    Parameters
+    ----------
+    min_confidence : float or None
+
+    Returns
+    -------
+    int
+        The ten thousandths below which the confidences are less than
+        `min_confidence`. Unknown confidences are never below it.
+    """
+    if min_confidence is None:
+        # Every confidence, even the unknown ones, is at least -1.
+        return -1
+    if min_confidence > 1:
+        # Every known confidence is less than it.
+        return _UNKNOWN_CONFIDENCE
+    return _to_ten_thousandths(min_confidence)
+
+
+def _to_confidence(ten_thousandths):
+    """
+    Parameters
+    ----------
+    ten_thousandths : int
+
+    Returns
+    -------
+    float or None
+    """
+    if ten_thousandths == _UNKNOWN_CONFIDENCE:
+        return None
+    return ten_thousandths / 10000
+
+
+class _TimestampColumns(object):
+    """
+    Holds the word blocks of an audio file in a columnar manner, i.e. instead
+    of a list of `_WordBlock`s, each word is interned in a term dictionary
+    whose indexes are kept in an integer array, and starting and ending times
+    are kept in integer arrays as centiseconds.
+
+    It behaves like a (read only, except for appending) list of `_WordBlock`s
+    that are created upon access.
+
+    Attributes
+    ----------
+    terms : [str]
+        The term dictionary i.e. the distinct words of the audio file.
+    phonetic_keys : [str]
+        For every term, its phonetic key (see `_phonetic_key`). They're
+        computed upon interning the terms and are saved along with them.
+    term_ids : array.array
+        For every word block, the index of its word within `terms`.
+    starts : array.array
+        For every word block, its starting centisecond.
+    ends : array.array
+        For every word block, its ending centisecond.
+    confidences : array.array
+        For every word block, its confidence in ten thousandths (or
+        `_UNKNOWN_CONFIDENCE`).
+    alternative_positions : array.array
+        For every alternative hypothesis of the word blocks, the position of
+        its word block. It's sorted.
+    alternative_term_ids : array.array
+        For every alternative hypothesis, the index of its word within
+        `terms`.
+    alternative_confidences : array.array
+        For every alternative hypothesis, its confidence in ten thousandths.
+    """
+    __slots__ = ("terms", "phonetic_keys", "term_ids", "starts", "ends",
+                 "confidences", "alternative_positions",
+                 "alternative_term_ids", "alternative_confidences",
+                 "_term_id_of")
+    # The integer columns and their array typecodes. Columns that are loaded
+    # from a binary index may be read only memoryviews of the same typecode.
+    _ARRAY_COLUMNS = (("term_ids", "i"), ("starts", "i"), ("ends", "i"),
+                      ("confidences", "H"), ("alternative_positions", "i"),
+                      ("alternative_term_ids", "i"),
+                      ("alternative_confidences", "H"))
+
+    def __init__(self, word_blocks=()):
+        """
+        Parameters
+        ----------
+        word_blocks : [_WordBlock], optional
+        """
+        self.terms = list()
+        self.phonetic_keys = list()
+        self.term_ids = array("i")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.confidences = array("H")
+        self.alternative_positions = array("i")
+        self.alternative_term_ids = array("i")
+        self.alternative_confidences = array("H")
+        self._term_id_of = dict()
+        self.extend(word_blocks)
+
+    def _get_term_id(self, word):
+        """
+        Interns `word` into the term dictionary if it's not already there.
+
+        Parameters
+        ----------
+        word : str
+
+        Returns
+        -------
+        int
+        """
+        try:
+            return self._term_id_of[word]
+        except KeyError:
+            term_id = len(self.terms)
+            self.terms.append(_intern(word))
+            self.phonetic_keys.append(_phonetic_key(word))
+            self._term_id_of[word] = term_id
+            return term_id
+
+    def append(self, word_block):
+        """
+        Parameters
+        ----------
+        word_block : _WordBlock
+        """
+        if not isinstance(self.term_ids, array):
+            # Memory mapped columns are copied upon the first modification.
+            for column, typecode in self._ARRAY_COLUMNS:
+                setattr(self, column, _as_array(typecode,
+                                                getattr(self, column)))
+        position = len(self.term_ids)
+        self.term_ids.append(self._get_term_id(word_block.word))
+        self.starts.append(_to_centiseconds(word_block.start))
+        self.ends.append(_to_centiseconds(word_block.end))
+        self.confidences.append(_to_ten_thousandths(word_block.confidence))
+        for word, confidence in word_block.alternatives:
+            self.alternative_positions.append(position)
+            self.alternative_term_ids.append(self._get_term_id(word))
+            self.alternative_confidences.append(
+                _to_ten_thousandths(confidence))
+
+    def extend(self, word_blocks):
+        """
+        Parameters
+        ----------
+        word_blocks : [_WordBlock]
+        """
+        for word_block in word_blocks:
+            self.append(word_block)
+
+    def shift(self, offsets):
+        """
+        Shifts the times of the word blocks.
+
+        Parameters
+        ----------
+        offsets : array.array
+            For every word block, the centiseconds to be added to its
+            starting and ending times.
+        """
+        self.starts = array("i", map(add, self.starts, offsets))
+        self.ends = array("i", map(add, self.ends, offsets))
+
+    def get_word(self, i):
+        """
+        Parameters
+        ----------
+        i : int
+
+        Returns
+        -------
+        str
+        """
+        return self.terms[self.term_ids[i]]
+
+    def get_start(self, i):
+        """
+        Parameters
+        ----------
+        i : int
+
+        Returns
+        -------
+        float
+            The starting second of the `i`th word block.
+        """
+        return _to_seconds(self.starts[i])
+
+    def get_end(self, i):
+        """
+        Parameters
+        ----------
+        i : int
+
+        Returns
+        -------
+        float
+            The ending second of the `i`th word block.
+        """
+        return _to_seconds(self.ends[i])
+
+    def get_confidence(self, i):
+        """
+        Parameters
+        ----------
+        i : int
+
+        Returns
+        -------
+        float or None
+            The confidence of the `i`th word block.
+        """
+        return _to_confidence(self.confidences[i])
+
+    def get_alternatives(self, i):
+        """
+        Parameters
+        ----------
+        i : int
+
+        Returns
+        -------
+        [(str, float or None)]
+            The alternative hypotheses of the `i`th word block with their
+            confidence.
+        """
+        if i < 0:
+            i += len(self)
+        return [(self.terms[self.alternative_term_ids[j]],
+                 _to_confidence(self.alternative_confidences[j]))
+                for j in range(
+                    bisect_left(self.alternative_positions, i),
+                    bisect_right(self.alternative_positions, i))]
+
+    def get_mean_confidence(self, lo, hi):
+        """
+        Parameters
+        ----------
+        lo : int
+        hi : int
+
+        Returns
+        -------
+        float or None
+            The mean of the known confidences of the word blocks from
+            position `lo` up to (but excluding) `hi`. `None` if none of them
+            is known.
+        """
+        known_confidences = [
+            confidence for confidence in self.confidences[lo:hi]
+            if confidence != _UNKNOWN_CONFIDENCE]
+        if len(known_confidences) == 0:
+            return None
+        return _to_confidence(
+            sum(known_confidences) // len(known_confidences))
+
+    def get_positions_between(self, start=None, end=None):
+        """
+        Finds the word blocks whose starting second is within the given time
+        range by binary search, which relies on word blocks being sorted by
+        their starting second.
+
+        Parameters
+        ----------
+        start : float, None, optional
+            `None` means from the beginning.
+
+            Default is `None`
+        end : float, None, optional
+            `None` means until the end.
+
+            Default is `None`
+
+        Returns
+        -------
+        (int, int)
+            The positions of the first word block within the time range and of
+            the first word block after it, respectively.
+        """
+        lo = 0
+        hi = len(self)
+        if start is not None:
+            lo = bisect_left(self.starts, _to_centiseconds(start))
+        if end is not None:
+            hi = bisect_right(self.starts, _to_centiseconds(end))
+        return lo, max(lo, hi)
+
+    def __iadd__(self, word_blocks):
+        self.extend(word_blocks)
+        return self
+
+    def __len__(self):
+        return len(self.term_ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return _WordBlock(word=self.get_word(i), start=self.get_start(i),
+                          end=self.get_end(i),
+                          confidence=self.get_confidence(i),
+                          alternatives=self.get_alternatives(i))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other):
+        if isinstance(other, _TimestampColumns):
+            return (self.starts == other.starts and
+                    self.ends == other.ends and
+                    all(self.get_word(i) == other.get_word(i)
+                        for i in range(len(self))))
+        try:
+            return (len(self) == len(other) and
+                    all(x == y for x, y in zip(self, other)))
+        except TypeError:
+            return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __getstate__(self):
+        state = {"terms": self.terms, "phonetic_keys": self.phonetic_keys}
+        for column, typecode in self._ARRAY_COLUMNS:
+            state[column] = _as_array(typecode, getattr(self, column))
+        return state
+
+    def __setstate__(self, state):
+        self.terms = [_intern(term) for term in state["terms"]]
+        # Columns that were saved before having phonetic keys need them to be
+        # computed.
+        self.phonetic_keys = state.get("phonetic_keys")
+        if self.phonetic_keys is None:
+            self.phonetic_keys = [_phonetic_key(term) for term in self.terms]
+        self.term_ids = state["term_ids"]
+        self.starts = state["starts"]
+        self.ends = state["ends"]
+        self.confidences = state.get("confidences")
+        if self.confidences is None:
+            self.confidences = array(
+                "H", [_UNKNOWN_CONFIDENCE]) * len(self.term_ids)
+        self.alternative_positions = state.get(
+            "alternative_positions", array("i"))
+        self.alternative_term_ids = state.get(
+            "alternative_term_ids", array("i"))
+        self.alternative_confidences = state.get(
+            "alternative_confidences", array("H"))
+        self._term_id_of = dict(
+            (term, term_id) for term_id, term in enumerate(self.terms))
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+def _as_array(typecode, values):
+    """
+    Parameters
+    ----------
+    typecode : str
+    values : array.array or memoryview
+        Of the same typecode.
+
+    Returns
+    -------
+    array.array
+        `values` itself, if it's already an array.
+    """
+    if isinstance(values, array):
+        return values
+    return array(typecode, values)
+
+
+# Indexed audio is saved in a versioned binary format whose sections can be
+# read straight from a memory map. All numbers are little endian.
+#
+# header
+#     magic (4 bytes), version (uint16), reserved (uint16), number of audio
+#     files (uint32)
+# directory
+#     For every audio file, the length of its basename (uint16), its utf-8
+#     encoded basename, the number of its word blocks, terms and alternatives
+#     (3 * uint32) and the offsets of its sections within the file (uint64
+#     per section)
+# sections
+#     For every audio file, the sections named in `_BINARY_INDEX_SECTIONS`,
+#     each starting at an 8 byte boundary. The term dictionary and the
+#     phonetic keys are kept as a concatenation of utf-8 encoded strings and
+#     the offsets at which each of them starts (plus the total length). The
+#     rest are the columns of `_TimestampColumns`.
+_BINARY_INDEX_MAGIC = b"SAIX"
+_BINARY_INDEX_VERSION = 1
+_BINARY_INDEX_HEADER = struct.Struct("<4sHHI")
+_BINARY_INDEX_NAME_LENGTH = struct.Struct("<H")
+_BINARY_INDEX_COUNTS = struct.Struct("<III")
+_BINARY_INDEX_SECTIONS = (
+    ("term_offsets", "I"), ("terms", "B"),
+    ("phonetic_key_offsets", "I"), ("phonetic_keys", "B")) + (
+        _TimestampColumns._ARRAY_COLUMNS)
+_BINARY_INDEX_OFFSETS = struct.Struct("<" + "Q" * len(_BINARY_INDEX_SECTIONS))
+# Sections can be used without being copied only if they're already in the
+# byte order of the machine and memoryviews can be cast to their typecodes.
+_BINARY_INDEX_ZERO_COPY = (sys.byteorder == "little" and
+                           hasattr(memoryview, "cast"))
+
+
+def _encode_strings(strings):
+    """
+    Parameters
+    ----------
+    strings : [str]
+
+    Returns
+    -------
+    (array.array, bytes)
+        The offsets of the utf-8 encoded strings (plus the total length) and
+        their concatenation.
+    """
+    encoded_strings = [string.encode("utf-8") for string in strings]
+    offsets = array("I", [0])
+    for encoded_string in encoded_strings:
+        offsets.append(offsets[-1] + len(encoded_string))
+    return offsets, b"".join(encoded_strings)
+
+
+def _to_little_endian_bytes(values):
+    """
+    Parameters
+    ----------
+    values : array.array
+
+    Returns
+    -------
+    bytes
+    """
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    if hasattr(values, "tobytes"):
+        return values.tobytes()
+    return values.tostring()
+
+
+def _read_section(buffer, offset, typecode, length):
+    """
+    Parameters
+    ----------
+    buffer : mmap.mmap
+    offset : int
+    typecode : str
+    length : int
+        The number of items of the section.
+
+    Returns
+    -------
+    memoryview or array.array
+        A view of the mapped section, if possible. Otherwise, a copy of it.
+    """
+    size = length * array(typecode).itemsize
+    if _BINARY_INDEX_ZERO_COPY and length > 0:
+        return memoryview(buffer)[offset:offset + size].cast(typecode)
+    values = array(typecode)
+    if hasattr(values, "frombytes"):
+        values.frombytes(buffer[offset:offset + size])
+    else:
+        values.fromstring(buffer[offset:offset + size])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _save_binary_index(timestamps, indexed_audio_file_abs_path):
+    """
+    Writes `timestamps` in the binary format described above
+    `_BINARY_INDEX_MAGIC`.
+
+    Parameters
+    ----------
+    timestamps : {str: _TimestampColumns}
+        Lists of `_WordBlock`s are accepted as values as well.
+    indexed_audio_file_abs_path : str
+    """
+    # The file may be memory mapped by the timestamps that are written (if
+    # they were loaded from it), which must not be truncated underneath them.
+    # So it's replaced once the new one is completely written.
+    with open(indexed_audio_file_abs_path + ".tmp", "wb") as f:
+        _write_binary_index(timestamps, f)
+    _replace_file(indexed_audio_file_abs_path + ".tmp",
+                  indexed_audio_file_abs_path)
+
+
+def _binary_index_sections(columns):
+    """
+    Parameters
+    ----------
+    columns : _TimestampColumns
+
+    Returns
+    -------
+    [bytes]
+        The sections of `columns`, in the order of `_BINARY_INDEX_SECTIONS`.
+    """
+    term_offsets, terms = _encode_strings(columns.terms)
+    phonetic_key_offsets, phonetic_keys = _encode_strings(
+        columns.phonetic_keys)
+    return [_to_little_endian_bytes(term_offsets), terms,
+            _to_little_endian_bytes(phonetic_key_offsets),
+            phonetic_keys] + [
+        _to_little_endian_bytes(_as_array(typecode, getattr(columns, column)))
+        for column, typecode in _TimestampColumns._ARRAY_COLUMNS]
+
+
+def _binary_index_section_lengths(columns):
+    """
+    Parameters
+    ----------
+    columns : _TimestampColumns
+
+    Returns
+    -------
+    [int]
+        The lengths of the sections of `columns` (see
+        `_binary_index_sections`), without building them.
+    """
+    lengths = list()
+    for strings in (columns.terms, columns.phonetic_keys):
+        lengths.append((len(strings) + 1) * array("I").itemsize)
+        lengths.append(sum(len(string.encode("utf-8"))
+                           for string in strings))
+    return lengths + [
+        len(getattr(columns, column)) * array(typecode).itemsize
+        for column, typecode in _TimestampColumns._ARRAY_COLUMNS]
+
+
+def _write_binary_index(timestamps, f):
+    """
+    Writes `timestamps` in the binary format described above
+    `_BINARY_INDEX_MAGIC` at the current position of `f`. The offsets within
+    the written index are relative to that position.
+
+    The timestamps are accessed twice, once to lay out the directory and
+    once to write the sections, so that only the sections of a single audio
+    file are built at a time.
+
+    Parameters
+    ----------
+    timestamps : {str: _TimestampColumns}
+        Lists of `_WordBlock`s are accepted as values as well.
+    f : file
+        Opened in binary mode.
+    """
+    def get_columns(audio_basename):
+        columns = timestamps[audio_basename]
+        if not isinstance(columns, _TimestampColumns):
+            columns = _TimestampColumns(columns)
+        return columns
+
+    audio_basenames = list(timestamps)
+    entries = list()
+    for audio_basename in audio_basenames:
+        columns = get_columns(audio_basename)
+        entries.append((
+            audio_basename.encode("utf-8"),
+            _BINARY_INDEX_COUNTS.pack(len(columns), len(columns.terms),
+                                      len(columns.alternative_positions)),
+            _binary_index_section_lengths(columns)))
+    offset = _BINARY_INDEX_HEADER.size + sum(
+        _BINARY_INDEX_NAME_LENGTH.size + len(encoded_basename) +
+        _BINARY_INDEX_COUNTS.size + _BINARY_INDEX_OFFSETS.size
+        for encoded_basename, _, _ in entries)
+    section_offsets = list()
+    for _, _, lengths in entries:
+        section_offsets.append(list())
+        for length in lengths:
+            offset += -offset % 8
+            section_offsets[-1].append(offset)
+            offset += length
+    base = f.tell()
+    f.write(_BINARY_INDEX_HEADER.pack(
+        _BINARY_INDEX_MAGIC, _BINARY_INDEX_VERSION, 0, len(entries)))
+    for (encoded_basename, counts, _), offsets in zip(entries,
+                                                      section_offsets):
+        f.write(_BINARY_INDEX_NAME_LENGTH.pack(len(encoded_basename)))
+        f.write(encoded_basename)
+        f.write(counts)
+        f.write(_BINARY_INDEX_OFFSETS.pack(*offsets))
+    for audio_basename, offsets in zip(audio_basenames, section_offsets):
+        for section, section_offset in zip(
+                _binary_index_sections(get_columns(audio_basename)),
+                offsets):
+            f.write(b"\0" * (base + section_offset - f.tell()))
+            f.write(section)
+
+
+def _is_binary_index(indexed_audio_file_abs_path,
+                     magic=_BINARY_INDEX_MAGIC):
+    """
+    Parameters
+    ----------
+    indexed_audio_file_abs_path : str
+    magic : bytes, optional
+        Default is `_BINARY_INDEX_MAGIC`.
+
+    Returns
+    -------
+    bool
+        `True` if the file is in the binary format (whose magic is `magic`)
+        rather than a pickle.
+    """
+    with open(indexed_audio_file_abs_path, "rb") as f:
+        return f.read(len(magic)) == magic
+
+
+def _load_binary_index(indexed_audio_file_abs_path):
+    """
+    Memory maps a file written by `_save_binary_index`. Only the directory
+    and the term dictionaries are read upon loading. The rest of the sections
+    are read by the operating system as they're accessed.
+
+    Parameters
+    ----------
+    indexed_audio_file_abs_path : str
+
+    Returns
+    -------
+    {str: _TimestampColumns}
+
+    Raises
+    ------
+    ValueError
+        If the file is not in the binary format or its version is not
+        supported.
+    """
+    with open(indexed_audio_file_abs_path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _read_binary_index(buffer)
+
+
+def _read_binary_index(buffer, base=0):
+    """
+    Parameters
+    ----------
+    buffer : mmap.mmap
+    base : int, optional
+        The position of the index within `buffer`, which must be a multiple
+        of 8.
+
+        Default is 0.
+
+    Returns
+    -------
+    {str: _TimestampColumns}
+        The columns are views of `buffer`.
+
+    Raises
+    ------
+    ValueError
+        If the index is not in the binary format or its version is not
+        supported.
+    """
+    magic, version, _, file_count = _BINARY_INDEX_HEADER.unpack_from(
+        buffer, base)
+    if magic != _BINARY_INDEX_MAGIC:
+        raise ValueError("Not a binary indexed audio file.")
+    if version != _BINARY_INDEX_VERSION:
+        raise ValueError(
+            "Unsupported indexed audio version: {}".format(version))
+    offset = base + _BINARY_INDEX_HEADER.size
+    timestamps = _PrettyDefaultDict(_TimestampColumns)
+    for _ in range(file_count):
+        name_length, = _BINARY_INDEX_NAME_LENGTH.unpack_from(buffer, offset)
+        offset += _BINARY_INDEX_NAME_LENGTH.size
+        audio_basename = buffer[offset:offset + name_length].decode("utf-8")
+        offset += name_length
+        word_count, term_count, alternative_count = (
+            _BINARY_INDEX_COUNTS.unpack_from(buffer, offset))
+        offset += _BINARY_INDEX_COUNTS.size
+        section_offsets = dict(zip(
+            [section for section, _ in _BINARY_INDEX_SECTIONS],
+            [base + section_offset for section_offset in
+             _BINARY_INDEX_OFFSETS.unpack_from(buffer, offset)]))
+        offset += _BINARY_INDEX_OFFSETS.size
+        state = dict()
+        for strings in ("terms", "phonetic_keys"):
+            string_offsets = _read_section(
+                buffer, section_offsets[strings[:-1] + "_offsets"], "I",
+                term_count + 1)
+            start = section_offsets[strings]
+            state[strings] = [
+                buffer[start + string_offsets[i]:
+                       start + string_offsets[i + 1]].decode("utf-8")
+                for i in range(term_count)]
+        for column, typecode in _TimestampColumns._ARRAY_COLUMNS:
+            state[column] = _read_section(
+                buffer, section_offsets[column], typecode,
+                alternative_count if column.startswith("alternative_") else
+                word_count)
+        columns = _TimestampColumns.__new__(_TimestampColumns)
+        columns.__setstate__(state)
+        timestamps[audio_basename] = columns
+    return timestamps
+
+
+# The packed format trades memory mapping for size. It's meant for storing and
+# transferring indexes, rather than for being searched in place.
+#
+# header
+#     magic (4 bytes), version (uint16), framing (uint16) i.e. the value of
+#     one of `_PACKED_INDEX_FRAMINGS`
+# body
+#     Compressed as a whole, according to the framing. It's a sequence of
+#     unsigned LEB128 varints, where strings are utf-8 encoded and prefixed by
+#     their length. It starts with the term dictionary that's shared by all
+#     the audio files i.e. the number of terms followed by every term and its
+#     phonetic key. Then the number of audio files and, for every audio file,
+#     its basename, the number of its terms followed by their indexes within
+#     the shared dictionary, the number of its word blocks followed by its
+#     columns (term ids, the difference of every start from the previous one,
+#     the difference of every end from its start and the confidences plus
+#     one, or zero if unknown) and the number of its alternatives followed by
+#     their columns (the difference of every position from the previous one,
+#     term ids and confidences). Differences are zigzag encoded, since they
+#     may be negative.
+_PACKED_INDEX_MAGIC = b"SAIP"
+_PACKED_INDEX_VERSION = 1
+_PACKED_INDEX_HEADER = struct.Struct("<4sHH")
+_PACKED_INDEX_FRAMINGS = {"varint": 0, "zlib": 1, "lzma": 2}
+
+
+def _encode_varints(values, encoded):
+    """
+    Appends the unsigned LEB128 encoding of `values` to `encoded`.
+
+    Parameters
+    ----------
+    values : iterable of int
+        Non-negative.
+    encoded : bytearray
+    """
+    for value in values:
+        while value > 0x7F:
+            encoded.append((value & 0x7F) | 0x80)
+            value >>= 7
+        encoded.append(value)
+
+
+def _decode_varints(encoded, offset, count):
+    """
+    Parameters
+    ----------
+    encoded : bytearray
+    offset : int
+    count : int
+        The number of varints to be decoded.
+
+    Returns
+    -------
+    ([int], int)
+        The decoded values and the offset after them.
+    """
+    values = list()
+    for _ in range(count):
+        value = shift = 0
+        while True:
+            byte = encoded[offset]
+            offset += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        values.append(value)
+    return values, offset
+
+
+def _zigzag(value):
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _deltas(values):
+    """
+    Parameters
+    ----------
+    values : iterable of int
+
+    Returns
+    -------
+    [int]
+        The zigzag encoded difference of every value from the previous one.
+    """
+    previous = 0
+    deltas = list()
+    for value in values:
+        deltas.append(_zigzag(value - previous))
+        previous = value
+    return deltas
+
+
+def _undeltas(deltas):
+    """
+    Parameters
+    ----------
+    deltas : [int]
+        The output of `_deltas`.
+
+    Returns
+    -------
+    [int]
+    """
+    value = 0
+    values = list()
+    for delta in deltas:
+        value += _unzigzag(delta)
+        values.append(value)
+    return values
+
+
+def _encode_packed_strings(strings, encoded):
+    """
+    Parameters
+    ----------
+    strings : iterable of str
+    encoded : bytearray
+    """
+    for string in strings:
+        encoded_string = string.encode("utf-8")
+        _encode_varints([len(encoded_string)], encoded)
+        encoded.extend(encoded_string)
+
+
+def _decode_packed_strings(encoded, offset, count):
+    """
+    Parameters
+    ----------
+    encoded : bytearray
+    offset : int
+    count : int
+
+    Returns
+    -------
+    ([str], int)
+        The decoded strings and the offset after them.
+    """
+    strings = list()
+    for _ in range(count):
+        (length,), offset = _decode_varints(encoded, offset, 1)
+        strings.append(encoded[offset:offset + length].decode("utf-8"))
+        offset += length
+    return strings, offset
+
+
+def _check_packed_framing(compression):
+    """
+    Raises
+    ------
+    ValueError
+        If `compression` is not supported (in this environment).
+    """
+    if compression not in _PACKED_INDEX_FRAMINGS:
+        raise ValueError("Unsupported compression: {}".format(compression))
+    if compression == "lzma" and lzma is None:
+        raise ValueError("lzma compression needs the lzma module.")
+
+
+def _save_packed_index(timestamps, indexed_audio_file_abs_path,
+                       compression="zlib"):
+    """
+    Writes `timestamps` in the packed format described above
+    `_PACKED_INDEX_MAGIC`.
+
+    Parameters
+    ----------
+    timestamps : {str: _TimestampColumns}
+        Lists of `_WordBlock`s are accepted as values as well.
+    indexed_audio_file_abs_path : str
+    compression : {"varint", "zlib", "lzma"}, optional
+        "varint" leaves the body uncompressed.
+
+        Default is "zlib".
+
+    Raises
+    ------
+    ValueError
+        If `compression` is not supported.
+    """
+    _check_packed_framing(compression)
+    term_index_of = dict()
+    terms = list()
+    phonetic_keys = list()
+    audio_files = list()
+    for audio_basename in timestamps:
+        columns = timestamps[audio_basename]
+        if not isinstance(columns, _TimestampColumns):
+            columns = _TimestampColumns(columns)
+        term_indexes = list()
+        for term, phonetic_key in zip(columns.terms, columns.phonetic_keys):
+            if term not in term_index_of:
+                term_index_of[term] = len(terms)
+                terms.append(term)
+                phonetic_keys.append(phonetic_key)
+            term_indexes.append(term_index_of[term])
+        audio_files.append((audio_basename, columns, term_indexes))
+    body = bytearray()
+    _encode_varints([len(terms)], body)
+    for term, phonetic_key in zip(terms, phonetic_keys):
+        _encode_packed_strings((term, phonetic_key), body)
+    _encode_varints([len(audio_files)], body)
+    for audio_basename, columns, term_indexes in audio_files:
+        _encode_packed_strings([audio_basename], body)
+        _encode_varints([len(term_indexes)], body)
+        _encode_varints(term_indexes, body)
+        _encode_varints([len(columns)], body)
+        _encode_varints(columns.term_ids, body)
+        _encode_varints(_deltas(columns.starts), body)
+        _encode_varints((_zigzag(end - start) for start, end in
+                         zip(columns.starts, columns.ends)), body)
+        _encode_varints((0 if confidence == _UNKNOWN_CONFIDENCE else
+                         confidence + 1
+                         for confidence in columns.confidences), body)
+        _encode_varints([len(columns.alternative_positions)], body)
+        _encode_varints(_deltas(columns.alternative_positions), body)
+        _encode_varints(columns.alternative_term_ids, body)
+        _encode_varints(columns.alternative_confidences, body)
+    body = bytes(body)
+    if compression == "zlib":
+        body = zlib.compress(body, 9)
+    elif compression == "lzma":
+        body = lzma.compress(body)
+    with open(indexed_audio_file_abs_path, "wb") as f:
+        f.write(_PACKED_INDEX_HEADER.pack(
+            _PACKED_INDEX_MAGIC, _PACKED_INDEX_VERSION,
+            _PACKED_INDEX_FRAMINGS[compression]))
+        f.write(body)
+
+
+def _load_packed_index(indexed_audio_file_abs_path):
+    """
+    Reads a file written by `_save_packed_index` into memory.
+
+    Parameters
+    ----------
+    indexed_audio_file_abs_path : str
+
+    Returns
+    -------
+    {str: _TimestampColumns}
+
+    Raises
+    ------
+    ValueError
+        If the file is not in the packed format, its version is not
+        supported or its compression is not supported (in this environment).
+    """
+    with open(indexed_audio_file_abs_path, "rb") as f:
+        header = f.read(_PACKED_INDEX_HEADER.size)
+        body = f.read()
+    magic, version, framing = _PACKED_INDEX_HEADER.unpack(header)
+    if magic != _PACKED_INDEX_MAGIC:
+        raise ValueError("Not a packed indexed audio file.")
+    if version != _PACKED_INDEX_VERSION:
+        raise ValueError(
+            "Unsupported indexed audio version: {}".format(version))
+    compression = dict((value, key) for key, value in
+                       _PACKED_INDEX_FRAMINGS.items()).get(framing)
+    _check_packed_framing(compression)
+    if compression == "zlib":
+        body = zlib.decompress(body)
+    elif compression == "lzma":
+        body = lzma.decompress(body)
+    body = bytearray(body)
+    (term_count,), offset = _decode_varints(body, 0, 1)
+    strings, offset = _decode_packed_strings(body, offset, 2 * term_count)
+    terms, phonetic_keys = strings[0::2], strings[1::2]
+    (file_count,), offset = _decode_varints(body, offset, 1)
+    timestamps = _PrettyDefaultDict(_TimestampColumns)
+    for _ in range(file_count):
+        (audio_basename,), offset = _decode_packed_strings(body, offset, 1)
+        (local_term_count,), offset = _decode_varints(body, offset, 1)
+        term_indexes, offset = _decode_varints(body, offset,
+                                               local_term_count)
+        (word_count,), offset = _decode_varints(body, offset, 1)
+        term_ids, offset = _decode_varints(body, offset, word_count)
+        start_deltas, offset = _decode_varints(body, offset, word_count)
+        durations, offset = _decode_varints(body, offset, word_count)
+        confidences, offset = _decode_varints(body, offset, word_count)
+        (alternative_count,), offset = _decode_varints(body, offset, 1)
+        position_deltas, offset = _decode_varints(body, offset,
+                                                  alternative_count)
+        alternative_term_ids, offset = _decode_varints(body, offset,
+                                                       alternative_count)
+        alternative_confidences, offset = _decode_varints(
+            body, offset, alternative_count)
+        starts = _undeltas(start_deltas)
+        columns = _TimestampColumns.__new__(_TimestampColumns)
+        columns.__setstate__({
+            "terms": [terms[term_index] for term_index in term_indexes],
+            "phonetic_keys": [phonetic_keys[term_index]
+                              for term_index in term_indexes],
+            "term_ids": array("i", term_ids),
+            "starts": array("i", starts),
+            "ends": array("i", [start + _unzigzag(duration) for
+                                start, duration in zip(starts, durations)]),
+            "confidences": array("H", [
+                confidence - 1 if confidence else _UNKNOWN_CONFIDENCE
+                for confidence in confidences]),
+            "alternative_positions": array("i", _undeltas(position_deltas)),
+            "alternative_term_ids": array("i", alternative_term_ids),
+            "alternative_confidences": array("H", alternative_confidences)})
+        timestamps[audio_basename] = columns
+    return timestamps
+
+
+# A sharded index is a directory that contains a manifest and shards. Every
+# shard is a file in the binary format above which holds the timestamps of a
+# group of audio files. The manifest is a json object of the form
+# {"version": 1, "shards": [{"path": str, "size": int,
+#                            "audio_basenames": [str]}]}
+# where `path` is relative to the directory and `size` is the size of the
+# shard in bytes.
+_SHARDED_INDEX_MANIFEST = "manifest.json"
+_SHARDED_INDEX_VERSION = 1
+_SHARD_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def _save_sharded_index(timestamps, indexed_audio_dir_abs_path,
+                        files_per_shard):
+    """
+    Writes `timestamps` as a sharded index (see `_SHARDED_INDEX_MANIFEST`).
+
+    Parameters
+    ----------
+    timestamps : {str: _TimestampColumns}
+    indexed_audio_dir_abs_path : str
+        The directory is created if it doesn't exist.
+    files_per_shard : int
+        The number of audio files whose timestamps are kept in a shard.
+    """
+    if files_per_shard < 1:
+        raise ValueError("files_per_shard must be at least 1.")
+    if not os.path.isdir(indexed_audio_dir_abs_path):
+        os.makedirs(indexed_audio_dir_abs_path)
+    audio_basenames = list(timestamps.keys())
+    shards = list()
+    # The timestamps may be a sharded index of the same directory, whose
+    # shards are read as they're written. So none of them is replaced until
+    # all of the new ones are completely written.
+    for shard_number, first in enumerate(
+            range(0, len(audio_basenames), files_per_shard)):
+        shard_basenames = audio_basenames[first:first + files_per_shard]
+        shard_path = "{:05d}.shard".format(shard_number)
+        shard_abs_path = os.path.join(indexed_audio_dir_abs_path, shard_path)
+        with open(shard_abs_path + ".tmp", "wb") as f:
+            _write_binary_index(
+                OrderedDict((audio_basename, timestamps[audio_basename])
+                            for audio_basename in shard_basenames), f)
+        shards.append({"path": shard_path,
+                       "size": os.path.getsize(shard_abs_path + ".tmp"),
+                       "audio_basenames": shard_basenames})
+    for shard in shards:
+        shard_abs_path = os.path.join(indexed_audio_dir_abs_path,
+                                      shard["path"])
+        _replace_file(shard_abs_path + ".tmp", shard_abs_path)
+    # The manifest is written last, so that an interrupted save leaves the
+    # previous manifest (if any) intact instead of a half written one.
+    manifest_abs_path = os.path.join(indexed_audio_dir_abs_path,
+                                     _SHARDED_INDEX_MANIFEST)
+    with open(manifest_abs_path + ".tmp", "w") as f:
+        json.dump({"version": _SHARDED_INDEX_VERSION, "shards": shards}, f)
+    _replace_file(manifest_abs_path + ".tmp", manifest_abs_path)
+    shard_paths = set(shard["path"] for shard in shards)
+    for path in os.listdir(indexed_audio_dir_abs_path):
+        if re.match(r"^\d{5}\.shard$", path) and path not in shard_paths:
+            _remove_if_exists(os.path.join(indexed_audio_dir_abs_path, path))
+    if (isinstance(timestamps, _ShardedTimestamps) and
+            os.path.realpath(timestamps.indexed_audio_dir_abs_path) ==
+            os.path.realpath(indexed_audio_dir_abs_path)):
+        # Its shards were replaced, so it must not load them as per the
+        # previous manifest.
+        timestamps.reload()
+
+
+def _replace_file(src_abs_path, dst_abs_path):
+    """
+    Renames `src_abs_path` to `dst_abs_path`, overwriting it if it exists.
+
+    Parameters
+    ----------
+    src_abs_path : str
+    dst_abs_path : str
+    """
+    if hasattr(os, "replace"):
+        os.replace(src_abs_path, dst_abs_path)
+    else:
+        # Python 2's rename doesn't overwrite on Windows.
+        try:
+            os.remove(dst_abs_path)
+        except OSError:
+            pass
+        os.rename(src_abs_path, dst_abs_path)
+
+
+class _ShardedTimestamps(MutableMapping):
+    """
+    The timestamps of a sharded index. Only the manifest is read upon
+    creation. A shard is loaded (i.e. memory mapped) once the timestamps of
+    one of its audio files are accessed, and the least recently used shards
+    are dropped once the shards that are kept exceed `max_cached_bytes`.
+
+    Timestamps that are set or deleted afterwards (e.g. by reindexing an
+    audio file) are kept in memory and take precedence over the shards.
+
+    Attributes
+    ----------
+    indexed_audio_dir_abs_path : str
+    max_cached_bytes : int
+    shards : [dict]
+        The shards of the manifest.
+    shard_of : {str: int}
+        The index of the shard of every audio file within `shards`.
+    """
+
+    def __init__(self, indexed_audio_dir_abs_path,
+                 max_cached_bytes=_SHARD_CACHE_BYTES):
+        """
+        Parameters
+        ----------
+        indexed_audio_dir_abs_path : str
+        max_cached_bytes : int, optional
+            The total size of the shards that are kept loaded. The most
+            recently used shard is always kept, even if it's larger.
+
+            Default is `_SHARD_CACHE_BYTES`.
+
+        Raises
+        ------
+        ValueError
+            If the version of the manifest is not supported.
+        """
+        self.indexed_audio_dir_abs_path = indexed_audio_dir_abs_path
+        self.max_cached_bytes = max_cached_bytes
+        self.reload()
+
+    def reload(self):
+        """
+        Reads the manifest again, e.g. once the index has been saved to its
+        own directory. The loaded shards are dropped and the timestamps that
+        were set or deleted are discarded.
+
+        Raises
+        ------
+        ValueError
+            If the version of the manifest is not supported.
+        """
+        with open(os.path.join(self.indexed_audio_dir_abs_path,
+                               _SHARDED_INDEX_MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != _SHARDED_INDEX_VERSION:
+            raise ValueError("Unsupported sharded index version: {}".format(
+                manifest.get("version")))
+        self.shards = manifest["shards"]
+        self.shard_of = OrderedDict()
+        for shard_index, shard in enumerate(self.shards):
+            for audio_basename in shard["audio_basenames"]:
+                self.shard_of[audio_basename] = shard_index
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._modified = OrderedDict()
+        self._deleted = set()
+
+    def _get_shard(self, shard_index):
+        """
+        Parameters
+        ----------
+        shard_index : int
+
+        Returns
+        -------
+        {str: _TimestampColumns}
+        """
+        if shard_index in self._cache:
+            # Marks the shard as the most recently used one.
+            timestamps = self._cache.pop(shard_index)
+            self._cache[shard_index] = timestamps
+            return timestamps
+        shard = self.shards[shard_index]
+        timestamps = _load_binary_index(os.path.join(
+            self.indexed_audio_dir_abs_path, shard["path"]))
+        self._cache[shard_index] = timestamps
+        self._cached_bytes += shard["size"]
+        while (self._cached_bytes > self.max_cached_bytes and
+               len(self._cache) > 1):
+            evicted_index, _ = self._cache.popitem(last=False)
+            self._cached_bytes -= self.shards[evicted_index]["size"]
+        return timestamps
+
+    def is_loaded(self, audio_basename):
+        """
+        Parameters
+        ----------
+        audio_basename : str
+
+        Returns
+        -------
+        bool
+            `True` if the timestamps of `audio_basename` are in memory, i.e.
+            accessing them won't load a shard.
+        """
+        if audio_basename in self._modified:
+            return True
+        return (audio_basename not in self._deleted and
+                self.shard_of.get(audio_basename) in self._cache)
+
+    def __getitem__(self, audio_basename):
+        if audio_basename in self._modified:
+            return self._modified[audio_basename]
+        if (audio_basename in self._deleted or
+                audio_basename not in self.shard_of):
+            raise KeyError(audio_basename)
+        return self._get_shard(self.shard_of[audio_basename])[audio_basename]
+
+    def __setitem__(self, audio_basename, columns):
+        self._deleted.discard(audio_basename)
+        self._modified[audio_basename] = columns
+
+    def __delitem__(self, audio_basename):
+        if audio_basename not in self:
+            raise KeyError(audio_basename)
+        self._modified.pop(audio_basename, None)
+        if audio_basename in self.shard_of:
+            self._deleted.add(audio_basename)
+
+    def __contains__(self, audio_basename):
+        # Unlike the default implementation, doesn't load the shard.
+        return audio_basename in self._modified or (
+            audio_basename in self.shard_of and
+            audio_basename not in self._deleted)
+
+    def __iter__(self):
+        for audio_basename in self.shard_of:
+            if audio_basename not in self._deleted:
+                yield audio_basename
+        for audio_basename in self._modified:
+            if audio_basename not in self.shard_of:
+                yield audio_basename
+
+    def __len__(self):
+        return len(self.shard_of) - len(self._deleted) + sum(
+            1 for audio_basename in self._modified
+            if audio_basename not in self.shard_of)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+# A journal is an append-only file of segments. Every segment starts with a
+# record header, i.e. magic (4 bytes), reserved (4 bytes), the length of the
+# payload (uint64), its crc32 (uint32) and reserved (4 bytes), followed by
+# the payload and padding up to an 8 byte boundary. The payload is an index
+# in the binary format above, which holds the timestamps of the audio files
+# that were regulated together. Later segments take precedence over earlier
+# ones.
+_JOURNAL_MAGIC = b"SAIJ"
+_JOURNAL_RECORD_HEADER = struct.Struct("<4s4xQI4x")
+_JOURNAL_COMPACTION_SEGMENTS = 64
+
+
+class _Journal(object):
+    """
+    Appends the timestamps of newly indexed audio files to a journal, so that
+    saving them costs as much as their own size rather than the size of all
+    the timestamps.
+
+    Attributes
+    ----------
+    journal_abs_path : str
+    compaction_segments : int, None
+        The number of segments after which the journal should be compacted.
+        If `None`, it's only compacted explicitly.
+    segment_count : int
+        The number of segments within the journal.
+    """
+
+    def __init__(self, journal_abs_path,
+                 compaction_segments=_JOURNAL_COMPACTION_SEGMENTS):
+        """
+        Parameters
+        ----------
+        journal_abs_path : str
+            The journal is created upon the first append if it doesn't
+            exist.
+        compaction_segments : int, None, optional
+            Default is `_JOURNAL_COMPACTION_SEGMENTS`.
+        """
+        self.journal_abs_path = journal_abs_path
+        self.compaction_segments = compaction_segments
+        self.segment_count = 0
+
+    def replay(self):
+        """
+        Reads the segments of the journal. The segments are memory mapped,
+        same as `_load_binary_index`.
+
+        A segment that was partially written (e.g. because the process
+        crashed while appending it) is truncated, along with whatever follows
+        it.
+
+        Returns
+        -------
+        {str: _TimestampColumns}
+
+        Raises
+        ------
+        ValueError
+            If a segment was written by a newer version.
+        """
+        timestamps = _PrettyDefaultDict(_TimestampColumns)
+        self.segment_count = 0
+        if (not os.path.isfile(self.journal_abs_path) or
+                os.path.getsize(self.journal_abs_path) == 0):
+            return timestamps
+        with open(self.journal_abs_path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        offset = 0
+        while offset + _JOURNAL_RECORD_HEADER.size <= len(buffer):
+            magic, length, checksum = _JOURNAL_RECORD_HEADER.unpack_from(
+                buffer, offset)
+            payload_offset = offset + _JOURNAL_RECORD_HEADER.size
+            if (magic != _JOURNAL_MAGIC or
+                    payload_offset + length > len(buffer) or
+                    zlib.crc32(buffer[payload_offset:payload_offset + length])
+                    & 0xffffffff != checksum):
+                break
+            timestamps.update(_read_binary_index(buffer, payload_offset))
+            self.segment_count += 1
+            offset = payload_offset + length + (-length % 8)
+        if offset < len(buffer):
+            with open(self.journal_abs_path, "r+b") as f:
+                f.truncate(offset)
+        return timestamps
+
+    def _write_segment(self, timestamps, f):
+        """
+        Parameters
+        ----------
+        timestamps : {str: _TimestampColumns}
+        f : file
+            Opened in binary mode and positioned at an 8 byte boundary.
+        """
+        payload = BytesIO()
+        _write_binary_index(timestamps, payload)
+        payload = payload.getvalue()
+        f.write(_JOURNAL_RECORD_HEADER.pack(
+            _JOURNAL_MAGIC, len(payload), zlib.crc32(payload) & 0xffffffff))
+        f.write(payload)
+        f.write(b"\0" * (-len(payload) % 8))
+        f.flush()
+        os.fsync(f.fileno())
+
+    def append(self, timestamps):
+        """
+        Parameters
+        ----------
+        timestamps : {str: _TimestampColumns}
+            Lists of `_WordBlock`s are accepted as values as well.
+        """
+        with open(self.journal_abs_path, "ab") as f:
+            self._write_segment(timestamps, f)
+        self.segment_count += 1
+
+    def needs_compaction(self):
+        """
+        Returns
+        -------
+        bool
+        """
+        return (self.compaction_segments is not None and
+                self.segment_count > self.compaction_segments)
+
+    def compact(self, timestamps):
+        """
+        Replaces the journal with a single segment. The journal is only
+        replaced once the segment is completely written.
+
+        Parameters
+        ----------
+        timestamps : {str: _TimestampColumns}
+            All the timestamps of the journal.
+        """
+        with open(self.journal_abs_path + ".tmp", "wb") as f:
+            self._write_segment(timestamps, f)
+        _replace_file(self.journal_abs_path + ".tmp", self.journal_abs_path)
+        self.segment_count = 1
+
+
+# An SQLite index is a database with the tables below. Times are kept in
+# centiseconds and confidences in ten thousandths (`NULL` if unknown). The
+# `transcripts` table is an FTS5 index whose rows are the audio files (its
+# rowids are their file_ids) and whose tokens are their casefolded words (see
+# `_fts_token`). It's absent if SQLite was built without FTS5.
+_SQLITE_INDEX_MAGIC = b"SQLite format 3\0"
+_SQLITE_INDEX_VERSION = 1
+_SQLITE_INDEX_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS metadata ("
+    "key TEXT PRIMARY KEY, value TEXT)",
+    "CREATE TABLE IF NOT EXISTS audio_files ("
+    "file_id INTEGER PRIMARY KEY, basename TEXT UNIQUE NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS terms ("
+    "file_id INTEGER, term_id INTEGER, term TEXT, phonetic_key TEXT, "
+    "PRIMARY KEY (file_id, term_id))",
+    "CREATE TABLE IF NOT EXISTS words ("
+    "file_id INTEGER, position INTEGER, term_id INTEGER, "
+    "start_time INTEGER, end_time INTEGER, confidence INTEGER, "
+    "PRIMARY KEY (file_id, position))",
+    "CREATE TABLE IF NOT EXISTS alternatives ("
+    "file_id INTEGER, position INTEGER, term_id INTEGER, "
+    "confidence INTEGER)",
+    "CREATE INDEX IF NOT EXISTS alternatives_of_file "
+    "ON alternatives (file_id, position)")
+
+
+def _fts_token(word):
+    """
+    Parameters
+    ----------
+    word : str
+
+    Returns
+    -------
+    str
+        The casefolded word, hex encoded so that the FTS5 tokenizer keeps it
+        as a single token.
+    """
+    return "x" + hexlify(_casefold(word).encode("utf-8")).decode("ascii")
+
+
+def _columns_size(columns):
+    """
+    Parameters
+    ----------
+    columns : _TimestampColumns
+
+    Returns
+    -------
+    int
+        An estimate of the bytes that `columns` take.
+    """
+    return sum(len(getattr(columns, column)) * array(typecode).itemsize
+               for column, typecode in _TimestampColumns._ARRAY_COLUMNS) + sum(
+        len(term) + len(phonetic_key)
+        for term, phonetic_key in zip(columns.terms, columns.phonetic_keys))
+
+
+class _SqliteTimestamps(MutableMapping):
+    """
+    The timestamps of an SQLite index. Only the basenames of the audio files
+    are read upon creation. The timestamps of an audio file are read once
+    they're accessed, and the least recently used ones are dropped once they
+    exceed `max_cached_bytes`.
+
+    Timestamps that are set or deleted are written to the database right
+    away. Note that changing the columns of an audio file in place (e.g.
+    appending to them) isn't written unless they're set again.
+
+    Attributes
+    ----------
+    connection : sqlite3.Connection
+    max_cached_bytes : int
+    file_ids : {str: int}
+    has_fts : bool
+        Whether the database has an FTS5 index (see `match`).
+    """
+
+    def __init__(self, indexed_audio_file_abs_path,
+                 max_cached_bytes=_SHARD_CACHE_BYTES):
+        """
+        Parameters
+        ----------
+        indexed_audio_file_abs_path : str
+            The database is created if it doesn't exist.
+        max_cached_bytes : int, optional
+            Default is `_SHARD_CACHE_BYTES`.
+
+        Raises
+        ------
+        ValueError
+            If the database was written by a newer version.
+        """
+        if sqlite3 is None:
+            raise ValueError("SQLite indexes need the sqlite3 module.")
+        self.connection = sqlite3.connect(indexed_audio_file_abs_path)
+        self.max_cached_bytes = max_cached_bytes
+        with self.connection:
+            for statement in _SQLITE_INDEX_SCHEMA:
+                self.connection.execute(statement)
+            self.connection.execute(
+                "INSERT OR IGNORE INTO metadata VALUES ('version', ?)",
+                (str(_SQLITE_INDEX_VERSION),))
+            try:
+                self.connection.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS transcripts "
+                    "USING fts5(tokens)")
+            except sqlite3.OperationalError:
+                # SQLite was built without FTS5.
+                pass
+        version, = self.connection.execute(
+            "SELECT value FROM metadata WHERE key = 'version'").fetchone()
+        if int(version) != _SQLITE_INDEX_VERSION:
+            raise ValueError(
+                "Unsupported indexed audio version: {}".format(version))
+        self.has_fts = self.connection.execute(
+            "SELECT count(*) FROM sqlite_master "
+            "WHERE name = 'transcripts'").fetchone()[0] > 0
+        self.file_ids = OrderedDict(self.connection.execute(
+            "SELECT basename, file_id FROM audio_files ORDER BY file_id"))
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+
+    def _read_columns(self, file_id):
+        """
+        Parameters
+        ----------
+        file_id : int
+
+        Returns
+        -------
+        _TimestampColumns
+        """
+        state = {"terms": list(), "phonetic_keys": list()}
+        for term, phonetic_key in self.connection.execute(
+                "SELECT term, phonetic_key FROM terms WHERE file_id = ? "
+                "ORDER BY term_id", (file_id,)):
+            state["terms"].append(term)
+            state["phonetic_keys"].append(phonetic_key)
+        for column, typecode in _TimestampColumns._ARRAY_COLUMNS:
+            state[column] = array(typecode)
+        for term_id, start, end, confidence in self.connection.execute(
+                "SELECT term_id, start_time, end_time, confidence FROM words "
+                "WHERE file_id = ? ORDER BY position", (file_id,)):
+            state["term_ids"].append(term_id)
+            state["starts"].append(start)
+            state["ends"].append(end)
+            state["confidences"].append(
+                _UNKNOWN_CONFIDENCE if confidence is None else confidence)
+        for position, term_id, confidence in self.connection.execute(
+                "SELECT position, term_id, confidence FROM alternatives "
+                "WHERE file_id = ? ORDER BY position, rowid", (file_id,)):
+            state["alternative_positions"].append(position)
+            state["alternative_term_ids"].append(term_id)
+            state["alternative_confidences"].append(confidence)
+        columns = _TimestampColumns.__new__(_TimestampColumns)
+        columns.__setstate__(state)
+        return columns
+
+    def _uncache(self, audio_basename):
+        if audio_basename in self._cache:
+            columns = self._cache.pop(audio_basename)
+            self._cached_bytes -= _columns_size(columns)
+
+    def _delete_rows(self, file_id):
+        for table in ("terms", "words", "alternatives"):
+            self.connection.execute(
+                "DELETE FROM {} WHERE file_id = ?".format(table), (file_id,))
+        if self.has_fts:
+            self.connection.execute(
+                "DELETE FROM transcripts WHERE rowid = ?", (file_id,))
+
+    def is_loaded(self, audio_basename):
+        """
+        Parameters
+        ----------
+        audio_basename : str
+
+        Returns
+        -------
+        bool
+            `True` if the timestamps of `audio_basename` are in memory.
+        """
+        return audio_basename in self._cache
+
+    def close(self):
+        """
+        Closes the database. The timestamps mustn't be accessed afterwards.
+        """
+        self.connection.close()
+
+    def match(self, query_words):
+        """
+        Finds the audio files that may contain the query words via the FTS5
+        index.
+
+        Parameters
+        ----------
+        query_words : [[str]]
+            The words of every query.
+
+        Returns
+        -------
+        set of str, None
+            The basenames of the audio files that contain all of the words of
+            at least one of the queries, regardless of their case. `None` if
+            the database has no FTS5 index.
+        """
+        if not self.has_fts:
+            return None
+        fts_query = " OR ".join(
+            "({})".format(" AND ".join(_fts_token(word) for word in words))
+            for words in query_words if len(words) > 0)
+        if len(fts_query) == 0:
+            return set()
+        basename_of = dict((file_id, audio_basename) for audio_basename,
+                           file_id in self.file_ids.items())
+        return set(basename_of[file_id] for file_id, in
+                   self.connection.execute(
+                       "SELECT rowid FROM transcripts WHERE transcripts "
+                       "MATCH ?", (fts_query,)))
+
+    def __getitem__(self, audio_basename):
+        if audio_basename in self._cache:
+            # Marks the audio file as the most recently used one.
+            columns = self._cache.pop(audio_basename)
+            self._cache[audio_basename] = columns
+            return columns
+        if audio_basename not in self.file_ids:
+            raise KeyError(audio_basename)
+        columns = self._read_columns(self.file_ids[audio_basename])
+        self._cache[audio_basename] = columns
+        self._cached_bytes += _columns_size(columns)
+        while (self._cached_bytes > self.max_cached_bytes and
+               len(self._cache) > 1):
+            _, evicted_columns = self._cache.popitem(last=False)
+            self._cached_bytes -= _columns_size(evicted_columns)
+        return columns
+
+    def __setitem__(self, audio_basename, columns):
+        if not isinstance(columns, _TimestampColumns):
+            columns = _TimestampColumns(columns)
+        with self.connection:
+            if audio_basename in self.file_ids:
+                file_id = self.file_ids[audio_basename]
+                self._delete_rows(file_id)
+            else:
+                file_id = self.connection.execute(
+                    "INSERT INTO audio_files (basename) VALUES (?)",
+                    (audio_basename,)).lastrowid
+            self.connection.executemany(
+                "INSERT INTO terms VALUES (?, ?, ?, ?)",
+                ((file_id, term_id, term, phonetic_key)
+                 for term_id, (term, phonetic_key) in enumerate(
+                     zip(columns.terms, columns.phonetic_keys))))
+            self.connection.executemany(
+                "INSERT INTO words VALUES (?, ?, ?, ?, ?, ?)",
+                ((file_id, position, term_id, start, end,
+                  None if confidence == _UNKNOWN_CONFIDENCE else confidence)
+                 for position, (term_id, start, end, confidence) in
+                 enumerate(zip(columns.term_ids, columns.starts,
+                               columns.ends, columns.confidences))))
+            self.connection.executemany(
+                "INSERT INTO alternatives VALUES (?, ?, ?, ?)",
+                ((file_id, position, term_id, confidence)
+                 for position, term_id, confidence in zip(
+                     columns.alternative_positions,
+                     columns.alternative_term_ids,
+                     columns.alternative_confidences)))
+            if self.has_fts:
+                self.connection.execute(
+                    "INSERT INTO transcripts (rowid, tokens) VALUES (?, ?)",
+                    (file_id, " ".join(
+                        _fts_token(columns.terms[term_id])
+                        for term_id in columns.term_ids)))
+        self.file_ids[audio_basename] = file_id
+        self._uncache(audio_basename)
+
+    def __delitem__(self, audio_basename):
+        if audio_basename not in self.file_ids:
+            raise KeyError(audio_basename)
+        with self.connection:
+            self._delete_rows(self.file_ids[audio_basename])
+            self.connection.execute(
+                "DELETE FROM audio_files WHERE file_id = ?",
+                (self.file_ids[audio_basename],))
+        del self.file_ids[audio_basename]
+        self._uncache(audio_basename)
+
+    def __contains__(self, audio_basename):
+        # Unlike the default implementation, doesn't read the timestamps.
+        return audio_basename in self.file_ids
+
+    def __iter__(self):
+        return iter(list(self.file_ids))
+
+    def __len__(self):
+        return len(self.file_ids)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+def _save_sqlite_index(timestamps, indexed_audio_file_abs_path):
+    """
+    Writes `timestamps` as an SQLite index (see `_SQLITE_INDEX_MAGIC`),
+    replacing the file if it exists.
+
+    Parameters
+    ----------
+    timestamps : {str: _TimestampColumns}
+        Lists of `_WordBlock`s are accepted as values as well.
+    indexed_audio_file_abs_path : str
+    """
+    if os.path.isfile(indexed_audio_file_abs_path):
+        os.remove(indexed_audio_file_abs_path)
+    sqlite_timestamps = _SqliteTimestamps(indexed_audio_file_abs_path,
+                                          max_cached_bytes=0)
+    for audio_basename in timestamps:
+        sqlite_timestamps[audio_basename] = timestamps[audio_basename]
+    sqlite_timestamps.connection.close()
+
+
+def _save_indexed_audio(timestamps, indexed_audio_file_abs_path,
+                        files_per_shard=None, compression=None, sqlite=False):
+    """
+    Writes `timestamps` in the format chosen by the arguments, which are the
+    same as those of `SimpleAudioIndexer.save_indexed_audio`.
+
+    Parameters
+    ----------
+    timestamps : {str: _TimestampColumns}
+    indexed_audio_file_abs_path : str
+    files_per_shard : int, None, optional
+    compression : {None, "varint", "zlib", "lzma"}, optional
+    sqlite : bool, optional
+    """
+    if sqlite:
+        if files_per_shard is not None or compression is not None:
+            raise ValueError(
+                "SQLite indexes can't be sharded or compressed.")
+        _save_sqlite_index(timestamps, indexed_audio_file_abs_path)
+    elif compression is not None:
+        if files_per_shard is not None:
+            raise ValueError(
+                "Sharded indexes can't be compressed.")
+        _save_packed_index(timestamps, indexed_audio_file_abs_path,
+                           compression=compression)
+    elif files_per_shard is None:
+        _save_binary_index(timestamps, indexed_audio_file_abs_path)
+    else:
+        _save_sharded_index(timestamps, indexed_audio_file_abs_path,
+                            files_per_shard)
+
+
+def _load_indexed_audio(indexed_audio_file_abs_path,
+                        max_cached_bytes=_SHARD_CACHE_BYTES):
+    """
+    Opens an index in whichever format it was saved, same as
+    `SimpleAudioIndexer.load_indexed_audio`.
+
+    Parameters
+    ----------
+    indexed_audio_file_abs_path : str
+    max_cached_bytes : int, optional
+
+    Returns
+    -------
+    {str: _TimestampColumns}
+    """
+    if os.path.isdir(indexed_audio_file_abs_path):
+        return _ShardedTimestamps(indexed_audio_file_abs_path,
+                                  max_cached_bytes=max_cached_bytes)
+    if _is_binary_index(indexed_audio_file_abs_path):
+        return _load_binary_index(indexed_audio_file_abs_path)
+    if _is_binary_index(indexed_audio_file_abs_path,
+                        magic=_SQLITE_INDEX_MAGIC):
+        return _SqliteTimestamps(indexed_audio_file_abs_path,
+                                 max_cached_bytes=max_cached_bytes)
+    if _is_binary_index(indexed_audio_file_abs_path,
+                        magic=_PACKED_INDEX_MAGIC):
+        return _load_packed_index(indexed_audio_file_abs_path)
+    with open(indexed_audio_file_abs_path, "rb") as f:
+        pickled_timestamps = pickle.load(f)
+    # Indexed audio that was saved before the timestamps became columnar has
+    # lists of word blocks as its values.
+    timestamps = _PrettyDefaultDict(_TimestampColumns)
+    for audio_basename in pickled_timestamps:
+        if isinstance(pickled_timestamps[audio_basename], _TimestampColumns):
+            timestamps[audio_basename] = pickled_timestamps[audio_basename]
+        else:
+            timestamps[audio_basename] = _TimestampColumns(
+                pickled_timestamps[audio_basename])
+    return timestamps
+
+
+class _MergedTimestamps(Mapping):
+    """
+    A read only view of several timestamps, whose audio basenames are merged
+    in sorted order (see `SimpleAudioIndexer.merge_indexed_audio`).
+
+    Attributes
+    ----------
+    sources : [{str: _TimestampColumns}]
+    source_of : {str: int}
+        For every audio basename, the index of the timestamps within
+        `sources` that its timestamps are taken from.
+    """
+
+    def __init__(self, sources, on_conflict="latest"):
+        """
+        Parameters
+        ----------
+        sources : [{str: _TimestampColumns}]
+        on_conflict : {"latest", "error"}, optional
+            Default is "latest".
+
+        Raises
+        ------
+        ValueError
+            If `on_conflict` is "error" and an audio basename is within more
+            than one of `sources`, or if `on_conflict` is not supported.
+        """
+        if on_conflict not in {"latest", "error"}:
+            raise ValueError("Unsupported on_conflict: {}".format(
+                on_conflict))
+        self.sources = sources
+        self.source_of = OrderedDict()
+        for audio_basename, source_index in merge(*[
+                [(audio_basename, source_index)
+                 for audio_basename in sorted(source)]
+                for source_index, source in enumerate(sources)]):
+            if audio_basename in self.source_of and on_conflict == "error":
+                raise ValueError(
+                    "{} is within more than one index".format(audio_basename))
+            # Since the sources of the same basename are merged in the order
+            # of their indexes, the latest one wins.
+            self.source_of[audio_basename] = source_index
+
+    def __getitem__(self, audio_basename):
+        return self.sources[self.source_of[audio_basename]][audio_basename]
+
+    def __iter__(self):
+        return iter(self.source_of)
+
+    def __len__(self):
+        return len(self.source_of)
+
+
+class _BKTree(object):
+    """
+    A Burkhard-Keller tree over a list of distinct words. Every node is a
+    word and its children are keyed by their edit distance to it. Since edit
+    distance satisfies the triangle inequality, looking for the words within
+    a distance of a given word only needs to descend into the children whose
+    key is within that distance of the distance of the node itself, which
+    prunes most of the words.
+
+    Attributes
+    ----------
+    words : [str]
+    root : [int, {int: list}] or None
+        A node is a list whose first element is the index of its word within
+        `words` and whose second element maps distances to child nodes.
+    """
+
+    def __init__(self, words):
+        """
+        Parameters
+        ----------
+        words : [str]
+            Expected to be distinct.
+        """
+        self.words = words
+        self.root = None
+        for word_id in range(len(words)):
+            self.add(word_id)
+
+    def add(self, word_id):
+        """
+        Parameters
+        ----------
+        word_id : int
+            Index of the word within `words`.
+        """
+        node = [word_id, dict()]
+        if self.root is None:
+            self.root = node
+            return
+        current_node = self.root
+        while True:
+            distance = _edit_distance(self.words[current_node[0]],
+                                      self.words[word_id])
+            if distance == 0:
+                return
+            if distance not in current_node[1]:
+                current_node[1][distance] = node
+                return
+            current_node = current_node[1][distance]
+
+    def find(self, word, max_distance):
+        """
+        Parameters
+        ----------
+        word : str
+        max_distance : int
+
+        Returns
+        -------
+        [int]
+            Indexes of the words whose edit distance to `word` is at most
+            `max_distance`.
+        """
+        found = list()
+        nodes = [self.root] if self.root is not None else list()
+        while nodes:
+            word_id, children = nodes.pop()
+            distance = _edit_distance(word, self.words[word_id])
+            if distance <= max_distance:
+                found.append(word_id)
+            for child_distance in children:
+                if abs(child_distance - distance) <= max_distance:
+                    nodes.append(children[child_distance])
+        return found
+
+
+class _AudioIndex(object):
+    """
+    The search structures of a single audio file. It's a positional inverted
+    index that maps each normalized (casefolded, if not case sensitive) word
+    to the sorted positions (i.e. indexes of the word blocks of that audio
+    file) at which the word occurs.
+
+    It also keeps the normalized word of every position as an id within the
+    normalized term dictionary, so that searching doesn't have to normalize
+    the timestamps per query.
+
+    Attributes
+    ----------
+    columns : _TimestampColumns
+    terms : [str]
+        The distinct normalized words of the audio file.
+    term_ids : array.array
+        For every word block, the index of its normalized word in `terms`.
+    term_id_of : {str: int}
+        The inverse of `terms`.
+    normalized_term_ids : [int]
+        For every term of `columns`, the id of its normalized term.
+    postings : [array.array]
+        For every normalized word (i.e. term id), the sorted positions of that
+        word within the audio file.
+    """
+
+    def __init__(self, columns, normalize=None):
+        """
+        Parameters
+        ----------
+        columns : _TimestampColumns
+        normalize : function, None, optional
+            Is applied on every term of `columns`. `None` means that the terms
+            are already normalized.
+
+            Default is `None`
+        """
+        self.columns = columns
+        if normalize is None:
+            self.terms = columns.terms
+            self.term_ids = columns.term_ids
+            self.normalized_term_ids = list(range(len(self.terms)))
+        else:
+            self.terms = list()
+            normalized_term_id_of = dict()
+            normalized_term_ids = list()
+            for term in columns.terms:
+                normalized_term = normalize(term)
+                if normalized_term not in normalized_term_id_of:
+                    normalized_term_id_of[normalized_term] = len(self.terms)
+                    self.terms.append(normalized_term)
+                normalized_term_ids.append(
+                    normalized_term_id_of[normalized_term])
+            self.term_ids = array("i", [normalized_term_ids[term_id]
+                                        for term_id in columns.term_ids])
+            self.normalized_term_ids = normalized_term_ids
+        self.term_id_of = dict(
+            (term, term_id) for term_id, term in enumerate(self.terms))
+        self.postings = [array("i") for _ in self.terms]
+        for position, term_id in enumerate(self.term_ids):
+            self.postings[term_id].append(position)
+        # Maps sorted letters of the terms to their term ids. It's built upon
+        # the first anagram search.
+        self._anagram_term_ids = None
+        # Maps characters to the ids of the terms containing them. It's built
+        # upon the first subsequence or supersequence search.
+        self._char_term_ids = None
+        # Memoized term ids of subsequence and supersequence searches. Keys
+        # are query words.
+        self._subsequence_term_ids = dict()
+        self._supersequence_term_ids = dict()
+        # BK-tree of the terms. It's built upon the first fuzzy search.
+        self._bk_tree = None
+        # Memoized term ids of fuzzy searches. Keys are (query word, maximum
+        # edit distance) tuples.
+        self._edit_distance_term_ids = dict()
+        # Maps phonetic keys to the ids of the terms having them. It's built
+        # upon the first phonetic search.
+        self._phonetic_term_ids = None
+        # Maps positions to the (term id, confidence) tuples of their
+        # alternative hypotheses and, for every term id, holds the sorted
+        # positions at which it's an alternative hypothesis. They're built
+        # upon the first search that considers the alternatives.
+        self._alternatives = None
+        self._alternative_postings = None
+        # The words joined by spaces and the offsets of the words within it.
+        # It's built upon the first regex search.
+        self._transcript = None
+
+    def get_word(self, i):
+        """
+        Parameters
+        ----------
+        i : int
+
+        Returns
+        -------
+        str
+            The normalized word of the `i`th word block.
+        """
+        return self.terms[self.term_ids[i]]
+
+    def get_anagram_term_ids(self, word):
+        """
+        Parameters
+        ----------
+        word : str
+            Expected to be already normalized.
+
+        Returns
+        -------
+        [int]
+            Term ids of the terms that are permutations of `word`.
+        """
+        if self._anagram_term_ids is None:
+            self._anagram_term_ids = defaultdict(list)
+            for term_id, term in enumerate(self.terms):
+                self._anagram_term_ids[_anagram_signature(term)].append(
+                    term_id)
+        return self._anagram_term_ids.get(_anagram_signature(word), list())
+
+    def _get_char_term_ids(self):
+        """
+        Returns
+        -------
+        {str: {int}}
+            A dictionary whose keys are characters and whose values are the
+            ids of the terms that contain them.
+        """
+        if self._char_term_ids is None:
+            self._char_term_ids = defaultdict(set)
+            for term_id, term in enumerate(self.terms):
+                for char in set(term):
+                    self._char_term_ids[char].add(term_id)
+        return self._char_term_ids
+
+    def get_subsequence_term_ids(self, word):
+        """
+        Only the terms that contain all the characters of `word` are checked.
+
+        Parameters
+        ----------
+        word : str
+            Expected to be already normalized.
+
+        Returns
+        -------
+        {int}
+            Term ids of the terms of which `word` is a subsequence.
+        """
+        if word not in self._subsequence_term_ids:
+            char_term_ids = self._get_char_term_ids()
+            candidates = range(len(self.terms))
+            if len(word) > 0:
+                candidates = set.intersection(*[
+                    char_term_ids.get(char, set()) for char in set(word)])
+            self._subsequence_term_ids[word] = set(
+                term_id for term_id in candidates
+                if _is_subsequence(word, self.terms[term_id]))
+        return self._subsequence_term_ids[word]
+
+    def get_supersequence_term_ids(self, word):
+        """
+        Only the terms whose characters are all within `word` are checked.
 
-        Code is from Python's source:
-        https://hg.python.org/cpython/file/3.6/Lib/contextlib.py
+        Parameters
+        ----------
+        word : str
+            Expected to be already normalized.
+
+        Returns
+        -------
+        {int}
+            Term ids of the terms that are subsequences of `word`.
         """
-        def _recreate_cm(self):
-            return self
+        if word not in self._supersequence_term_ids:
+            char_term_ids = self._get_char_term_ids()
+            excluded = set().union(*[
+                char_term_ids[char] for char in char_term_ids
+                if char not in word])
+            self._supersequence_term_ids[word] = set(
+                term_id for term_id in range(len(self.terms))
+                if term_id not in excluded and
+                len(self.terms[term_id]) <= len(word) and
+                _is_subsequence(self.terms[term_id], word))
+        return self._supersequence_term_ids[word]
+
+    def get_edit_distance_term_ids(self, word, max_edit_distance):
+        """
+        Parameters
+        ----------
+        word : str
+            Expected to be already normalized.
+        max_edit_distance : int
 
-        def __call__(self, func):
-            @wraps(func)
-            def inner(*args, **kwds):
-                with self._recreate_cm():
-                    return func(*args, **kwds)
-            return inner
+        Returns
+        -------
+        {int}
+            Term ids of the terms whose edit distance to `word` is at most
+            `max_edit_distance`.
+        """
+        key = (word, max_edit_distance)
+        if key not in self._edit_distance_term_ids:
+            if self._bk_tree is None:
+                self._bk_tree = _BKTree(self.terms)
+            self._edit_distance_term_ids[key] = set(
+                self._bk_tree.find(word, max_edit_distance))
+        return self._edit_distance_term_ids[key]
+
+    def get_phonetic_term_ids(self, word):
+        """
+        Parameters
+        ----------
+        word : str
+
+        Returns
+        -------
+        {int}
+            Term ids of the terms that sound like `word` i.e. have the same
+            phonetic key. Empty if `word` has an empty phonetic key.
+        """
+        if self._phonetic_term_ids is None:
+            self._phonetic_term_ids = defaultdict(set)
+            for term_id, phonetic_key in enumerate(
+                    self.columns.phonetic_keys):
+                self._phonetic_term_ids[phonetic_key].add(
+                    self.normalized_term_ids[term_id])
+        phonetic_key = _phonetic_key(word)
+        if not phonetic_key:
+            return set()
+        return self._phonetic_term_ids.get(phonetic_key, set())
+
+    def get_matching_term_ids(self, word, anagram=False, subsequence=False,
+                              supersequence=False, max_edit_distance=0,
+                              phonetic=False):
+        """
+        Parameters
+        ----------
+        word : str
+            Expected to be already normalized.
+        anagram : bool, optional
+            `True` if permutations of `word` are acceptable as well.
 
+            Default is `False`
+        subsequence : bool, optional
+            `True` if terms of which `word` is a subsequence are acceptable as
+            well.
 
-class _PrettyDefaultDict(defaultdict):
-    # When printing the output of search_results, normally the defaultdict
-    # type would be shown as well. To print the `search_results` normally,
-    # defining a PrettyDefaultDict type that is printable the same way as a
-    # dict, is easier/faster than json.load(json.dump(x)) etc. and we don't
-    # actually have to deal with encoding either.
-    __repr__ = dict.__repr__
+            Default is `False`
+        supersequence : bool, optional
+            `True` if terms that are subsequences of `word` are acceptable as
+            well.
 
+            Default is `False`
+        max_edit_distance : int, optional
+            Terms whose edit distance to `word` is at most
+            `max_edit_distance` are acceptable as well.
 
-class _WordBlock(object):
+            Default is 0
+        phonetic : bool, optional
+            `True` if terms that sound like `word` are acceptable as well.
+
+            Default is `False`
+
+        Returns
+        -------
+        {int}
+            Term ids of the terms that match `word`.
+        """
+        term_ids = set()
+        if word in self.term_id_of:
+            term_ids.add(self.term_id_of[word])
+        if anagram:
+            term_ids.update(self.get_anagram_term_ids(word))
+        if subsequence:
+            term_ids.update(self.get_subsequence_term_ids(word))
+        if supersequence:
+            term_ids.update(self.get_supersequence_term_ids(word))
+        if max_edit_distance > 0:
+            term_ids.update(self.get_edit_distance_term_ids(
+                word, max_edit_distance))
+        if phonetic:
+            term_ids.update(self.get_phonetic_term_ids(word))
+        return term_ids
+
+    def _build_alternatives(self):
+        """
+        Builds `_alternatives` and `_alternative_postings`.
+        """
+        self._alternatives = dict()
+        self._alternative_postings = [array("i") for _ in self.terms]
+        for position, term_id, confidence in zip(
+                self.columns.alternative_positions,
+                self.columns.alternative_term_ids,
+                self.columns.alternative_confidences):
+            term_id = self.normalized_term_ids[term_id]
+            self._alternatives.setdefault(position, list()).append(
+                (term_id, confidence))
+            postings = self._alternative_postings[term_id]
+            if len(postings) == 0 or postings[-1] != position:
+                postings.append(position)
+
+    def get_matching_alternative(self, position, term_ids,
+                                 confidence_threshold=-1):
+        """
+        Parameters
+        ----------
+        position : int
+        term_ids : {int}
+        confidence_threshold : int, optional
+            Alternatives whose confidence (in ten thousandths) is less than
+            this are ignored.
+
+            Default is -1
+
+        Returns
+        -------
+        int or None
+            The id of the first alternative hypothesis at `position` that is
+            within `term_ids`. `None` if there's none.
+        """
+        if self._alternatives is None:
+            self._build_alternatives()
+        for term_id, confidence in self._alternatives.get(position, ()):
+            if term_id in term_ids and confidence >= confidence_threshold:
+                return term_id
+        return None
+
+    def get_transcript(self):
+        """
+        Returns
+        -------
+        (str, array.array)
+            The first element is the words of the audio file joined by spaces.
+            The second element holds the index at which each word starts
+            within the first element.
+        """
+        if self._transcript is None:
+            word_offsets = array("i")
+            offset = 0
+            for term_id in self.term_ids:
+                word_offsets.append(offset)
+                offset += len(self.terms[term_id]) + 1
+            self._transcript = (
+                ' '.join([self.terms[term_id] for term_id in self.term_ids]),
+                word_offsets)
+        return self._transcript
+
+    def candidate_positions(self, query_term_ids, lo=0, hi=None,
+                            alternatives=False):
+        """
+        Returns the sorted positions at which any of the terms of
+        `query_term_ids` occur. If there's no term for any of the query words,
+        nothing is returned since no result could contain all of them.
+
+        Parameters
+        ----------
+        query_term_ids : [{int}]
+            For every query word, the term ids that match it.
+        lo : int, optional
+            Positions before `lo` are excluded.
+
+            Default is 0
+        hi : int, None, optional
+            Positions at or after `hi` are excluded. `None` means none.
+
+            Default is `None`
+        alternatives : bool, optional
+            `True` if the positions at which the terms are alternative
+            hypotheses are needed as well.
+
+            Default is `False`
+
+        Returns
+        -------
+        [int]
+        """
+        if not all(query_term_ids):
+            return list()
+        term_ids = set().union(*query_term_ids)
+        postings = [self.postings[term_id] for term_id in term_ids]
+        if alternatives:
+            if self._alternative_postings is None:
+                self._build_alternatives()
+            postings.extend(self._alternative_postings[term_id]
+                            for term_id in term_ids)
+        if lo > 0 or hi is not None:
+            postings = [
+                positions[bisect_left(positions, lo):(
+                    len(positions) if hi is None else
+                    bisect_left(positions, hi))]
+                for positions in postings]
+        if alternatives:
+            # A position could be within the postings of more than one term.
+            return sorted(set(merge(*postings)))
+        return list(merge(*postings))
+
+
+class _InvertedIndex(object):
     """
-    Holds a word with its starting second and ending second (with respect to
-    an audio file)
+    Lazily builds and holds the `_AudioIndex` of every audio file of the
+    regulated timestamps.
 
     Attributes
     ----------
-    word : str
-    start : float
-    end : float
+    case_sensitive : bool
+    timestamps : {str: _TimestampColumns}
+    audio_indexes : {str: _AudioIndex}
     """
 
-    def __init__(self, word, start, end):
-        self.word = word
-        self.start = round(start, 2)
-        self.end = round(end, 2)
+    def __init__(self, timestamps, case_sensitive=False):
+        """
+        Parameters
+        ----------
+        timestamps : {str: _TimestampColumns}
+            The regulated timestamps, i.e. the output of `get_timestamps`.
+            Lists of `_WordBlock`s are accepted as values as well.
+        case_sensitive : bool, optional
+            If `False`, words are casefolded before being indexed.
 
-    def __eq__(self, other):
-        if type(other) is not _WordBlock:
-            raise TypeError
-        return (self.word == other.word and
-                self.start == other.start and
-                self.end == other.end)
+            Default is `False`.
+        """
+        self.case_sensitive = case_sensitive
+        self.timestamps = timestamps
+        self.audio_indexes = dict()
 
-    def __getitem__(self, i):
-        if type(i) is not int:
-            raise TypeError
-        if i == 0:
-            return self.word
-        elif i == 1:
-            return self.start
-        elif i == 2:
-            return self.end
-        raise IndexError
+    def normalize(self, word):
+        """
+        Parameters
+        ----------
+        word : str
 
-    def __repr__(self):
-        return "(\"{}\", {}, {})".format(self.word, self.start, self.end)
+        Returns
+        -------
+        str
+        """
+        if self.case_sensitive:
+            return word
+        return _casefold(word)
+
+    def get_audio_index(self, audio_basename):
+        """
+        Parameters
+        ----------
+        audio_basename : str
+
+        Returns
+        -------
+        _AudioIndex
+
+        Raises
+        ------
+        KeyError
+            If `audio_basename` is not within the timestamps.
+        """
+        if audio_basename not in self.audio_indexes:
+            if audio_basename not in self.timestamps:
+                raise KeyError(audio_basename)
+            if isinstance(self.timestamps,
+                          (_ShardedTimestamps, _SqliteTimestamps)):
+                # The indexes of the audio files whose timestamps were
+                # dropped from the cache are dropped as well. Otherwise,
+                # they'd keep them in memory.
+                for indexed_basename in list(self.audio_indexes):
+                    if not self.timestamps.is_loaded(indexed_basename):
+                        del self.audio_indexes[indexed_basename]
+            columns = self.timestamps[audio_basename]
+            if not isinstance(columns, _TimestampColumns):
+                columns = _TimestampColumns(columns)
+            self.audio_indexes[audio_basename] = _AudioIndex(
+                columns,
+                normalize=None if self.case_sensitive else self.normalize)
+        return self.audio_indexes[audio_basename]
+
+
+class _PartialSearchValidator(object):
+    """
+    An incremental version of `SimpleAudioIndexer._partial_search_validator`
+    whose `sub` is fixed (i.e. the query words) and whose `sup` (i.e. the
+    words of the partial result) grows one word at a time via `push`.
+
+    Instead of counting the elements of `sub` and `sup` upon every
+    validation, the counts are updated as words are pushed, so that pushing a
+    word and validating the partial result don't depend on the length of the
+    partial result. Whether a word matches a query word through `anagram`,
+    `subsequence`, `supersequence`, `max_edit_distance` or `phonetic` is
+    determined once per distinct word.
+    """
+
+    def __init__(self, sub, anagram=False, subsequence=False,
+                 supersequence=False, max_edit_distance=0, phonetic=False):
+        """
+        Parameters
+        ----------
+        sub : list
+        anagram : bool, optional
+            Default is `False`
+        subsequence : bool, optional
+            Default is `False`
+        supersequence : bool, optional
+            Default is `False`
+        max_edit_distance : int, optional
+            Default is 0
+        phonetic : bool, optional
+            Default is `False`
+        """
+        self.sub = list(sub)
+        self.sub_counts = Counter(self.sub)
+        self.predicates = [
+            func for pred, func in [
+                (anagram, lambda sub_key, sup_key: (
+                    _anagram_signature(sub_key) ==
+                    _anagram_signature(sup_key))),
+                (subsequence, _is_subsequence),
+                (supersequence, lambda sub_key, sup_key: _is_subsequence(
+                    sup_key, sub_key)),
+                (max_edit_distance > 0, lambda sub_key, sup_key: (
+                    _edit_distance(sub_key, sup_key) <= max_edit_distance)),
+                (phonetic, lambda sub_key, sup_key: (
+                    sub_key == sup_key or
+                    _phonetic_key(sub_key) == _phonetic_key(sup_key) != ""))]
+            if pred]
+        # For every distinct element of `sup`, and for every predicate, a
+        # Counter whose keys are the frequencies (within `sub`) of the
+        # elements of `sub` that satisfy the predicate with that element of
+        # `sup` and whose values are the number of such elements.
+        self._needed_frequencies = dict()
+        self.reset()
+
+    def reset(self):
+        """
+        Empties the partial result.
+        """
+        self.length = 0
+        self.counts = dict()
+        # Number of distinct elements of `sub` whose frequency in `sup` is
+        # still less than their frequency in `sub`.
+        self.missing = len(self.sub_counts)
+        # For every predicate, the number of (sub_key, sup_key) pairs that
+        # satisfy it and the number of such pairs whose sub_key is more
+        # frequent in `sub` than sup_key is in `sup`.
+        self.pairs = [0] * len(self.predicates)
+        self.violations = [0] * len(self.predicates)
+        # Elements of `sup` that are in `sub` and elements of `sub` that are in
+        # `sup`, respectively. Each in its own order.
+        self.sup_in_sub = list()
+        self.sub_in_sup = list()
+        self.ordered = True
+
+    def _get_needed_frequencies(self, element):
+        if element not in self._needed_frequencies:
+            self._needed_frequencies[element] = [
+                Counter(self.sub_counts[sub_key]
+                        for sub_key in self.sub_counts
+                        if func(sub_key, element))
+                for func in self.predicates]
+        return self._needed_frequencies[element]
+
+    def push(self, element):
+        """
+        Appends `element` to the partial result.
+
+        Parameters
+        ----------
+        element : str
+        """
+        self.length += 1
+        count = self.counts.get(element, 0) + 1
+        self.counts[element] = count
+        if len(self.predicates) > 0:
+            needed_frequencies = self._get_needed_frequencies(element)
+            for i, frequencies in enumerate(needed_frequencies):
+                if count == 1:
+                    self.pairs[i] += sum(frequencies.values())
+                    self.violations[i] += sum(
+                        number for frequency, number in frequencies.items()
+                        if frequency > 1)
+                else:
+                    self.violations[i] -= frequencies.get(count, 0)
+        if element in self.sub_counts:
+            if count == self.sub_counts[element]:
+                self.missing -= 1
+            self.sup_in_sub.append(element)
+            if count == 1:
+                self.sub_in_sup = [sub_key for sub_key in self.sub
+                                   if sub_key in self.counts]
+                self.ordered = all(
+                    x1 == x2 for x1, x2 in zip(self.sup_in_sub,
+                                               self.sub_in_sup))
+            elif self.ordered:
+                i = len(self.sup_in_sub) - 1
+                if i < len(self.sub_in_sup):
+                    self.ordered = self.sup_in_sub[i] == self.sub_in_sup[i]
+
+    def is_valid(self):
+        """
+        Returns
+        -------
+        bool
+            Same as the output of `_partial_search_validator` for the words
+            pushed since the last reset.
+        """
+        if len(self.sub) > self.length or not self.ordered:
+            return False
+        if len(self.predicates) > 0:
+            return all(pairs > 0 and violations == 0
+                       for pairs, violations in zip(self.pairs,
+                                                    self.violations))
+        return self.missing == 0
+
+
+# The metadata of an audio file, as probed by `_probe_wav` or
+# `_probe_audio_with_sox`. `duration_seconds` is a float and the rest are
+# ints. `data_offset` (the position of the first frame within the file),
+# `block_align` (the bytes per frame) and `frame_count` are only known for
+# wav files that could be parsed, otherwise they're `None`.
+_AudioMetadata = namedtuple("_AudioMetadata", (
+    "channels", "sample_rate", "sample_bit", "duration_seconds", "bit_rate",
+    "data_offset", "block_align", "frame_count"))
+_RIFF_CHUNK_HEADER = struct.Struct("<4sI")
+_WAVE_FORMAT = struct.Struct("<HHIIHH")
+# PCM and IEEE float. WAVE_FORMAT_EXTENSIBLE (0xFFFE) is resolved to one of
+# them via its sub format.
+_WAVE_FORMAT_TAGS = {1, 3}
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def _probe_wav(audio_abs_path):
+    """
+    Parses the RIFF/WAVE header of an audio file.
+
+    Parameters
+    ----------
+    audio_abs_path : str
+
+    Returns
+    -------
+    _AudioMetadata, None
+        `None` if the file is not an uncompressed wav file.
+    """
+    with open(audio_abs_path, "rb") as f:
+        riff_header = f.read(12)
+        if (len(riff_header) < 12 or riff_header[:4] != b"RIFF" or
+                riff_header[8:] != b"WAVE"):
+            return None
+        wave_format = None
+        while True:
+            chunk_header = f.read(_RIFF_CHUNK_HEADER.size)
+            if len(chunk_header) < _RIFF_CHUNK_HEADER.size:
+                return None
+            chunk_id, chunk_size = _RIFF_CHUNK_HEADER.unpack(chunk_header)
+            if chunk_id == b"fmt ":
+                format_chunk = f.read(chunk_size)
+                if len(format_chunk) < _WAVE_FORMAT.size:
+                    return None
+                wave_format = list(_WAVE_FORMAT.unpack_from(format_chunk))
+                if (wave_format[0] == _WAVE_FORMAT_EXTENSIBLE and
+                        len(format_chunk) >= 26):
+                    # The valid bits per sample and the first two bytes of
+                    # the sub format GUID, which are the format tag.
+                    valid_bits, = struct.unpack_from("<H", format_chunk, 18)
+                    wave_format[0], = struct.unpack_from("<H", format_chunk,
+                                                         24)
+                    wave_format[5] = valid_bits or wave_format[5]
+                f.seek(chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                data_offset = f.tell()
+                # Files that were written as a stream may have a wrong data
+                # size (e.g. 0xFFFFFFFF).
+                data_size = min(chunk_size,
+                                os.fstat(f.fileno()).st_size - data_offset)
+                break
+            else:
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+    if wave_format is None:
+        return None
+    (format_tag, channels, sample_rate, byte_rate, block_align,
+     sample_bit) = wave_format
+    if (format_tag not in _WAVE_FORMAT_TAGS or sample_rate == 0 or
+            block_align == 0):
+        return None
+    frame_count = data_size // block_align
+    return _AudioMetadata(
+        channels=channels, sample_rate=sample_rate, sample_bit=sample_bit,
+        duration_seconds=frame_count / sample_rate, bit_rate=byte_rate * 8,
+        data_offset=data_offset, block_align=block_align,
+        frame_count=frame_count)
+
+
+def _read_wav_format_chunk(f, data_offset):
+    """
+    Parameters
+    ----------
+    f : file
+        A wav file that `_probe_wav` could parse, opened in binary mode.
+    data_offset : int
+
+    Returns
+    -------
+    bytes
+        The body of its `fmt ` chunk.
+    """
+    f.seek(12)
+    while f.tell() < data_offset:
+        chunk_id, chunk_size = _RIFF_CHUNK_HEADER.unpack(
+            f.read(_RIFF_CHUNK_HEADER.size))
+        if chunk_id == b"fmt ":
+            return f.read(chunk_size)
+        f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+    raise ValueError("No fmt chunk before the data chunk")
+
+
+def _wav_header(format_chunk, data_size):
+    """
+    Parameters
+    ----------
+    format_chunk : bytes
+        The body of a `fmt ` chunk.
+    data_size : int
+        The size of the data chunk's body.
+
+    Returns
+    -------
+    bytes
+        The RIFF/WAVE header of a wav file whose only chunks are `fmt ` and
+        `data`, up to the body of its data chunk.
+    """
+    format_padding = b"\0" * (len(format_chunk) % 2)
+    riff_size = (4 + _RIFF_CHUNK_HEADER.size + len(format_chunk) +
+                 len(format_padding) + _RIFF_CHUNK_HEADER.size + data_size +
+                 data_size % 2)
+    return b"".join([
+        _RIFF_CHUNK_HEADER.pack(b"RIFF", riff_size), b"WAVE",
+        _RIFF_CHUNK_HEADER.pack(b"fmt ", len(format_chunk)), format_chunk,
+        format_padding, _RIFF_CHUNK_HEADER.pack(b"data", data_size)])
+
+
+# The ioctl request that clones a file (i.e. makes a copy on write reflink of
+# it) on Linux file systems that support it, e.g. btrfs and xfs.
+_FICLONE = 0x40049409
+
+
+def _remove_if_exists(file_abs_path):
+    """
+    Parameters
+    ----------
+    file_abs_path : str
+    """
+    try:
+        os.remove(file_abs_path)
+    except OSError:
+        pass
+
+
+def _link_or_copy(src_abs_path, dst_abs_path):
+    """
+    Makes `dst_abs_path` have the contents of `src_abs_path`, without copying
+    them if possible. It's hard linked if they're on the same file system,
+    otherwise it's reflinked if the file system supports it and only
+    otherwise it's copied.
+
+    Since `dst_abs_path` may share its data with `src_abs_path`, it must not
+    be written into. It's replaced if it exists, for the same reason.
+
+    Parameters
+    ----------
+    src_abs_path : str
+    dst_abs_path : str
+
+    Returns
+    -------
+    {"link", "reflink", "copy"}
+        How it was made.
+    """
+    _remove_if_exists(dst_abs_path)
+    try:
+        os.link(src_abs_path, dst_abs_path)
+        return "link"
+    except (AttributeError, OSError):
+        # Python 2 has no os.link on Windows.
+        pass
+    if fcntl is not None and sys.platform.startswith("linux"):
+        try:
+            with open(src_abs_path, "rb") as src_file:
+                with open(dst_abs_path, "wb") as dst_file:
+                    fcntl.ioctl(dst_file.fileno(), _FICLONE,
+                                src_file.fileno())
+            return "reflink"
+        except (IOError, OSError):
+            _remove_if_exists(dst_abs_path)
+    copyfile(src_abs_path, dst_abs_path)
+    return "copy"
+
+
+def _free_bytes(dir_abs_path):
+    """
+    Parameters
+    ----------
+    dir_abs_path : str
+
+    Returns
+    -------
+    int, None
+        The bytes available to unprivileged users on the file system of
+        `dir_abs_path`. `None` if it can't be found out.
+    """
+    try:
+        stat = os.statvfs(dir_abs_path)
+        return stat.f_bavail * stat.f_frsize
+    except (AttributeError, OSError):
+        # Windows has no os.statvfs.
+        pass
+    try:
+        from shutil import disk_usage
+        return disk_usage(dir_abs_path).free
+    except (ImportError, OSError):
+        return None
+
+
+# The size of the blocks in which `_split_wav` copies the frames.
+_SPLIT_BUFFER_BYTES = 1024 * 1024
+
+
+def _split_wav(audio_abs_path, results_abs_path, duration_seconds, metadata):
+    """
+    Splits a wav file into splits of `duration_seconds` (except possibly the
+    last one, which will be shorter), within a single sequential read of it.
+    The splits start at frame boundaries.
+
+    Parameters
+    ----------
+    audio_abs_path : str
+    results_abs_path : str
+        Has a `*` which is replaced by the number of each split.
+    duration_seconds : float
+    metadata : _AudioMetadata
+        The metadata of the file, as probed by `_probe_wav`.
+
+    Returns
+    -------
+    [(str, float, float)]
+        The path of every split, the second of the audio file in which it
+        starts and its duration in seconds.
+    """
+    frames_per_split = max(1, int(duration_seconds * metadata.sample_rate))
+    splits = list()
+    with open(audio_abs_path, "rb") as f:
+        format_chunk = _read_wav_format_chunk(f, metadata.data_offset)
+        f.seek(metadata.data_offset)
+        for split_number, first_frame in enumerate(
+                range(0, max(metadata.frame_count, 1), frames_per_split)):
+            frame_count = min(frames_per_split,
+                              metadata.frame_count - first_frame)
+            split_abs_path = results_abs_path.replace(
+                "*", "{:03d}".format(split_number))
+            data_size = frame_count * metadata.block_align
+            # The split may be a link to another file (see `_link_or_copy`),
+            # which mustn't be written into.
+            _remove_if_exists(split_abs_path)
+            with open(split_abs_path, "wb") as split_file:
+                split_file.write(_wav_header(format_chunk, data_size))
+                remaining = data_size
+                while remaining > 0:
+                    block = f.read(min(remaining, _SPLIT_BUFFER_BYTES))
+                    split_file.write(block)
+                    remaining -= len(block)
+                split_file.write(b"\0" * (data_size % 2))
+            splits.append((split_abs_path,
+                           first_frame / metadata.sample_rate,
+                           frame_count / metadata.sample_rate))
+    return splits
+
+
+def _probe_audio_with_sox(audio_abs_path):
+    """
+    Parses the output of `sox --i`, for the formats that `_probe_wav` can't
+    parse.
+
+    Parameters
+    ----------
+    audio_abs_path : str
+
+    Returns
+    -------
+    _AudioMetadata
+    """
+    info = dict()
+    for line in subprocess.check_output(
+            ["sox", "--i", str(audio_abs_path)],
+            universal_newlines=True).splitlines():
+        if ":" in line:
+            key, value = line.split(":", 1)
+            info[key.strip()] = value.strip()
+    total_seconds = sum(
+        [float(x) * 60 ** (2 - i)
+         for i, x in enumerate(info["Duration"].split("=")[0].strip().split(
+             ":"))])
+    bit_rate_formatted = info["Bit Rate"]
+    bit_rate = (lambda x:
+                float(x[:-1]) * 10 ** 3 if x[-1].lower() == "k" else
+                float(x[:-1]) * 10 ** 6 if x[-1].lower() == "m" else
+                float(x[:-1]) * 10 ** 9 if x[-1].lower() == "g" else
+                float(x))(bit_rate_formatted)
+    return _AudioMetadata(
+        channels=int(info["Channels"]),
+        sample_rate=int(info["Sample Rate"]),
+        sample_bit=int(info["Precision"].split("-")[0]),
+        duration_seconds=total_seconds, bit_rate=int(bit_rate),
+        data_offset=None, block_align=None, frame_count=None)
+
+
+def _assign_word_alternatives(timestamps, word_alternatives):
+    """
+    Assigns the word alternatives of Watson's time slots to the words whose
+    time overlaps them, since the boundaries of a slot don't necessarily
+    match those of a single word. A word overlaps a slot if at least half of
+    the shorter of the two is within the other one. A slot that overlaps no
+    word is assigned to the word whose start is the nearest to its start.
+
+    Parameters
+    ----------
+    timestamps : [[str, numeric, numeric]]
+        The words of a result, of the form [word, start_time, end_time].
+    word_alternatives : [{str: numeric or [{str: str or numeric}]}]
+        The time slots of the result, of the form {"start_time": numeric,
+        "end_time": numeric, "alternatives": [{"word": str, "confidence":
+        numeric}]}.
+
+    Returns
+    -------
+    [[(str, float)]]
+        Parallel to `timestamps`, the alternative words and their
+        confidences of every word, excluding the word itself. An alternative
+        that's in more than one of its slots is only kept once.
+    """
+    intervals = [(float(word_block[1]), float(word_block[2]))
+                 for word_block in timestamps]
+    alternatives_of = [list() for _ in timestamps]
+    for slot in word_alternatives:
+        if len(intervals) == 0:
+            break
+        slot_start = float(slot['start_time'])
+        slot_end = float(slot['end_time'])
+        positions = list()
+        for position, (start, end) in enumerate(intervals):
+            overlap = min(end, slot_end) - max(start, slot_start)
+            # Slightly misaligned boundaries mustn't make the neighbors of a
+            # word share its alternatives.
+            if overlap > 0 and 2 * overlap >= min(end - start,
+                                                  slot_end - slot_start):
+                positions.append(position)
+        if len(positions) == 0:
+            positions = [min(range(len(intervals)), key=lambda position: (
+                abs(intervals[position][0] - slot_start)))]
+        for position in positions:
+            alternatives_of[position].extend(
+                (word_alternative['word'],
+                 float(word_alternative['confidence']))
+                for word_alternative in slot['alternatives'])
+    word_alternatives_of = list()
+    for word_block, alternatives in zip(timestamps, alternatives_of):
+        seen_words = set([word_block[0]])
+        word_alternatives_of.append(list())
+        for word, confidence in alternatives:
+            if word not in seen_words:
+                seen_words.add(word)
+                word_alternatives_of[-1].append((word, confidence))
+    return word_alternatives_of
 
 
 class _Subdirectory_Managing_Decorator(ContextDecorator):
 
-        def __init__(self, src_dir, needed_directories):
-            self.src_dir = src_dir
-            self.needed_directories = needed_directories
+        def __init__(self, indexer, basename=None):
+            self.indexer = indexer
+            self.basename = basename
+            self.made = False
 
         def __enter__(self):
             """
-            Creates the needed directories for audio processing.
+            Creates the needed directories for audio processing, unless the
+            indexer has already made them in an enclosing context.
             """
-            if self.src_dir is not None:
-                for directory in self.needed_directories:
-                    if not os.path.exists("{}/{}".format(
-                            self.src_dir, directory)):
-                        os.mkdir("{}/{}".format(self.src_dir, directory))
+            self.made = self.indexer._make_needed_directories(self.basename)
             return self
 
         def __exit__(self, *args):
             """
             Removes the works of __enter__.
             """
-            if self.src_dir is not None:
-                for directory in self.needed_directories:
-                    if os.path.exists("{}/{}".format(self.src_dir, directory)):
-                        rmtree("{}/{}".format(self.src_dir, directory))
+            if self.made:
+                self.indexer._remove_needed_directories()
 
 
 class SimpleAudioIndexer(object):
@@ -172,6 +3381,10 @@ class SimpleAudioIndexer(object):
         Absolute path to the source directory of audio files such that the
         absolute path of the audio that'll be indexed would be
         `src_dir/audio_file.wav`
+    scratch_dir :  str, None
+        Absolute path to the directory in which the needed directories are
+        made, within a unique subdirectory per run. `None` means they're
+        made directly within `src_dir`.
     verbose :  bool, optional
         `True` if progress needs to be printed. Default is `False`.
     ibm_api_limit_bytes :  int, optional
@@ -211,21 +3424,30 @@ class SimpleAudioIndexer(object):
     load_indexed_audio(indexed_audio_file_abs_path)
     search_gen(query, audio_basename=None, case_sensitive=False,
                subsequence=False, supersequence=False, timing_error=0.0,
-               anagram=False, missing_word_tolerance=0)
+               anagram=False, missing_word_tolerance=0, time_range=None,
+               max_edit_distance=0, phonetic=False, min_confidence=None,
+               alternatives=False)
         A generator which returns a valid search result at each iteraiton.
+    search_top(query, top_k=10, **search_gen_kwargs)
+        Returns the `top_k` results of `search_gen` which have the highest
+        confidence.
     search_all(queries, audio_basename=None, case_sensitive=False,
                subsequence=False, supersequence=False, timing_error=0.0,
-               anagram=False, missing_word_tolerance=0)
+               anagram=False, missing_word_tolerance=0, time_range=None,
+               workers=None, max_edit_distance=0, phonetic=False,
+               min_confidence=None, alternatives=False)
         Returns a dictionary of all results of all of the queries for either
         all of the audio files or the `audio_basename`.
-    search_regexp(pattern, audio_basename=None)
+    search_regexp(pattern, audio_basename=None, time_range=None,
+                  workers=None)
         Returns a dictionary of all results which matched `pattern` for either
         all of the audio files or the `auio_basename`
     """
 
     def __init__(self, src_dir, mode, username_ibm=None, password_ibm=None,
                  ibm_api_limit_bytes=100000000, verbose=False,
-                 needed_directories={"filtered", "staging"}):
+                 needed_directories={"filtered", "staging"},
+                 scratch_dir=None):
         """
         Parameters
         ----------
@@ -247,6 +3469,18 @@ class SimpleAudioIndexer(object):
             default is 100000000
         verbose : bool, optional
             default is False
+        needed_directories : {str}, optional
+            The subdirectories in which the audio files are processed before
+            being indexed. Default is {"filtered", "staging"}
+        scratch_dir : str, None, optional
+            Absolute path to a directory, e.g. `/dev/shm` or a local disk, in
+            which a unique subdirectory is made per run to hold the
+            `needed_directories`, so that the processing doesn't happen on
+            the file system of `src_dir` and concurrent runs don't collide.
+            If it doesn't have enough free space for the audio files, the
+            subdirectory is made within `src_dir` instead. Default is
+            `None`, which means the `needed_directories` are made directly
+            within `src_dir`.
         """
         assert mode.lower() in {"ibm", "cmu"}, (
             "Mode has to be either `cmu` or `ibm`")
@@ -264,20 +3498,43 @@ class SimpleAudioIndexer(object):
             src_dir = src_dir[:-1]
 
         self.src_dir = src_dir
+        if scratch_dir is not None:
+            assert os.path.isdir(scratch_dir), (
+                "Provided scratch path isn't a directory")
+        self.scratch_dir = scratch_dir
+        # _work_dir is where the needed directories are. It's src_dir unless
+        # a scratch subdirectory has been made for the current run.
+        self._work_dir = src_dir
         self.__username_ibm = username_ibm
         self.__password_ibm = password_ibm
         self.verbose = verbose
         self.ibm_api_limit_bytes = ibm_api_limit_bytes
-        # __timestamps is for the regulated valid timestamps. Its values is
-        # a single list that contains WordBlocks. The timing of WordBlocks
-        # is calculated with respect to the entire audio file.
-        self.__timestamps = _PrettyDefaultDict(list)
+        # __timestamps is for the regulated valid timestamps. Its values are
+        # _TimestampColumns which behave like a single list that contains
+        # WordBlocks. The timing of WordBlocks is calculated with respect to
+        # the entire audio file.
+        self.__timestamps = _PrettyDefaultDict(_TimestampColumns)
         # __timestamps_unregulated is for the intermediary processing. Its
         # values is a list that contains other lists (as many as the splitted
         # files in the staged directory) and those lists contain WordBlocks.
         # The timing of WordBlocks is calculated with respect to the audio
         # split.
         self.__timestamps_unregulated = _PrettyDefaultDict(list)
+        # __inverted_indexes caches the inverted indexes of the regulated
+        # timestamps. Its keys are `case_sensitive` values and its values are
+        # _InvertedIndex instances. It must be reset whenever __timestamps
+        # changes.
+        self.__inverted_indexes = dict()
+        # __journal is the _Journal to which newly regulated timestamps are
+        # appended, if one is opened via `open_journal`.
+        self.__journal = None
+        # __audio_metadata caches the metadata of audio files. Its keys are
+        # their paths and its values are ((size, mtime), _AudioMetadata).
+        self.__audio_metadata = dict()
+        # __split_manifest is filled by the staging step. Its keys are audio
+        # file basenames and its values are lists of (staged split basename,
+        # starting second, duration in seconds) of their splits.
+        self.__split_manifest = dict()
         self.__errors = dict()
         self._needed_directories = needed_directories
 
@@ -286,11 +3543,7 @@ class SimpleAudioIndexer(object):
         Creates the needed directories for audio processing. Will only be
         called if the instance is initialized within a context manager.
         """
-        if self.src_dir is not None:
-            for directory in self._needed_directories:
-                if not os.path.exists("{}/{}".format(
-                        self.src_dir, directory)):
-                    os.mkdir("{}/{}".format(self.src_dir, directory))
+        self._make_needed_directories()
         return self
 
     def __exit__(self, *args):
@@ -298,10 +3551,71 @@ class SimpleAudioIndexer(object):
         Removes the works of __enter__. Will only be called if the instance is
         initialized within a context manager.
         """
-        if self.src_dir is not None:
+        self._remove_needed_directories()
+
+    def _make_needed_directories(self, basename=None):
+        """
+        Creates the needed directories for audio processing, either within
+        `src_dir` or within a unique subdirectory of `scratch_dir`. The
+        latter is made within `src_dir` instead if the free space of
+        `scratch_dir` is less than twice the size of the audio files, as
+        both of the filtered and staged files may be there at once.
+
+        Parameters
+        ----------
+        basename : str, None
+            The audio file that'll be processed. If `None` or if it isn't
+            found, all of the audio files of `src_dir` are accounted for.
+
+        Returns
+        -------
+        bool
+            `False` if a scratch subdirectory had already been made, in
+            which case nothing is done.
+        """
+        if self.src_dir is None:
+            return False
+        if self.scratch_dir is None:
+            for directory in self._needed_directories:
+                if not os.path.exists("{}/{}".format(
+                        self.src_dir, directory)):
+                    os.mkdir("{}/{}".format(self.src_dir, directory))
+            return True
+        if self._work_dir != self.src_dir:
+            return False
+        audio_basenames = self._list_audio_files()
+        if basename in audio_basenames:
+            audio_basenames = [basename]
+        needed_bytes = 2 * sum(
+            os.path.getsize("{}/{}".format(self.src_dir, audio_basename))
+            for audio_basename in audio_basenames)
+        free_bytes = _free_bytes(self.scratch_dir)
+        scratch_root = self.scratch_dir
+        if (free_bytes is not None and free_bytes < needed_bytes and
+                os.access(self.src_dir, os.W_OK)):
+            if self.get_verbosity():
+                print(("{} has {} free bytes, {} are needed. Falling back "
+                       "to {}").format(self.scratch_dir, free_bytes,
+                                       needed_bytes, self.src_dir))
+            scratch_root = self.src_dir
+        self._work_dir = tempfile.mkdtemp(prefix=".sai-", dir=scratch_root)
+        for directory in self._needed_directories:
+            os.mkdir("{}/{}".format(self._work_dir, directory))
+        return True
+
+    def _remove_needed_directories(self):
+        """
+        Removes the works of `_make_needed_directories`.
+        """
+        if self.src_dir is None:
+            return
+        if self.scratch_dir is None:
             for directory in self._needed_directories:
                 if os.path.exists("{}/{}".format(self.src_dir, directory)):
                     rmtree("{}/{}".format(self.src_dir, directory))
+        elif self._work_dir != self.src_dir:
+            rmtree(self._work_dir, ignore_errors=True)
+            self._work_dir = self.src_dir
 
     def get_mode(self):
         """
@@ -389,16 +3703,48 @@ class SimpleAudioIndexer(object):
     def get_timestamps(self):
         """
         Returns a dictionary whose keys are audio file basenames and whose
-        values are a list of word blocks.
+        values are a list of word blocks. The lists are columnar (see
+        `_TimestampColumns`) and word blocks are created as they're accessed.
         In case the audio file was large enough to be splitted, it adds seconds
         to correct timing and in case the timestamp was manually loaded, it
         leaves it alone.
 
         Returns
         -------
-        {str: [[str, float, float]]}
+        {str: [[str, float, float]]}
+        """
+        return self.__timestamps
+
+    def words_between(self, audio_basename, start=None, end=None):
+        """
+        Returns the word blocks of an audio file whose starting second is
+        within the given time range (inclusive).
+
+        Parameters
+        ----------
+        audio_basename : str
+        start : float, None, optional
+            `None` means from the beginning of the audio.
+
+            Default is `None`
+        end : float, None, optional
+            `None` means until the end of the audio.
+
+            Default is `None`
+
+        Returns
+        -------
+        [[str, float, float]]
+            An empty list if there's no timestamp for `audio_basename`.
         """
-        return self.__timestamps
+        timestamps = self.get_timestamps()
+        if audio_basename not in timestamps:
+            return []
+        columns = timestamps[audio_basename]
+        if not isinstance(columns, _TimestampColumns):
+            columns = _TimestampColumns(columns)
+        lo, hi = columns.get_positions_between(start, end)
+        return columns[lo:hi]
 
     def get_errors(self):
         """
@@ -415,6 +3761,32 @@ class SimpleAudioIndexer(object):
         """
         return self.__errors
 
+    def _reset_search_indexes(self):
+        """
+        Discards whatever has been derived from the regulated timestamps for
+        searching. Must be called whenever the regulated timestamps change.
+        """
+        self.__inverted_indexes = dict()
+
+    def _get_inverted_index(self, case_sensitive=False):
+        """
+        Builds the inverted index of the regulated timestamps if it's not
+        already built.
+
+        Parameters
+        ----------
+        case_sensitive : bool, optional
+            Default is `False`
+
+        Returns
+        -------
+        _InvertedIndex
+        """
+        if case_sensitive not in self.__inverted_indexes:
+            self.__inverted_indexes[case_sensitive] = _InvertedIndex(
+                self.get_timestamps(), case_sensitive=case_sensitive)
+        return self.__inverted_indexes[case_sensitive]
+
     def _list_audio_files(self, sub_dir=""):
         """
         Parameters
@@ -429,13 +3801,36 @@ class SimpleAudioIndexer(object):
             formats are `wav`
         """
         audio_files = list()
-        for possibly_audio_file in os.listdir("{}/{}".format(self.src_dir,
-                                                             sub_dir)):
+        for possibly_audio_file in os.listdir("{}/{}".format(
+                self._work_dir if sub_dir else self.src_dir, sub_dir)):
             file_format = ''.join(possibly_audio_file.split('.')[-1])
             if file_format.lower() == "wav":
                 audio_files.append(possibly_audio_file)
         return audio_files
 
+    def _get_audio_metadata(self, audio_abs_path):
+        """
+        Probes the audio file in-process if it's a wav file (see `_probe_wav`)
+        and via sox otherwise. The metadata is cached per path until the file
+        changes.
+
+        Parameters
+        ----------
+        audio_abs_path : str
+
+        Returns
+        -------
+        _AudioMetadata
+        """
+        file_stat = os.stat(audio_abs_path)
+        version = (file_stat.st_size, file_stat.st_mtime)
+        if (audio_abs_path not in self.__audio_metadata or
+                self.__audio_metadata[audio_abs_path][0] != version):
+            self.__audio_metadata[audio_abs_path] = (version, (
+                _probe_wav(audio_abs_path) or
+                _probe_audio_with_sox(audio_abs_path)))
+        return self.__audio_metadata[audio_abs_path][1]
+
     def _get_audio_channels(self, audio_abs_path):
         """
         Parameters
@@ -446,12 +3841,7 @@ class SimpleAudioIndexer(object):
         -------
         channel_num : int
         """
-        channel_num = int(
-            subprocess.check_output(
-                ("""sox --i {} | grep "{}" | awk -F " : " '{{print $2}}'"""
-                 ).format(audio_abs_path, "Channels"),
-                shell=True, universal_newlines=True).rstrip())
-        return channel_num
+        return self._get_audio_metadata(audio_abs_path).channels
 
     def _get_audio_sample_rate(self, audio_abs_path):
         """
@@ -463,12 +3853,7 @@ class SimpleAudioIndexer(object):
         -------
         sample_rate : int
         """
-        sample_rate = int(
-           subprocess.check_output(
-               ("""sox --i {} | grep "{}" | awk -F " : " '{{print $2}}'"""
-                ).format(audio_abs_path, "Sample Rate"),
-               shell=True, universal_newlines=True).rstrip())
-        return sample_rate
+        return self._get_audio_metadata(audio_abs_path).sample_rate
 
     def _get_audio_sample_bit(self, audio_abs_path):
         """
@@ -480,12 +3865,7 @@ class SimpleAudioIndexer(object):
         -------
         sample_bit : int
         """
-        sample_bit = int(
-           subprocess.check_output(
-               ("""sox --i {} | grep "{}" | awk -F " : " '{{print $2}}' | """
-                """grep -oh "^[^-]*" """).format(audio_abs_path, "Precision"),
-               shell=True, universal_newlines=True).rstrip())
-        return sample_bit
+        return self._get_audio_metadata(audio_abs_path).sample_bit
 
     def _get_audio_duration_seconds(self, audio_abs_path):
         """
@@ -495,17 +3875,9 @@ class SimpleAudioIndexer(object):
 
         Returns
         -------
-        total_seconds : int
-        """
-        HHMMSS_duration = subprocess.check_output(
-            ("""sox --i {} | grep "{}" | awk -F " : " '{{print $2}}' | """
-             """grep -oh "^[^=]*" """).format(
-                audio_abs_path, "Duration"),
-            shell=True, universal_newlines=True).rstrip()
-        total_seconds = sum(
-            [float(x) * 60 ** (2 - i)
-             for i, x in enumerate(HHMMSS_duration.split(":"))])
-        return total_seconds
+        total_seconds : float
+        """
+        return self._get_audio_metadata(audio_abs_path).duration_seconds
 
     def _get_audio_bit_rate(self, audio_abs_path):
         """
@@ -517,16 +3889,7 @@ class SimpleAudioIndexer(object):
         -------
         bit_rate : int
         """
-        bit_Rate_formatted = subprocess.check_output(
-            """sox --i {} | grep "{}" | awk -F " : " '{{print $2}}'""".format(
-                audio_abs_path, "Bit Rate"),
-            shell=True, universal_newlines=True).rstrip()
-        bit_rate = (lambda x:
-                    int(x[:-1]) * 10 ** 3 if x[-1].lower() == "k" else
-                    int(x[:-1]) * 10 ** 6 if x[-1].lower() == "m" else
-                    int(x[:-1]) * 10 ** 9 if x[-1].lower() == "g" else
-                    int(x))(bit_Rate_formatted)
-        return bit_rate
+        return self._get_audio_metadata(audio_abs_path).bit_rate
 
     def _seconds_to_HHMMSS(seconds):
         """
@@ -565,8 +3928,12 @@ class SimpleAudioIndexer(object):
     def _split_audio_by_duration(self, audio_abs_path,
                                  results_abs_path, duration_seconds):
         """
-        Calculates the length of each segment and passes it to
-        self._audio_segment_extractor
+        Splits the audio file into segments of `duration_seconds` (except
+        possibly the last one, which will be shorter).
+
+        Wav files are split in-process within a single read (see
+        `_split_wav`). Otherwise, each segment is passed to
+        `self._audio_segment_extractor`.
 
         Parameters
         ----------
@@ -576,21 +3943,30 @@ class SimpleAudioIndexer(object):
             decleration i.e. name%03.wav. Here, we've added `*` at staging
             step, which we'll replace.
         duration_seconds : int
+
+        Returns
+        -------
+        [(str, float, float)]
+            The path of every segment, the second of the audio file in which
+            it starts and its duration in seconds.
         """
-        total_seconds = self._get_audio_duration_seconds(audio_abs_path)
-        current_segment = 0
-        while current_segment <= total_seconds // duration_seconds + 1:
-            if current_segment + duration_seconds > total_seconds:
-                ending_second = total_seconds
-            else:
-                ending_second = current_segment + duration_seconds
+        metadata = self._get_audio_metadata(audio_abs_path)
+        if metadata.data_offset is not None:
+            return _split_wav(audio_abs_path, results_abs_path,
+                              duration_seconds, metadata)
+        total_seconds = metadata.duration_seconds
+        segments = list()
+        for segment_number in range(
+                max(1, int(ceil(total_seconds / duration_seconds)))):
+            starting_second = segment_number * duration_seconds
+            duration = min(duration_seconds, total_seconds - starting_second)
+            segment_abs_path = results_abs_path.replace(
+                "*", "{:03d}".format(segment_number))
             self._audio_segment_extractor(
-                audio_abs_path,
-                results_abs_path.replace("*", "{:03d}".format(
-                    current_segment)),
-                starting_second=current_segment, duration=(ending_second -
-                                                           current_segment))
-            current_segment += 1
+                audio_abs_path, segment_abs_path,
+                starting_second=starting_second, duration=duration)
+            segments.append((segment_abs_path, starting_second, duration))
+        return segments
 
     def _split_audio_by_size(self, audio_abs_path, results_abs_path,
                              chunk_size):
@@ -607,19 +3983,31 @@ class SimpleAudioIndexer(object):
             decleration i.e. name%03.wav
         chunk_size : int
             Should be in bytes
+
+        Returns
+        -------
+        [(str, float, float)]
+            Same as `_split_audio_by_duration`.
         """
-        sample_rate = self._get_audio_sample_rate(audio_abs_path)
-        sample_bit = self._get_audio_sample_bit(audio_abs_path)
-        channel_num = self._get_audio_channels(audio_abs_path)
-        duration = 8 * chunk_size / reduce(lambda x, y: int(x) * int(y),
-                                           [sample_rate, sample_bit,
-                                            channel_num])
-        self._split_audio_by_duration(audio_abs_path, results_abs_path,
-                                      duration)
+        metadata = self._get_audio_metadata(audio_abs_path)
+        if metadata.block_align is not None:
+            # The frames of wav files may be padded beyond their sample bits.
+            duration = chunk_size / (metadata.block_align *
+                                     metadata.sample_rate)
+        else:
+            sample_rate = self._get_audio_sample_rate(audio_abs_path)
+            sample_bit = self._get_audio_sample_bit(audio_abs_path)
+            channel_num = self._get_audio_channels(audio_abs_path)
+            duration = 8 * chunk_size / reduce(lambda x, y: int(x) * int(y),
+                                               [sample_rate, sample_bit,
+                                                channel_num])
+        return self._split_audio_by_duration(audio_abs_path,
+                                             results_abs_path, duration)
 
     def _filtering_step(self, basename):
         """
         Moves the audio file if the format is `wav` to `filtered` directory.
+        It's linked rather than copied if possible (see `_link_or_copy`).
 
         Parameters
         ----------
@@ -632,10 +4020,9 @@ class SimpleAudioIndexer(object):
         if basename.split('.')[-1] == "wav":
             if self.get_verbosity():
                 print("Found wave! Copying to {}/filtered/{}".format(
-                    self.src_dir, basename))
-            subprocess.Popen(["cp", "{}/{}.wav".format(self.src_dir, name),
-                              "{}/filtered/{}.wav".format(self.src_dir, name)],
-                             universal_newlines=True).communicate()
+                    self._work_dir, basename))
+            _link_or_copy("{}/{}.wav".format(self.src_dir, name),
+                          "{}/filtered/{}.wav".format(self._work_dir, name))
 
     def _staging_step(self, basename):
         """
@@ -656,24 +4043,28 @@ class SimpleAudioIndexer(object):
             # Checks the file size. It's better to use 95% of the allocated
             # size per file since the upper limit is not always respected.
             total_size = os.path.getsize("{}/filtered/{}.wav".format(
-                self.src_dir, name))
+                self._work_dir, name))
             if total_size >= self.ibm_api_limit_bytes:
                 if self.get_verbosity():
                     print(("{}'s size over API limit ({}). Splitting").format(
                         name, self.ibm_api_limit_bytes))
-                self._split_audio_by_size(
-                    "{}/filtered/{}.wav".format(self.src_dir, name),
-                    "{}/staging/{}*.wav".format(self.src_dir, name),
+                splits = self._split_audio_by_size(
+                    "{}/filtered/{}.wav".format(self._work_dir, name),
+                    "{}/staging/{}*.wav".format(self._work_dir, name),
                     self.ibm_api_limit_bytes * 95 / 100)
+                self.__split_manifest["{}.wav".format(name)] = [
+                    (os.path.basename(split_abs_path), split_offset,
+                     split_duration)
+                    for split_abs_path, split_offset, split_duration in
+                    splits]
             else:
                 if self.get_verbosity():
                     print("{}'s size is fine. Moving to staging dir'".format(
                         name))
-                subprocess.Popen((
-                    "mv {}/filtered/{}.wav {}/staging/{}000.wav").format(
-                                    self.src_dir, name, self.src_dir, name),
-                                 shell=True,
-                                 universal_newlines=True).communicate()
+                _remove_if_exists("{}/staging/{}000.wav".format(
+                    self._work_dir, name))
+                move("{}/filtered/{}.wav".format(self._work_dir, name),
+                     "{}/staging/{}000.wav".format(self._work_dir, name))
 
         elif self.get_mode() == "cmu":
             if self.get_verbosity():
@@ -683,6 +4074,10 @@ class SimpleAudioIndexer(object):
             if ffmpeg is None:
                 raise Exception(("Either ffmpeg or avconv is needed. "
                                  "Neither is installed or accessible"))
+            # The output may be a link to another file (see `_link_or_copy`),
+            # which mustn't be written into.
+            _remove_if_exists("{}/staging/{}000.wav".format(
+                self._work_dir, name))
             try:
                 # ffmpeg log levels:
                 # https://ffmpeg.org/ffmpeg.html#Generic-options
@@ -691,23 +4086,21 @@ class SimpleAudioIndexer(object):
                     ffmpeg_log_level = "32"  # info `default for ffmpeg`
                 subprocess.check_call([
                     str(ffmpeg), "-y", "-i", "{}/filtered/{}.wav".format(
-                        self.src_dir, str(name)), "-acodec", "pcm_s16le",
+                        self._work_dir, str(name)), "-acodec", "pcm_s16le",
                     "-ac", "1", "-ar", "16000", "{}/staging/{}000.wav".format(
-                        self.src_dir, name),
+                        self._work_dir, name),
                     "-v", ffmpeg_log_level], universal_newlines=True)
             except subprocess.CalledProcessError as e:
                 print(e)
             if os.path.exists("{}/staging/{}000.wav".format(
-                    self.src_dir, name)):
+                    self._work_dir, name)):
                 if self.get_verbosity():
                     print(("{}/filtered/{} was converted to "
                            "{}/staging/{}000.wav Now removing the copy of "
                            "{} in filtered sub directory").format(
-                                self.src_dir, basename,
-                                self.src_dir, name, basename))
-                subprocess.Popen([
-                    "rm", "{}/filtered/{}".format(self.src_dir, basename)],
-                                    universal_newlines=True).communicate()
+                                self._work_dir, basename,
+                                self._work_dir, name, basename))
+                os.remove("{}/filtered/{}".format(self._work_dir, basename))
             else:
                 raise Exception("Something went wrong with ffmpeg conversion!")
 
@@ -727,6 +4120,7 @@ class SimpleAudioIndexer(object):
                 if self.get_verbosity():
                     print("File specified was already indexed. Reindexing...")
                 del self.__timestamps[basename]
+                self._reset_search_indexes()
             self._filtering_step(basename)
             self._staging_step(basename)
         else:
@@ -737,6 +4131,7 @@ class SimpleAudioIndexer(object):
                             print("Already indexed {}. Reindexing...".format(
                                 audio_basename))
                         del self.__timestamps[audio_basename]
+                        self._reset_search_indexes()
                     else:
                         if self.get_verbosity():
                             print("Already indexed {}. Skipping...".format(
@@ -775,7 +4170,7 @@ class SimpleAudioIndexer(object):
             pocketsphinx_command = ''.join([
                 "pocketsphinx_continuous", "-infile",
                 str("{}/staging/{}".format(
-                    self.src_dir, staging_audio_basename)),
+                    self._work_dir, staging_audio_basename)),
                 "-time", "yes", "-logfn", "/dev/null"])
             try:
                 if self.get_verbosity():
@@ -783,7 +4178,7 @@ class SimpleAudioIndexer(object):
                 output = subprocess.check_output([
                     "pocketsphinx_continuous", "-infile",
                     str("{}/staging/{}".format(
-                        self.src_dir, staging_audio_basename)),
+                        self._work_dir, staging_audio_basename)),
                     "-time", "yes", "-logfn", "/dev/null"
                 ], universal_newlines=True).split('\n')
                 str_timestamps_with_sil_conf = list(map(
@@ -817,7 +4212,9 @@ class SimpleAudioIndexer(object):
 
         Returns
         -------
-        timestamps : [[str, float, float]]
+        timestamps : [_WordBlock]
+            The confidence of a word block is the posterior probability of its
+            word, clamped to [0, 1].
         """
         filter_untimed = filter(lambda x: len(x) == 4,
                                 str_timestamps_with_sil_conf)
@@ -826,7 +4223,7 @@ class SimpleAudioIndexer(object):
                 (time(), staging_audio_basename)
             ] = str_timestamps_with_sil_conf
         str_timestamps = [
-            str_timestamp[:-1]
+            str_timestamp
             for str_timestamp in filter_untimed
             if not any([letter in {"<", ">", "/"}
                         for letter in ''.join(str_timestamp)])]
@@ -834,7 +4231,8 @@ class SimpleAudioIndexer(object):
             _WordBlock(
                 word=re.findall("^[^\(]+", x[0])[0],
                 start=round(float(x[1]), 2),
-                end=round(float(x[2]), 2)
+                end=round(float(x[2]), 2),
+                confidence=_clamp_confidence(float(x[3]))
             ) for x in str_timestamps])
         return timestamps
 
@@ -927,12 +4325,14 @@ class SimpleAudioIndexer(object):
         self._prepare_audio(basename=basename,
                             replace_already_indexed=replace_already_indexed)
 
-        for staging_audio_basename in self._list_audio_files(
-                sub_dir="staging"):
+        # The splits of an audio file must be indexed in order, since their
+        # timestamps are regulated according to it.
+        for staging_audio_basename in sorted(self._list_audio_files(
+                sub_dir="staging")):
             original_audio_name = ''.join(
                 staging_audio_basename.split('.')[:-1])[:-3]
             with open("{}/staging/{}".format(
-                    self.src_dir, staging_audio_basename), "rb") as f:
+                    self._work_dir, staging_audio_basename), "rb") as f:
                 if self.get_verbosity():
                     print("Uploading {}...".format(staging_audio_basename))
                 response = requests.post(
@@ -964,23 +4364,37 @@ class SimpleAudioIndexer(object):
 
         Returns
         -------
-        [[str, float, float]]
-            A list whose members are lists. Each member list has three
-            elements. First one is a word. Second is the starting second and
-            the third is the ending second of that word in the original
-            audio file.
+        [_WordBlock]
+            Word blocks whose timing is with respect to the original audio
+            file. Their confidence is known if `word_confidence` was
+            requested. Their alternatives are the word alternatives (whose
+            confidence is at least `word_alternatives_threshold`) of the time
+            slots that overlap them (see `_assign_word_alternatives`).
         """
         try:
-            timestamps_of_sentences = [
-                audio_json['results'][i]['alternatives'][0]['timestamps']
-                for i in range(len(audio_json['results']))]
-            return [
-                _WordBlock(
-                    word=word_block[0],
-                    start=round(float(word_block[1]), 2),
-                    end=round(float(word_block[2]), 2)
-                ) for sentence_block in timestamps_of_sentences
-                for word_block in sentence_block]
+            word_blocks = list()
+            for result in audio_json['results']:
+                alternative = result['alternatives'][0]
+                # `word_confidence` is parallel to `timestamps`.
+                confidences = [
+                    word_confidence[1] for word_confidence in
+                    alternative.get('word_confidence', list())]
+                if len(confidences) != len(alternative['timestamps']):
+                    confidences = [None] * len(alternative['timestamps'])
+                word_alternatives = _assign_word_alternatives(
+                    alternative['timestamps'],
+                    result.get('word_alternatives', list()))
+                for word_block, confidence, alternatives in zip(
+                        alternative['timestamps'], confidences,
+                        word_alternatives):
+                    word_blocks.append(_WordBlock(
+                        word=word_block[0],
+                        start=round(float(word_block[1]), 2),
+                        end=round(float(word_block[2]), 2),
+                        confidence=(None if confidence is None else
+                                    float(confidence)),
+                        alternatives=alternatives))
+            return word_blocks
         except KeyError:
             self.__errors[(time(), staging_audio_basename)] = audio_json
             if self.get_verbosity():
@@ -1103,21 +4517,60 @@ class SimpleAudioIndexer(object):
         Else if mode is `cmu`, then _index_audio_cmu would be called:
         """
         with _Subdirectory_Managing_Decorator(
-                self.src_dir, self._needed_directories):
+                self, kwargs.get("basename", args[0] if args else None)):
             if self.get_mode() == "ibm":
                 self._index_audio_ibm(*args, **kwargs)
             elif self.get_mode() == "cmu":
                 self._index_audio_cmu(*args, **kwargs)
 
+    def _get_split_offsets(self, timestamp_basename, split_count):
+        """
+        Parameters
+        ----------
+        timestamp_basename : str
+        split_count : int
+
+        Returns
+        -------
+        [float], None
+            The second of the audio file in which each of its splits starts.
+            They're taken from the split manifest if the audio file was
+            staged by this instance. Otherwise, they're summed up from the
+            durations of the staged splits. `None` if they couldn't be found,
+            in which case the error is recorded.
+        """
+        split_manifest = self.__split_manifest.get(timestamp_basename, [])
+        if len(split_manifest) == split_count:
+            return [split_offset for _, split_offset, _ in split_manifest]
+        timestamp_name = ''.join(timestamp_basename.split('.')[:-1])
+        staged_files = self._list_audio_files(sub_dir="staging")
+        staged_splitted_files_of_timestamp = sorted(filter(
+            lambda staged_file: (
+                os.path.splitext(staged_file)[0][:-3] == timestamp_name and
+                os.path.splitext(staged_file)[0][-3:].isdigit()),
+            staged_files))
+        if len(staged_splitted_files_of_timestamp) < split_count - 1:
+            self.__errors[(time(), timestamp_basename)] = {
+                "reason": "Missing staged file",
+                "current_staged_files": staged_files}
+            return None
+        split_offsets = [0]
+        for staged_file in staged_splitted_files_of_timestamp[
+                :split_count - 1]:
+            split_offsets.append(
+                split_offsets[-1] + self._get_audio_duration_seconds(
+                    "{}/staging/{}".format(self._work_dir, staged_file)))
+        return split_offsets
+
     def _timestamp_regulator(self):
         """
         Makes a dictionary whose keys are audio file basenames and whose
         values are a list of word blocks from unregulated timestamps and
         updates the main timestamp attribute. After all done, purges
         unregulated ones.
-        In case the audio file was large enough to be splitted, it adds seconds
-        to correct timing and in case the timestamp was manually loaded, it
-        leaves it alone.
+        In case the audio file was large enough to be splitted, it adds the
+        offset of each split (see `_get_split_offsets`) to correct timing and
+        in case the timestamp was manually loaded, it leaves it alone.
 
         Note that the difference between self.__timestamps and
         self.__timestamps_unregulated is that in the regulated version,
@@ -1125,70 +4578,243 @@ class SimpleAudioIndexer(object):
         unregulated version, after a word, a list of individual splits
         containing word blocks would appear!
         """
-        unified_timestamps = _PrettyDefaultDict(list)
-        staged_files = self._list_audio_files(sub_dir="staging")
+        unified_timestamps = _PrettyDefaultDict(_TimestampColumns)
         for timestamp_basename in self.__timestamps_unregulated:
-            if len(self.__timestamps_unregulated[timestamp_basename]) > 1:
+            splits = self.__timestamps_unregulated[timestamp_basename]
+            if len(splits) > 1:
                 # File has been splitted
-                timestamp_name = ''.join(timestamp_basename.split('.')[:-1])
-                staged_splitted_files_of_timestamp = list(
-                    filter(lambda staged_file: (
-                        timestamp_name == staged_file[:-3] and
-                        all([(x in set(map(str, range(10))))
-                             for x in staged_file[-3:]])), staged_files))
-                if len(staged_splitted_files_of_timestamp) == 0:
-                    self.__errors[(time(), timestamp_basename)] = {
-                        "reason": "Missing staged file",
-                        "current_staged_files": staged_files}
+                split_offsets = self._get_split_offsets(timestamp_basename,
+                                                        len(splits))
+                if split_offsets is None:
                     continue
-                staged_splitted_files_of_timestamp.sort()
-                unified_timestamp = list()
-                for staging_digits, splitted_file in enumerate(
-                        self.__timestamps_unregulated[timestamp_basename]):
-                    prev_splits_sec = 0
-                    if int(staging_digits) != 0:
-                        prev_splits_sec = self._get_audio_duration_seconds(
-                            "{}/staging/{}{:03d}".format(
-                                self.src_dir, timestamp_name,
-                                staging_digits - 1))
-                    for word_block in splitted_file:
-                        unified_timestamp.append(
-                            _WordBlock(
-                                word=word_block.word,
-                                start=round(word_block.start +
-                                            prev_splits_sec, 2),
-                                end=round(word_block.end +
-                                          prev_splits_sec, 2)))
+                unified_timestamp = _TimestampColumns()
+                shifts = array("i")
+                for split, split_offset in zip(splits, split_offsets):
+                    unified_timestamp.extend(split)
+                    shifts.extend(array(
+                        "i", [_to_centiseconds(split_offset)]) * len(split))
+                unified_timestamp.shift(shifts)
                 unified_timestamps[
                     str(timestamp_basename)] += unified_timestamp
             else:
-                unified_timestamps[
-                    timestamp_basename] += self.__timestamps_unregulated[
-                        timestamp_basename][0]
+                unified_timestamps[timestamp_basename] += splits[0]
+            self.__split_manifest.pop(timestamp_basename, None)
 
         self.__timestamps.update(unified_timestamps)
         self.__timestamps_unregulated = _PrettyDefaultDict(list)
+        self._reset_search_indexes()
+        if self.__journal is not None:
+            for timestamp_basename in unified_timestamps:
+                self.__journal.append({
+                    timestamp_basename: unified_timestamps[
+                        timestamp_basename]})
+            if self.__journal.needs_compaction():
+                self.__journal.compact(self.__timestamps)
+
+    def save_indexed_audio(self, indexed_audio_file_abs_path,
+                           files_per_shard=None, compression=None,
+                           sqlite=False):
+        """
+        Writes the corrected timestamps to a file, in a versioned binary
+        format that can be memory mapped upon loading.
+
+        Parameters
+        ----------
+        indexed_audio_file_abs_path : str
+        files_per_shard : int, None, optional
+            If given, `indexed_audio_file_abs_path` is a directory into which
+            the timestamps are written as shards of (at most) that many audio
+            files each, plus a manifest. A sharded index is loaded one shard
+            at a time, as the audio files are searched.
+
+            Default is `None`, i.e. a single file.
+        compression : {None, "varint", "zlib", "lzma"}, optional
+            If given, the timestamps are written in a packed format (as
+            delta encoded varints, compressed as a whole via zlib or lzma
+            unless it's "varint") that's several times smaller, but has to be
+            read entirely upon loading. Can't be used along with
+            `files_per_shard`.
+
+            Default is `None`, i.e. the memory mappable format.
+        sqlite : bool, optional
+            If `True`, the timestamps are written as an SQLite database
+            (with an FTS5 index of the words, if SQLite supports it). Once
+            it's loaded, the timestamps are read from it as they're searched
+            and the timestamps of newly indexed audio files are written to
+            it.
+
+            Default is `False`.
+
+        Raises
+        ------
+        ValueError
+            If `compression` is not supported or more than one of
+            `files_per_shard`, `compression` and `sqlite` are given.
+        """
+        _save_indexed_audio(self.get_timestamps(),
+                            indexed_audio_file_abs_path,
+                            files_per_shard=files_per_shard,
+                            compression=compression, sqlite=sqlite)
 
-    def save_indexed_audio(self, indexed_audio_file_abs_path):
+    def load_indexed_audio(self, indexed_audio_file_abs_path,
+                           max_cached_bytes=_SHARD_CACHE_BYTES):
         """
-        Writes the corrected timestamps to a file. Timestamps are a python
-        dictionary.
+        Loads the timestamps saved via `save_indexed_audio`. The timestamps
+        are memory mapped, so that the file is read as it's searched, unless
+        they were saved with `compression`, in which case they're read
+        entirely.
+
+        If it's a sharded index, only its manifest is read. The shards are
+        loaded as the timestamps of their audio files are accessed and the
+        least recently used ones are dropped once they exceed
+        `max_cached_bytes`. Same goes for the timestamps of the audio files of
+        an SQLite index.
+
+        The journal opened via `open_journal` (if any) is closed, so that the
+        loaded timestamps are neither appended to it nor compacted into it.
+
+        Files that were saved (pickled) by older versions are loaded as well.
+        Since unpickling a file can execute arbitrary code, only load those
+        if you trust them and consider converting them via
+        `convert_indexed_audio`.
 
         Parameters
         ----------
         indexed_audio_file_abs_path : str
+        max_cached_bytes : int, optional
+            Only applicable to sharded and SQLite indexes.
+
+            Default is 256 MiB.
+
+        Raises
+        ------
+        ValueError
+            If the file was saved by a newer version or with a compression
+            that's not supported in this environment.
+        """
+        self.__timestamps = _load_indexed_audio(
+            indexed_audio_file_abs_path, max_cached_bytes=max_cached_bytes)
+        # The journal, if any, is closed since its contents are no longer
+        # the current timestamps and mustn't be replaced by them.
+        self.__journal = None
+        self._reset_search_indexes()
+
+    def open_journal(self, journal_abs_path,
+                     compaction_segments=_JOURNAL_COMPACTION_SEGMENTS):
+        """
+        Loads the timestamps of a journal (replacing the current ones) and
+        appends the timestamps of every audio file that's indexed afterwards
+        to it, as soon as it's indexed. Unlike `save_indexed_audio`, only the
+        newly indexed timestamps are written.
+
+        The journal is compacted (i.e. rewritten as a single segment) once
+        it has more than `compaction_segments` segments. If the process
+        crashed while appending to the journal, the partially written segment
+        is discarded upon opening it.
+
+        Parameters
+        ----------
+        journal_abs_path : str
+            It's created if it doesn't exist.
+        compaction_segments : int, None, optional
+            If `None`, the journal is only compacted via `compact_journal`.
+
+            Default is 64.
+
+        Raises
+        ------
+        ValueError
+            If the journal was written by a newer version.
         """
-        with open(indexed_audio_file_abs_path, "wb") as f:
-            pickle.dump(self.get_timestamps(), f, pickle.HIGHEST_PROTOCOL)
+        journal = _Journal(journal_abs_path,
+                           compaction_segments=compaction_segments)
+        self.__timestamps = journal.replay()
+        self.__journal = journal
+        self._reset_search_indexes()
+        if journal.needs_compaction():
+            journal.compact(self.__timestamps)
+
+    def compact_journal(self):
+        """
+        Rewrites the journal opened via `open_journal` as a single segment.
+        """
+        assert self.__journal is not None, ("No journal has been opened")
+        self.__journal.compact(self.get_timestamps())
 
-    def load_indexed_audio(self, indexed_audio_file_abs_path):
+    @staticmethod
+    def convert_indexed_audio(pickled_file_abs_path,
+                              indexed_audio_file_abs_path):
         """
+        Converts a file that was saved (pickled) by older versions of
+        `save_indexed_audio` to the binary format.
+
         Parameters
         ----------
+        pickled_file_abs_path : str
         indexed_audio_file_abs_path : str
+            Where the converted file would be written.
+        """
+        with open(pickled_file_abs_path, "rb") as f:
+            timestamps = pickle.load(f)
+        _save_binary_index(timestamps, indexed_audio_file_abs_path)
+
+    @staticmethod
+    def merge_indexed_audio(indexed_audio_file_abs_paths,
+                            merged_file_abs_path, on_conflict="latest",
+                            **save_kwargs):
+        """
+        Merges indexes that were saved via `save_indexed_audio` (e.g. on
+        different machines, each indexing some of the audio files) into a
+        single one.
+
+        The audio basenames of the indexes are merged in sorted order and the
+        timestamps are copied one audio file at a time, so that only the
+        timestamps of a single audio file are kept in memory, as long as the
+        indexes are memory mapped or read lazily (i.e. binary, sharded and
+        SQLite ones). Compressed and pickled indexes can only be read as a
+        whole, so each of them is kept in memory entirely during the merge.
+
+        Parameters
+        ----------
+        indexed_audio_file_abs_paths : [str]
+        merged_file_abs_path : str
+            Must not be one of `indexed_audio_file_abs_paths`, since they're
+            read while it's written.
+        on_conflict : {"latest", "error"}, optional
+            What to do with an audio file that's within more than one index.
+            If "latest", its timestamps are taken from the index that comes
+            last within `indexed_audio_file_abs_paths`.
+
+            Default is "latest".
+        save_kwargs
+            The format of the merged index, same as the arguments of
+            `save_indexed_audio`.
+
+        Raises
+        ------
+        ValueError
+            If `on_conflict` is "error" and an audio file is within more than
+            one index, or if `merged_file_abs_path` is one of
+            `indexed_audio_file_abs_paths`.
         """
-        with open(indexed_audio_file_abs_path, "rb") as f:
-            self.__timestamps = pickle.load(f)
+        if os.path.realpath(merged_file_abs_path) in set(
+                os.path.realpath(indexed_audio_file_abs_path)
+                for indexed_audio_file_abs_path in
+                indexed_audio_file_abs_paths):
+            raise ValueError(
+                "The merged index must not be one of the merged indexes.")
+        sources = list()
+        try:
+            for indexed_audio_file_abs_path in indexed_audio_file_abs_paths:
+                sources.append(
+                    _load_indexed_audio(indexed_audio_file_abs_path))
+            _save_indexed_audio(
+                _MergedTimestamps(sources, on_conflict=on_conflict),
+                merged_file_abs_path, **save_kwargs)
+        finally:
+            for source in sources:
+                if isinstance(source, _SqliteTimestamps):
+                    source.close()
 
     def _is_anagram_of(self, candidate, target):
         """
@@ -1201,7 +4827,7 @@ class SimpleAudioIndexer(object):
         --------
         bool
         """
-        return (sorted(candidate) == sorted(target))
+        return (_anagram_signature(candidate) == _anagram_signature(target))
 
     def _is_subsequence_of(self, sub, sup):
         """
@@ -1214,7 +4840,7 @@ class SimpleAudioIndexer(object):
         -------
         bool
         """
-        return bool(re.search(".*".join(sub), sup))
+        return _is_subsequence(sub, sup)
 
     def _is_supersequence_of(self, sup, sub):
         """
@@ -1230,7 +4856,8 @@ class SimpleAudioIndexer(object):
         return self._is_subsequence_of(sub, sup)
 
     def _partial_search_validator(self, sub, sup, anagram=False,
-                                  subsequence=False, supersequence=False):
+                                  subsequence=False, supersequence=False,
+                                  max_edit_distance=0, phonetic=False):
         """
         It's responsible for validating the partial results of `search` method.
         If it returns True, the search would return its result. Else, search
@@ -1253,6 +4880,10 @@ class SimpleAudioIndexer(object):
             Default is `False`
         supersequence : bool, optional
             Default is `False`
+        max_edit_distance : int, optional
+            Default is 0
+        phonetic : bool, optional
+            Default is `False`
 
         Returns
         -------
@@ -1263,63 +4894,19 @@ class SimpleAudioIndexer(object):
         .. [1] : `
    https://stackoverflow.com/questions/35964155/checking-if-list-is-a-sublist`
         """
-        def get_all_in(one, another):
-            for element in one:
-                if element in another:
-                    yield element
-
-        def containment_check(sub, sup):
-            return (set(Counter(sub).keys()).issubset(
-                set(Counter(sup).keys())))
-
-        def containment_freq_check(sub, sup):
-            return (all([Counter(sub)[element] <= Counter(sup)[element]
-                         for element in Counter(sub)]))
-
-        def extra_freq_check(sub, sup, list_of_tups):
-            # Would be used for matching anagrams, subsequences etc.
-            return (len(list_of_tups) > 0 and
-                    all([Counter(sub)[tup[0]] <= Counter(sup)[tup[1]]
-                         for tup in list_of_tups]))
-
-        # Regarding containment checking while having extra conditions,
-        # there's no good way to map each anagram or subseuqnece etc. that was
-        # found to the query word, without making it more complicated than
-        # it already is, because a query word can be anagram/subsequence etc.
-        # to multiple words of the timestamps yet finding the one with the
-        # right index would be the problem.
-        # Therefore we just approximate the solution by just counting
-        # the elements.
-        if len(sub) > len(sup):
-            return False
-
-        for pred, func in set([(anagram, self._is_anagram_of),
-                               (subsequence, self._is_subsequence_of),
-                               (supersequence, self._is_supersequence_of)]):
-            if pred:
-                pred_seive = [(sub_key, sup_key)
-                              for sub_key in set(Counter(sub).keys())
-                              for sup_key in set(Counter(sup).keys())
-                              if func(sub_key, sup_key)]
-                if not extra_freq_check(sub, sup, pred_seive):
-                    return False
-
-        if (
-                not any([anagram, subsequence, supersequence]) and
-                (not containment_check(sub, sup) or
-                 not containment_freq_check(sub, sup))
-        ):
-                return False
-
-        for x1, x2 in zip(get_all_in(sup, sub), get_all_in(sub, sup)):
-            if x1 != x2:
-                return False
-
-        return True
+        validator = _PartialSearchValidator(
+            sub, anagram=anagram, subsequence=subsequence,
+            supersequence=supersequence, max_edit_distance=max_edit_distance,
+            phonetic=phonetic)
+        for element in sup:
+            validator.push(element)
+        return validator.is_valid()
 
     def search_gen(self, query, audio_basename=None, case_sensitive=False,
                    subsequence=False, supersequence=False, timing_error=0.0,
-                   anagram=False, missing_word_tolerance=0):
+                   anagram=False, missing_word_tolerance=0, time_range=None,
+                   max_edit_distance=0, phonetic=False, min_confidence=None,
+                   alternatives=False):
         """
         A generator that searches for the `query` within the audiofiles of the
         src_dir.
@@ -1376,6 +4963,44 @@ class SimpleAudioIndexer(object):
             "random" that can be missed)
 
             Default is 0.
+        time_range : (float, float), optional
+            Search only within the word blocks whose starting second is
+            within the given range (inclusive). Either of the bounds could be
+            `None` to leave that side of the range open.
+
+            Default is `None` i.e. the whole audio.
+        max_edit_distance : int, optional
+            The number of single character insertions, deletions or
+            substitutions by which a word may differ from its query word, in
+            order to tolerate the misrecognized words e.g. with the value `1`,
+            "promise" would be acceptable for "promiss".
+
+            If the query is a sentences with multiple words, it'll be
+            considered for each word, not the whole sentence.
+
+            Default is 0.
+        phonetic : bool, optional
+            `True` if it's acceptable for a word that sounds like the given
+            one to be found. e.g. "write" would be acceptable for "right".
+            Useful for the words that the speech to text engine mistook for
+            their homophones.
+
+            If the query is a sentences with multiple words, it'll be
+            considered for each word, not the whole sentence.
+
+            Default is `False`.
+        min_confidence : float, None, optional
+            Words whose confidence (of the speech to text engine) is less than
+            `min_confidence` are treated as if they didn't match any query
+            word. Words whose confidence is unknown are never excluded.
+
+            Default is `None` i.e. all the words are considered.
+        alternatives : bool, optional
+            `True` if words can be matched with the alternative hypotheses of
+            the speech to text engine as well (i.e. Watson's word
+            alternatives), as if they were recognized instead.
+
+            Default is `False`.
 
         Yields
         ------
@@ -1392,117 +5017,154 @@ class SimpleAudioIndexer(object):
             words in the query minus 2 (since the first and the last word
             cannot be removed)
         """
-        def case_sensitivity_handler(case_sensitive=case_sensitive):
-
-            def get_query_words(query, case_sensitive=case_sensitive):
-                query_words = list(
-                    filter(None, ''.join(
-                        filter(lambda char: char in (ascii_letters + " "),
-                               list(query))).split(" ")))
-                if case_sensitive:
-                    return query_words
-                return [q.lower() for q in query_words]
-
-            def get_timestamps(case_sensitive=case_sensitive):
-                timestamps = self.get_timestamps().copy()
-                if not case_sensitive:
-                    return {
-                        audio_basename: [
-                            _WordBlock(word=word_block.word.lower(),
-                                       start=word_block.start,
-                                       end=word_block.end)
-                            for word_block in timestamps[audio_basename]]
-                        for audio_basename in timestamps}
-                return timestamps
-
-            return locals()
-
-        query_words = case_sensitivity_handler()["get_query_words"](query)
-        timestamps = case_sensitivity_handler()["get_timestamps"]()
-
-        assert abs(missing_word_tolerance -
-                   (len(query_words) - 2)) >= 0, (
-            "The number of words that can be missing must be less than "
-            "the total number of words within the query minus the first and "
-            "the last word."
-        )
-
-        for audio_filename in (
-                (lambda: (timestamps.keys() if audio_basename is None else
-                          [audio_basename]))()):
-            result = list()
-            missed_words_so_far = 0
-            query_cursor = 0
-            try:
-                for word_block in timestamps[audio_filename]:
-                    if (
-                            # When the query is identical
-                            (word_block.word == query_words[query_cursor]) or
-                            # When the query is a subsequence of what's
-                            # available
-                            (subsequence and
-                             self._is_subsequence_of(query_words[query_cursor],
-                                                     word_block.word)) or
-                            # When the query is a supersequence of what's
-                            # available
-                            (supersequence and self._is_supersequence_of(
-                                query_words[query_cursor], word_block.word)) or
-                            # When query is a permutation of what's available.
-                            (anagram and self._is_anagram_of(
-                                query_words[query_cursor], word_block.word))
-                    ):
-                        result.append(word_block)
-
-                        if timing_error is not None:
-                            try:
-                                if round(result[-1].start -
-                                         result[-2].end, 4) > timing_error:
-                                    result = list()
-                                    query_cursor = 0
-                            except IndexError:
-                                pass
-
-                        if self._partial_search_validator(
-                                query_words, [x.word for x in result],
-                                anagram=anagram,
-                                subsequence=subsequence,
-                                supersequence=supersequence):
-                            yield {
-                                "File Name": audio_filename,
-                                "Query": query,
-                                "Result": tuple([result[0].start,
-                                                 result[-1].end])}
-                            result = list()
-                            query_cursor = 0
-
-                        else:
-                            query_cursor += 1
-
-                    elif missed_words_so_far > missing_word_tolerance:
-                        result = list()
-                        query_cursor = 0
+        inverted_index = self._get_inverted_index(case_sensitive)
+        for search_result in _search_gen(
+                self.get_timestamps(), inverted_index, query,
+                audio_basename=audio_basename, subsequence=subsequence,
+                supersequence=supersequence, timing_error=timing_error,
+                anagram=anagram, missing_word_tolerance=missing_word_tolerance,
+                time_range=time_range, max_edit_distance=max_edit_distance,
+                phonetic=phonetic, min_confidence=min_confidence,
+                alternatives=alternatives):
+            yield search_result
+
+    def search_top(self, query, top_k=10, **search_gen_kwargs):
+        """
+        Ranks the results of `search_gen` by the mean confidence of their
+        words and returns the best `top_k` of them. Only `top_k` results are
+        kept at any time, within a heap.
 
-                    elif (missing_word_tolerance > 0) and (len(result) > 0):
-                        result.append(word_block)
-                        missed_words_so_far += 1
+        Parameters
+        ----------
+        query : str
+        top_k : int, optional
+            Default is 10.
+        search_gen_kwargs
+            The rest of the arguments of `search_gen`.
 
-            except KeyError:
-                # This is needed for the case where no timestamp is present.
-                pass
+        Returns
+        -------
+        [{"File Name": str, "Query": `query`, "Result": (float, float),
+          "Confidence": float or None}]
+            The results of `search_gen` with their mean confidence (which is
+            `None` if the confidence of none of their words is known), from
+            the most confident one to the least. Those with unknown confidence
+            come last and ties are broken in favor of the earlier results.
+        """
+        if top_k <= 0:
+            return list()
+        inverted_index = self._get_inverted_index(
+            search_gen_kwargs.get("case_sensitive", False))
+        heap = list()
+        for rank, search_result in enumerate(
+                self.search_gen(query, **search_gen_kwargs)):
+            columns = inverted_index.get_audio_index(
+                search_result["File Name"]).columns
+            start, end = search_result["Result"]
+            # The words within the result are the ones starting from its
+            # start and before its end.
+            lo = bisect_left(columns.starts, _to_centiseconds(start))
+            hi = bisect_left(columns.starts, _to_centiseconds(end))
+            confidence = columns.get_mean_confidence(lo, max(hi, lo + 1))
+            search_result["Confidence"] = confidence
+            heap_item = (-1 if confidence is None else confidence, -rank,
+                         search_result)
+            if len(heap) < top_k:
+                heappush(heap, heap_item)
+            else:
+                heappushpop(heap, heap_item)
+        return [heap_item[-1] for heap_item in sorted(heap, reverse=True)]
 
-            except IndexError:
-                # This is needed when multiple timestamps are present, and
-                # advanced control structures like `missed_word_tolerance` are
-                # non-zero. In that case, it can search to the end of the first
-                # timestamp looking to complete its partial result and since
-                # there are no more `word_block`s left, it returns an error.
-                # `continue` should be used to reset the partial result and
-                # move to the next timestamp.
-                continue
+    def _is_searchable_in_processes(self, workers, audio_basename):
+        """
+        Parameters
+        ----------
+        workers : int, None
+        audio_basename : str, None
+
+        Returns
+        -------
+        bool
+            `True` if more than one process is asked for and there's more than
+            one audio file to be searched.
+        """
+        return (ProcessPoolExecutor is not None and
+                workers is not None and workers > 1 and
+                audio_basename is None and
+                len(self.get_timestamps()) > 1)
+
+    def _search_in_processes(self, search_function, case_sensitive, workers,
+                             query, kwargs, query_words=None):
+        """
+        Searches every audio file within a separate task of a process pool
+        and merges the results. Only the timestamp columns of an audio file
+        are sent to the worker that searches it, where its index is built.
+
+        The columns of an audio file are read right before its task is
+        submitted and at most `_SEARCH_TASKS_PER_WORKER` tasks per worker are
+        pending at any time, so that lazily loaded timestamps (i.e. sharded
+        and SQLite indexes) aren't read all at once.
+
+        Parameters
+        ----------
+        search_function : {_search_all, _search_regexp}
+        case_sensitive : bool
+            The case sensitivity of the inverted indexes that are built.
+        workers : int
+            The maximum number of processes.
+        query : [str] or str
+            The query of `search_function`.
+        kwargs : dict
+            The rest of the arguments of `search_function`, except for
+            `audio_basename`.
+        query_words : [[str]], None, optional
+            If given, all the words of some query must be within a result
+            of it, so only the audio files that may contain them are searched
+            (see `_get_matching_audio_basenames`).
+
+            Default is `None`.
+
+        Returns
+        -------
+        search_results : {str: {str: [(float, float)]}}
+            The results of the audio files are merged in the order of
+            `get_timestamps`, so that they don't depend on which process
+            finishes first.
+        """
+        timestamps = self.get_timestamps()
+        if query_words is None:
+            audio_basenames = list(timestamps.keys())
+        else:
+            audio_basenames = _get_matching_audio_basenames(timestamps,
+                                                            query_words)
+        search_results = _PrettyDefaultDict(lambda: _PrettyDefaultDict(list))
+
+        def merge_results(audio_basename, future):
+            for result_key, results in future.result():
+                search_results[result_key][audio_basename].extend(results)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Tasks are pending in the order of `audio_basenames`.
+            pending = deque()
+            for audio_basename in audio_basenames:
+                columns = timestamps[audio_basename]
+                if not isinstance(columns, _TimestampColumns):
+                    columns = _TimestampColumns(columns)
+                pending.append((audio_basename, executor.submit(
+                    _search_audio_file,
+                    (search_function, audio_basename, columns,
+                     case_sensitive, query, kwargs))))
+                if len(pending) >= _SEARCH_TASKS_PER_WORKER * workers:
+                    merge_results(*pending.popleft())
+            while pending:
+                merge_results(*pending.popleft())
+        return search_results
 
     def search_all(self, queries, audio_basename=None, case_sensitive=False,
                    subsequence=False, supersequence=False, timing_error=0.0,
-                   anagram=False, missing_word_tolerance=0):
+                   anagram=False, missing_word_tolerance=0, time_range=None,
+                   workers=None, max_edit_distance=0, phonetic=False,
+                   min_confidence=None, alternatives=False):
         """
         Returns a dictionary of all results of all of the queries for all of
         the audio files.
@@ -1561,6 +5223,50 @@ class SimpleAudioIndexer(object):
             "random" that can be missed)
 
             Default is 0.
+        time_range : (float, float), optional
+            Search only within the word blocks whose starting second is
+            within the given range (inclusive). Either of the bounds could be
+            `None` to leave that side of the range open.
+
+            Default is `None` i.e. the whole audio.
+        workers : int, None, optional
+            The number of processes among which the audio files are
+            distributed to be searched. `None` or `1` means the search is done
+            within the current process. Results are the same either way.
+
+            Default is `None`.
+        max_edit_distance : int, optional
+            The number of single character insertions, deletions or
+            substitutions by which a word may differ from its query word, in
+            order to tolerate the misrecognized words e.g. with the value `1`,
+            "promise" would be acceptable for "promiss".
+
+            If the query is a sentences with multiple words, it'll be
+            considered for each word, not the whole sentence.
+
+            Default is 0.
+        phonetic : bool, optional
+            `True` if it's acceptable for a word that sounds like the given
+            one to be found. e.g. "write" would be acceptable for "right".
+            Useful for the words that the speech to text engine mistook for
+            their homophones.
+
+            If the query is a sentences with multiple words, it'll be
+            considered for each word, not the whole sentence.
+
+            Default is `False`.
+        min_confidence : float, None, optional
+            Words whose confidence (of the speech to text engine) is less than
+            `min_confidence` are treated as if they didn't match any query
+            word. Words whose confidence is unknown are never excluded.
+
+            Default is `None` i.e. all the words are considered.
+        alternatives : bool, optional
+            `True` if words can be matched with the alternative hypotheses of
+            the speech to text engine as well (i.e. Watson's word
+            alternatives), as if they were recognized instead.
+
+            Default is `False`.
 
         Returns
         -------
@@ -1580,27 +5286,39 @@ class SimpleAudioIndexer(object):
 
         search_gen_rest_of_kwargs = {
             "audio_basename": audio_basename,
-            "case_sensitive": case_sensitive,
             "subsequence": subsequence,
             "supersequence": supersequence,
             "timing_error": timing_error,
             "anagram": anagram,
-            "missing_word_tolerance": missing_word_tolerance}
+            "missing_word_tolerance": missing_word_tolerance,
+            "time_range": time_range,
+            "max_edit_distance": max_edit_distance,
+            "phonetic": phonetic,
+            "min_confidence": min_confidence,
+            "alternatives": alternatives}
 
         if not isinstance(queries, (list, str)):
             raise TypeError("Invalid query type.")
         if type(queries) is not list:
             queries = [queries]
-        search_results = _PrettyDefaultDict(lambda: _PrettyDefaultDict(list))
-        for query in queries:
-            search_gen = self.search_gen(query=query,
-                                         **search_gen_rest_of_kwargs)
-            for search_result in search_gen:
-                search_results[query][
-                    search_result["File Name"]].append(search_result["Result"])
-        return search_results
-
-    def search_regexp(self, pattern, audio_basename=None):
+        if self._is_searchable_in_processes(workers, audio_basename):
+            del search_gen_rest_of_kwargs["audio_basename"]
+            query_words = None
+            if not any([subsequence, supersequence, anagram,
+                        missing_word_tolerance, max_edit_distance, phonetic,
+                        alternatives]):
+                inverted_index = self._get_inverted_index(case_sensitive)
+                query_words = [_get_query_words(query, inverted_index)
+                               for query in queries]
+            return self._search_in_processes(
+                _search_all, case_sensitive, workers, queries,
+                search_gen_rest_of_kwargs, query_words=query_words)
+        return _search_all(self.get_timestamps(),
+                           self._get_inverted_index(case_sensitive), queries,
+                           **search_gen_rest_of_kwargs)
+
+    def search_regexp(self, pattern, audio_basename=None, time_range=None,
+                      workers=None):
         """
         First joins the words of the word_blocks of timestamps with space, per
         audio_basename. Then matches `pattern` and calculates the index of the
@@ -1618,6 +5336,21 @@ class SimpleAudioIndexer(object):
             Search only within the given audio_basename.
 
             Default is `False`.
+        time_range : (float, float), optional
+            Search only within the word blocks whose starting second is
+            within the given range (inclusive). Either of the bounds could be
+            `None` to leave that side of the range open.
+
+            `pattern` is matched against the words within the range only, so
+            `^` and `$` match at the first and the last of them.
+
+            Default is `None` i.e. the whole audio.
+        workers : int, None, optional
+            The number of processes among which the audio files are
+            distributed to be searched. `None` or `1` means the search is done
+            within the current process. Results are the same either way.
+
+            Default is `None`.
 
         Returns
         -------
@@ -1629,65 +5362,494 @@ class SimpleAudioIndexer(object):
             values are the ending second. e.g.
             {"apple": {"fruits.wav" : [(1.1, 1.12)]}}
         """
+        if self._is_searchable_in_processes(workers, audio_basename):
+            return self._search_in_processes(
+                _search_regexp, True, workers, pattern,
+                {"time_range": time_range})
 
-        def indexes_in_transcript_to_start_end_second(index_tup,
-                                                      audio_basename):
-            """
-            Calculates the word block index by having the beginning and ending
-            index of the matched result from the transcription
-
-            Parameters
-            ----------
-            index_tup : (int, tup)
-                index_tup is of the form tuple(index_start, index_end)
-            audio_basename : str
-
-            Retrun
-            ------
-            [float, float]
-                The time of the output of the matched result. Derived from two
-                separate word blocks belonging to the beginning and the end of
-                the index_start and index_end.
-            """
-            space_indexes = [i for i, x in enumerate(
-                transcription[audio_basename]) if x == " "]
-            space_indexes.sort(reverse=True)
-            index_start, index_end = index_tup
-            # re.finditer returns the ending index by one more
-            index_end -= 1
-            while transcription[audio_basename][index_start] == " ":
-                index_start += 1
-            while transcription[audio_basename][index_end] == " ":
-                index_end -= 1
-            block_number_start = 0
-            block_number_end = len(space_indexes)
-            for block_cursor, space_index in enumerate(space_indexes):
-                if index_start > space_index:
-                    block_number_start = (len(space_indexes) - block_cursor)
-                    break
-            for block_cursor, space_index in enumerate(space_indexes):
-                if index_end > space_index:
-                    block_number_end = (len(space_indexes) - block_cursor)
-                    break
-            return (timestamps[audio_basename][block_number_start].start,
-                    timestamps[audio_basename][block_number_end].end)
+        return _search_regexp(self.get_timestamps(),
+                              self._get_inverted_index(case_sensitive=True),
+                              pattern, audio_basename=audio_basename,
+                              time_range=time_range)
 
-        timestamps = self.get_timestamps()
-        if audio_basename is not None:
-            timestamps = {audio_basename: timestamps[audio_basename]}
-        transcription = {
-            audio_basename: ' '.join(
-                [word_block.word for word_block in timestamps[audio_basename]]
-            ) for audio_basename in timestamps}
-        match_map = map(
-            lambda audio_basename: tuple((
-                audio_basename,
-                re.finditer(pattern, transcription[audio_basename]))),
-            transcription.keys())
-        search_results = _PrettyDefaultDict(lambda: _PrettyDefaultDict(list))
-        for audio_basename, match_iter in match_map:
-            for match in match_iter:
-                search_results[match.group()][audio_basename].append(
-                    tuple(indexes_in_transcript_to_start_end_second(
-                        match.span(), audio_basename)))
-        return search_results
+
+# The number of search tasks per worker process that are submitted ahead of
+# their results being merged (see `SimpleAudioIndexer._search_in_processes`).
+_SEARCH_TASKS_PER_WORKER = 2
+
+
+def _search_audio_file(task):
+    """
+    Runs within a worker process of `SimpleAudioIndexer._search_in_processes`.
+
+    Parameters
+    ----------
+    task : (function, str, _TimestampColumns, bool, [str] or str, dict)
+        The search function (i.e. `_search_all` or `_search_regexp`), the
+        audio basename, its timestamps, whether the search is case sensitive,
+        the query of the search function and the rest of its arguments.
+
+    Returns
+    -------
+    [(str, [(float, float)])]
+        The results of the audio file per query (or matched string).
+        Unlike `_PrettyDefaultDict`, it can be pickled back to the parent
+        process.
+    """
+    search_function, audio_basename, columns, case_sensitive, query, kwargs = (
+        task)
+    timestamps = {audio_basename: columns}
+    search_results = search_function(
+        timestamps, _InvertedIndex(timestamps, case_sensitive=case_sensitive),
+        query, **kwargs)
+    return [(result_key, search_results[result_key][audio_basename])
+            for result_key in search_results
+            if audio_basename in search_results[result_key]]
+
+
+def _get_query_words(query, inverted_index):
+    """
+    Parameters
+    ----------
+    query : str
+    inverted_index : _InvertedIndex
+        Query words are normalized the same way that the words of the
+        `inverted_index` are.
+
+    Returns
+    -------
+    [str]
+    """
+    return [
+        inverted_index.normalize(query_word)
+        for query_word in ''.join(
+            filter(lambda char: char in (ascii_letters + " "),
+                   list(query))).split(" ") if query_word]
+
+
+def _get_matching_audio_basenames(timestamps, query_words,
+                                  audio_basename=None):
+    """
+    Parameters
+    ----------
+    timestamps : {str: _TimestampColumns}
+    query_words : [[str]]
+        The words of every query, all of which must be within a result of
+        that query.
+    audio_basename : str, None, optional
+        Default is `None`.
+
+    Returns
+    -------
+    [str]
+        The audio files that need to be searched, i.e. either
+        `audio_basename` or all of them. If the timestamps are of an
+        SQLite index, only the ones that contain all of the words of some
+        query according to its FTS5 index, so that the rest aren't read.
+    """
+    audio_basenames = (list(timestamps.keys())
+                       if audio_basename is None else [audio_basename])
+    if isinstance(timestamps, _SqliteTimestamps):
+        matched_basenames = timestamps.match(query_words)
+        if matched_basenames is not None:
+            audio_basenames = [
+                audio_filename for audio_filename in audio_basenames
+                if audio_filename in matched_basenames]
+    return audio_basenames
+
+
+def _search_gen(timestamps, inverted_index, query, audio_basename=None,
+                subsequence=False, supersequence=False, timing_error=0.0,
+                anagram=False, missing_word_tolerance=0, time_range=None,
+                max_edit_distance=0, phonetic=False, min_confidence=None,
+                alternatives=False):
+    """
+    Implements `SimpleAudioIndexer.search_gen`, whose arguments are the same
+    except for the ones below.
+
+    Parameters
+    ----------
+    timestamps : {str: _TimestampColumns}
+    inverted_index : _InvertedIndex
+        The inverted index of `timestamps`, whose case sensitivity is that of
+        the search.
+
+    Yields
+    ------
+    {"File Name": str, "Query": `query`, "Result": (float, float)}
+    """
+    query_words = _get_query_words(query, inverted_index)
+
+    assert abs(missing_word_tolerance -
+               (len(query_words) - 2)) >= 0, (
+        "The number of words that can be missing must be less than "
+        "the total number of words within the query minus the first and "
+        "the last word."
+    )
+
+    # Without `missing_word_tolerance`, the words that match none of the
+    # query words never change the state of the search below. Therefore
+    # only the positions of the matching terms, which are looked up from
+    # the inverted index, are needed to be visited.
+    lookup_positions = not missing_word_tolerance
+    # Validates `result` as it grows, instead of validating it from
+    # scratch after each match.
+    validator = _PartialSearchValidator(
+        query_words, anagram=anagram, subsequence=subsequence,
+        supersequence=supersequence, max_edit_distance=max_edit_distance,
+        phonetic=phonetic)
+    confidence_threshold = _to_confidence_threshold(min_confidence)
+
+    if any([subsequence, supersequence, anagram, missing_word_tolerance,
+            max_edit_distance, phonetic, alternatives]):
+        # The results may lack some of the query words.
+        audio_basenames = (list(timestamps.keys())
+                           if audio_basename is None else
+                           [audio_basename])
+    else:
+        audio_basenames = _get_matching_audio_basenames(
+            timestamps, [query_words], audio_basename)
+
+    for audio_filename in audio_basenames:
+        # `result` holds the positions of the matched word blocks.
+        result = list()
+        validator.reset()
+        missed_words_so_far = 0
+        query_cursor = 0
+        try:
+            audio_index = inverted_index.get_audio_index(audio_filename)
+            starts = audio_index.columns.starts
+            ends = audio_index.columns.ends
+            confidences = audio_index.columns.confidences
+            # For every query word, the ids of the terms that are
+            # identical to it, or are its permutations (if `anagram`), or
+            # contain it as a subsequence (if `subsequence`), or are its
+            # subsequences (if `supersequence`), or are close enough to it
+            # (if `max_edit_distance`), or sound like it (if `phonetic`).
+            query_term_ids = [
+                audio_index.get_matching_term_ids(
+                    query_word, anagram=anagram, subsequence=subsequence,
+                    supersequence=supersequence,
+                    max_edit_distance=max_edit_distance,
+                    phonetic=phonetic)
+                for query_word in query_words]
+            lo, hi = audio_index.columns.get_positions_between(
+                *(time_range or (None, None)))
+            if lookup_positions:
+                positions = audio_index.candidate_positions(
+                    query_term_ids, lo=lo, hi=hi,
+                    alternatives=alternatives)
+            else:
+                positions = range(lo, hi)
+            for position in positions:
+                matched_term_id = audio_index.term_ids[position]
+                if (matched_term_id not in query_term_ids[query_cursor] or
+                        confidences[position] < confidence_threshold):
+                    matched_term_id = None
+                    if alternatives:
+                        matched_term_id = (
+                            audio_index.get_matching_alternative(
+                                position, query_term_ids[query_cursor],
+                                confidence_threshold))
+                if matched_term_id is not None:
+                    result.append(position)
+                    validator.push(audio_index.terms[matched_term_id])
+
+                    if timing_error is not None:
+                        try:
+                            if round(_to_seconds(
+                                    starts[result[-1]] -
+                                    ends[result[-2]]), 4) > timing_error:
+                                result = list()
+                                validator.reset()
+                                query_cursor = 0
+                        except IndexError:
+                            pass
+
+                    if validator.is_valid():
+                        yield {
+                            "File Name": audio_filename,
+                            "Query": query,
+                            "Result": tuple([
+                                _to_seconds(starts[result[0]]),
+                                _to_seconds(ends[result[-1]])])}
+                        result = list()
+                        validator.reset()
+                        query_cursor = 0
+
+                    else:
+                        query_cursor += 1
+
+                elif missed_words_so_far > missing_word_tolerance:
+                    result = list()
+                    validator.reset()
+                    query_cursor = 0
+
+                elif (missing_word_tolerance > 0) and (len(result) > 0):
+                    result.append(position)
+                    validator.push(audio_index.get_word(position))
+                    missed_words_so_far += 1
+
+        except KeyError:
+            # This is needed for the case where no timestamp is present.
+            pass
+
+        except IndexError:
+            # This is needed when multiple timestamps are present, and
+            # advanced control structures like `missed_word_tolerance` are
+            # non-zero. In that case, it can search to the end of the first
+            # timestamp looking to complete its partial result and since
+            # there are no more `word_block`s left, it returns an error.
+            # `continue` should be used to reset the partial result and
+            # move to the next timestamp.
+            continue
+
+
+def _search_all_exact(timestamps, inverted_index, queries, audio_basename=None,
+                      timing_error=0.0, time_range=None, min_confidence=None):
+    """
+    Searches for all of the `queries` within a single pass over the words
+    of each audio file. Only valid if no advanced control structure (i.e.
+    `subsequence`, `supersequence`, `anagram` or `missing_word_tolerance`)
+    is needed, in which case the result is identical to that of
+    `search_gen` for each of the queries.
+
+    Every query is a small state machine whose state can only change upon
+    seeing its currently expected word. Therefore the queries are grouped
+    by the ids of their expected words and each word of the audio file
+    only advances the queries that are waiting for it.
+
+    Parameters
+    ----------
+    timestamps : {str: _TimestampColumns}
+    inverted_index : _InvertedIndex
+        The inverted index of `timestamps`, whose case sensitivity is that of
+        the search.
+    queries : [str]
+    audio_basename : str, optional
+        Default is `None`.
+    timing_error : None or float, optional
+        Default is 0.0
+    time_range : (float, float), optional
+        Default is `None`
+    min_confidence : float, None, optional
+        Default is `None`
+
+    Returns
+    -------
+    search_results : {str: {str: [(float, float)]}}
+    """
+    query_words = dict(
+        (query, _get_query_words(query, inverted_index))
+        for query in queries)
+    # found[query][audio_basename] is a list of the results.
+    found = defaultdict(lambda: defaultdict(list))
+    audio_basenames = _get_matching_audio_basenames(
+        timestamps, list(query_words.values()), audio_basename)
+    for audio_filename in audio_basenames:
+        try:
+            audio_index = inverted_index.get_audio_index(audio_filename)
+        except KeyError:
+            # This is needed for the case where no timestamp is present.
+            continue
+        starts = audio_index.columns.starts
+        ends = audio_index.columns.ends
+        confidences = audio_index.columns.confidences
+        confidence_threshold = _to_confidence_threshold(min_confidence)
+        # waiting[term_id] is a list of states of queries whose expected
+        # word is term_id. A state is [query, query_term_ids, cursor,
+        # result]
+        waiting = defaultdict(list)
+        for query in query_words:
+            query_term_ids = [audio_index.term_id_of.get(query_word)
+                              for query_word in query_words[query]]
+            if len(query_term_ids) == 0 or None in query_term_ids:
+                # No result could contain all of the query words.
+                continue
+            waiting[query_term_ids[0]].append(
+                [query, query_term_ids, 0, list()])
+        if len(waiting) == 0:
+            continue
+        lo, hi = audio_index.columns.get_positions_between(
+            *(time_range or (None, None)))
+        for position in range(lo, hi):
+            term_id = audio_index.term_ids[position]
+            if (term_id not in waiting or
+                    confidences[position] < confidence_threshold):
+                continue
+            for state in waiting.pop(term_id):
+                query, query_term_ids, cursor, result = state
+                result.append(position)
+                if timing_error is not None and len(result) > 1:
+                    if round(_to_seconds(
+                            starts[result[-1]] -
+                            ends[result[-2]]), 4) > timing_error:
+                        result = list()
+                        cursor = 0
+                # Having no advanced control structures, the result is
+                # valid only if it has seen all of the query words from
+                # the first one onwards.
+                if len(result) == len(query_term_ids) == cursor + 1:
+                    found[query][audio_filename].append(tuple([
+                        _to_seconds(starts[result[0]]),
+                        _to_seconds(ends[result[-1]])]))
+                    result = list()
+                    cursor = 0
+                else:
+                    cursor += 1
+                if cursor == len(query_term_ids):
+                    # Same as search_gen, there's no point in continuing
+                    # the search of this query within this audio file.
+                    continue
+                state[2], state[3] = cursor, result
+                waiting[query_term_ids[cursor]].append(state)
+            if len(waiting) == 0:
+                break
+    search_results = _PrettyDefaultDict(lambda: _PrettyDefaultDict(list))
+    for query in queries:
+        for audio_filename in audio_basenames:
+            if audio_filename in found[query]:
+                search_results[query][audio_filename].extend(
+                    found[query][audio_filename])
+    return search_results
+
+
+def _search_all(timestamps, inverted_index, queries, audio_basename=None,
+                subsequence=False, supersequence=False, timing_error=0.0,
+                anagram=False, missing_word_tolerance=0, time_range=None,
+                max_edit_distance=0, phonetic=False, min_confidence=None,
+                alternatives=False):
+    """
+    Implements `SimpleAudioIndexer.search_all` within the current process,
+    whose arguments are the same except for the ones below.
+
+    Parameters
+    ----------
+    timestamps : {str: _TimestampColumns}
+    inverted_index : _InvertedIndex
+        The inverted index of `timestamps`, whose case sensitivity is that of
+        the search.
+    queries : [str]
+
+    Returns
+    -------
+    search_results : {str: {str: [(float, float)]}}
+    """
+    if len(queries) > 1 and not any([subsequence, supersequence, anagram,
+                                     missing_word_tolerance,
+                                     max_edit_distance, phonetic,
+                                     alternatives]):
+        return _search_all_exact(
+            timestamps, inverted_index, queries,
+            audio_basename=audio_basename, timing_error=timing_error,
+            time_range=time_range, min_confidence=min_confidence)
+    search_results = _PrettyDefaultDict(lambda: _PrettyDefaultDict(list))
+    for query in queries:
+        search_gen = _search_gen(
+            timestamps, inverted_index, query, audio_basename=audio_basename,
+            subsequence=subsequence, supersequence=supersequence,
+            timing_error=timing_error, anagram=anagram,
+            missing_word_tolerance=missing_word_tolerance,
+            time_range=time_range, max_edit_distance=max_edit_distance,
+            phonetic=phonetic, min_confidence=min_confidence,
+            alternatives=alternatives)
+        for search_result in search_gen:
+            search_results[query][
+                search_result["File Name"]].append(search_result["Result"])
+    return search_results
+
+
+def _search_regexp(timestamps, inverted_index, pattern, audio_basename=None,
+                   time_range=None):
+    """
+    Implements `SimpleAudioIndexer.search_regexp` within the current process,
+    whose arguments are the same except for the ones below.
+
+    Parameters
+    ----------
+    timestamps : {str: _TimestampColumns}
+    inverted_index : _InvertedIndex
+        The case sensitive inverted index of `timestamps`.
+
+    Returns
+    -------
+    search_results : {str: {str: [(float, float)]}}
+    """
+    def indexes_in_transcript_to_start_end_second(index_tup,
+                                                  audio_index):
+        """
+        Calculates the word block index by having the beginning and ending
+        index of the matched result from the transcription
+
+        Parameters
+        ----------
+        index_tup : (int, tup)
+            index_tup is of the form tuple(index_start, index_end)
+        audio_index : _AudioIndex
+
+        Retrun
+        ------
+        [float, float]
+            The time of the output of the matched result. Derived from two
+            separate word blocks belonging to the beginning and the end of
+            the index_start and index_end.
+        """
+        transcript, word_offsets = audio_index.get_transcript()
+        index_start, index_end = index_tup
+        # re.finditer returns the ending index by one more
+        index_end -= 1
+        while transcript[index_start] == " ":
+            index_start += 1
+        while transcript[index_end] == " ":
+            index_end -= 1
+        # The word block of an index is the last one starting at or before
+        # that index.
+        block_number_start = bisect_right(word_offsets, index_start) - 1
+        block_number_end = bisect_right(word_offsets, index_end) - 1
+        columns = audio_index.columns
+        return (columns.get_start(block_number_start),
+                columns.get_end(block_number_end))
+
+    def match_window(audio_index):
+        """
+        Returns the beginning and ending index of the part of the
+        transcription that corresponds to `time_range`, or `None` if no
+        word block is within it.
+        """
+        transcript, word_offsets = audio_index.get_transcript()
+        lo, hi = audio_index.columns.get_positions_between(
+            *(time_range or (None, None)))
+        if lo == hi:
+            return None
+        return (word_offsets[lo],
+                (word_offsets[hi] - 1) if hi < len(word_offsets) else
+                len(transcript))
+
+    compiled_pattern = re.compile(pattern)
+    search_results = _PrettyDefaultDict(lambda: _PrettyDefaultDict(list))
+    # Audio files are matched one at a time, so that only the timestamps
+    # of the current one need to be loaded (see `_ShardedTimestamps`).
+    for audio_filename in (list(timestamps.keys())
+                           if audio_basename is None else
+                           [audio_basename]):
+        try:
+            audio_index = inverted_index.get_audio_index(audio_filename)
+        except KeyError:
+            # This is needed for the case where no timestamp is present.
+            continue
+        window = match_window(audio_index)
+        if window is None:
+            continue
+        transcript = audio_index.get_transcript()[0]
+        window_start, window_end = window
+        if (window_start, window_end) != (0, len(transcript)):
+            # The window is sliced (rather than given to `finditer` as
+            # its `pos` and `endpos`), so that `^` matches at its start.
+            transcript = transcript[window_start:window_end]
+        for match in compiled_pattern.finditer(transcript):
+            match_start, match_end = match.span()
+            search_results[match.group()][audio_filename].append(
+                tuple(indexes_in_transcript_to_start_end_second(
+                    (window_start + match_start,
+                     window_start + match_end), audio_index)))
+    return search_results
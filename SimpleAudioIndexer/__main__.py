@@ -10,6 +10,9 @@ def argument_handler():
     search = parser.add_mutually_exclusive_group(required=True)
     parser.add_argument("-d", "--src_dir", type=str,
                         help="Absolute path to location of audio files")
+    parser.add_argument("-w", "--scratch_dir", type=str,
+                        help=("Absolute path to a directory, e.g. /dev/shm," +
+                              " in which the audio files are processed"))
     parser.add_argument("-m", "--mode", help="The speech to text engine",
                         type=str, choices=["ibm", "cmu"], required=True)
     parser.add_argument("-u", "--username_ibm",
@@ -54,15 +57,46 @@ def argument_handler():
 
     return (args.src_dir, args.mode, args.username_ibm, args.password_ibm,
             args.search, args.regexp, args.timestamps, args.audio_name,
-            args.language, args.verbose, args.save_data, args.load_data)
+            args.language, args.verbose, args.save_data, args.load_data,
+            args.scratch_dir)
+
+
+def merge_argument_handler(argv):
+    parser = argparse.ArgumentParser(
+        prog="sai merge",
+        description="Merges indexed data that was saved via --save_data")
+    parser.add_argument("indexed_data", type=str, nargs="+",
+                        help="abs paths to the files of the indexed data")
+    parser.add_argument("-o", "--output", type=str, required=True,
+                        help=("abs path to the file which will contain the" +
+                              " merged indexed data"))
+    parser.add_argument("-c", "--on_conflict", type=str,
+                        choices=["latest", "error"], default="latest",
+                        help=("what to do with an audio that's in more than" +
+                              " one of the indexed data, default is latest" +
+                              " i.e. keeping the last one given"))
+    args = parser.parse_args(argv)
+    assert os.path.realpath(args.output) not in set(
+        os.path.realpath(indexed_data)
+        for indexed_data in args.indexed_data), (
+        "The output must not be one of the merged files")
+    return args.indexed_data, args.output, args.on_conflict
 
 
 def Main():
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
     from SimpleAudioIndexer import SimpleAudioIndexer
 
+    if len(sys.argv) > 1 and sys.argv[1] == "merge":
+        indexed_data, output, on_conflict = merge_argument_handler(
+            sys.argv[2:])
+        SimpleAudioIndexer.merge_indexed_audio(indexed_data, output,
+                                               on_conflict=on_conflict)
+        return
+
     (src_dir, mode, username_ibm, password_ibm, word, pattern, timestamps,
-     audio_name, language, verbose, save_data, load_data) = argument_handler()
+     audio_name, language, verbose, save_data, load_data,
+     scratch_dir) = argument_handler()
 
     def cli_script_wrapped(indexer):
         if not load_data:
@@ -95,7 +129,8 @@ def Main():
     with SimpleAudioIndexer(src_dir=src_dir, mode=mode,
                             username_ibm=username_ibm,
                             password_ibm=password_ibm,
-                            verbose=verbose) as indexer:
+                            verbose=verbose,
+                            scratch_dir=scratch_dir) as indexer:
         if load_data is not None:
             indexer.load_indexed_audio(load_data)
         cli_script_wrapped(indexer)
@@ -0,0 +1,162 @@
+from SimpleAudioIndexer import SimpleAudioIndexer as sai
+from SimpleAudioIndexer import _link_or_copy as LinkOrCopy
+import os
+import subprocess
+import pytest
+
+small_audio = os.path.join(os.path.dirname(__file__), "data", "small",
+                           "small_audio.wav")
+
+
+@pytest.fixture
+def indexer():
+    return sai(mode="cmu", src_dir=os.path.dirname(small_audio))
+
+
+def test_audio_info_of_wav(indexer, monkeypatch):
+    monkeypatch.setattr(subprocess, 'check_output', None)
+    assert indexer._get_audio_channels(small_audio) == 1
+    assert indexer._get_audio_sample_rate(small_audio) == 44100
+    assert indexer._get_audio_sample_bit(small_audio) == 16
+    assert round(indexer._get_audio_duration_seconds(small_audio), 2) == 4.21
+    assert indexer._get_audio_bit_rate(small_audio) == 705600
+    metadata = indexer._get_audio_metadata(small_audio)
+    assert (metadata.data_offset, metadata.block_align,
+            metadata.frame_count) == (68, 2, 185472)
+
+
+@pytest.mark.parametrize(("audio_size"), ["small", "big"])
+def test_audio_info_of_other_formats(indexer, tmpdir, monkeypatch,
+                                     audio_size):
+    with open(os.path.join(os.path.dirname(__file__), "data", audio_size,
+                           "{}_audio_info.txt".format(audio_size))) as f:
+        sox_info = f.read()
+    monkeypatch.setattr(subprocess, 'check_output',
+                        lambda args, universal_newlines: sox_info)
+    audio = tmpdir.join("audio.flac")
+    audio.write("fLaC")
+    metadata = indexer._get_audio_metadata(str(audio))
+    assert metadata.sample_bit == 16
+    assert metadata.data_offset is None
+    if audio_size == "small":
+        assert (metadata.channels, metadata.sample_rate,
+                metadata.duration_seconds, metadata.bit_rate) == (
+            1, 44100, 4.21, 706000)
+    else:
+        assert (metadata.channels, metadata.sample_rate,
+                metadata.duration_seconds, metadata.bit_rate) == (
+            2, 48000, 475.08, 1540000)
+
+
+def test_split_audio_by_duration(indexer, tmpdir, monkeypatch):
+    monkeypatch.setattr(indexer, '_audio_segment_extractor', None)
+    splits = indexer._split_audio_by_duration(
+        small_audio, str(tmpdir.join("small_audio*.wav")), 1.5)
+    assert [(os.path.basename(split), start, round(duration, 4))
+            for split, start, duration in splits] == [
+        ("small_audio000.wav", 0.0, 1.5), ("small_audio001.wav", 1.5, 1.5),
+        ("small_audio002.wav", 3.0, 1.2057)]
+    metadata = indexer._get_audio_metadata(small_audio)
+    frames = b""
+    for split, _, _ in splits:
+        split_metadata = indexer._get_audio_metadata(split)
+        assert split_metadata._replace(
+            duration_seconds=None, frame_count=None, data_offset=None) == (
+                metadata._replace(duration_seconds=None, frame_count=None,
+                                  data_offset=None))
+        with open(split, "rb") as f:
+            f.seek(split_metadata.data_offset)
+            frames += f.read()
+    with open(small_audio, "rb") as f:
+        f.seek(metadata.data_offset)
+        assert frames == f.read()
+
+
+def test_split_audio_by_duration_of_other_formats(indexer, monkeypatch):
+    metadata = indexer._get_audio_metadata(small_audio)._replace(
+        duration_seconds=4.21, data_offset=None, block_align=None,
+        frame_count=None)
+    monkeypatch.setattr(indexer, '_get_audio_metadata',
+                        lambda audio_abs_path: metadata)
+    segments = list()
+    monkeypatch.setattr(
+        indexer, '_audio_segment_extractor',
+        lambda audio_abs_path, segment_abs_path, starting_second, duration:
+        segments.append((segment_abs_path, starting_second,
+                         round(duration, 2))))
+    splits = indexer._split_audio_by_duration("audio.flac", "audio*.flac", 2)
+    assert segments == [("audio000.flac", 0, 2), ("audio001.flac", 2, 2),
+                        ("audio002.flac", 4, 0.21)]
+    assert [split[:2] for split in splits] == [
+        segment[:2] for segment in segments]
+
+
+def test_link_or_copy(tmpdir, monkeypatch):
+    src = tmpdir.join("src.wav")
+    src.write("data")
+    dst = tmpdir.join("dst.wav")
+    dst.write("old")
+    assert LinkOrCopy(str(src), str(dst)) == "link"
+    assert dst.read() == "data"
+
+    def link(src_abs_path, dst_abs_path):
+        raise OSError("Invalid cross-device link")
+
+    monkeypatch.setattr(os, 'link', link)
+    assert LinkOrCopy(str(src), str(dst)) in {"reflink", "copy"}
+    assert dst.read() == "data"
+    dst.write("new")
+    assert src.read() == "data"
+
+
+def test_staging_without_processes(tmpdir, monkeypatch):
+    monkeypatch.setattr(subprocess, 'Popen', None)
+    tmpdir.mkdir("filtered")
+    tmpdir.mkdir("staging")
+    with open(small_audio, "rb") as f:
+        tmpdir.join("small_audio.wav").write_binary(f.read())
+    indexer = sai(mode="ibm", src_dir=str(tmpdir), username_ibm="username",
+                  password_ibm="password")
+    indexer._filtering_step("small_audio.wav")
+    indexer._staging_step("small_audio.wav")
+    assert tmpdir.join("staging").listdir() == [
+        tmpdir.join("staging", "small_audio000.wav")]
+    assert tmpdir.join("staging", "small_audio000.wav").read_binary() == (
+        tmpdir.join("small_audio.wav").read_binary())
+
+
+def test_scratch_dir(tmpdir):
+    src_dir = tmpdir.mkdir("src")
+    scratch_dir = tmpdir.mkdir("scratch")
+    with open(small_audio, "rb") as f:
+        src_dir.join("small_audio.wav").write_binary(f.read())
+    indexer = sai(mode="ibm", src_dir=str(src_dir), username_ibm="username",
+                  password_ibm="password", scratch_dir=str(scratch_dir))
+    other_indexer = sai(mode="ibm", src_dir=str(src_dir),
+                        username_ibm="username", password_ibm="password",
+                        scratch_dir=str(scratch_dir))
+    with indexer, other_indexer:
+        assert os.path.dirname(indexer._work_dir) == str(scratch_dir)
+        assert indexer._work_dir != other_indexer._work_dir
+        indexer._filtering_step("small_audio.wav")
+        indexer._staging_step("small_audio.wav")
+        assert indexer._list_audio_files(sub_dir="staging") == [
+            "small_audio000.wav"]
+        assert other_indexer._list_audio_files(sub_dir="staging") == []
+        assert src_dir.listdir() == [src_dir.join("small_audio.wav")]
+    assert scratch_dir.listdir() == []
+    assert indexer._work_dir == str(src_dir)
+
+
+def test_scratch_dir_too_small(tmpdir, monkeypatch):
+    monkeypatch.setattr('SimpleAudioIndexer._free_bytes', lambda path: 0)
+    src_dir = tmpdir.mkdir("src")
+    with open(small_audio, "rb") as f:
+        src_dir.join("small_audio.wav").write_binary(f.read())
+    indexer = sai(mode="cmu", src_dir=str(src_dir),
+                  scratch_dir=str(tmpdir.mkdir("scratch")))
+    with indexer:
+        assert os.path.dirname(indexer._work_dir) == str(src_dir)
+        assert sorted(os.listdir(indexer._work_dir)) == [
+            "filtered", "staging"]
+    assert src_dir.listdir() == [src_dir.join("small_audio.wav")]
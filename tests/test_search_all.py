@@ -49,3 +49,36 @@ def test_search_all(indexer):
             "test.wav": [(0.4, 0.5)]
         }
     }
+
+
+@pytest.mark.parametrize(("timing_error"), [None, 0.0, 0.05])
+@pytest.mark.parametrize(("case_sensitive"), [False, True])
+@pytest.mark.parametrize(("audio_basename"), [None, "test.wav"])
+def test_search_all_multiple_queries(indexer, audio_basename, case_sensitive,
+                                     timing_error):
+    queries = ["in", "This is", "this", "are called to", "This in",
+               "some garbage This", "absent", "in"]
+    expected_results = dict()
+    for query in queries:
+        for search_result in indexer.search_gen(
+                query, audio_basename=audio_basename,
+                case_sensitive=case_sensitive, timing_error=timing_error):
+            expected_results.setdefault(query, dict()).setdefault(
+                search_result["File Name"], list()).append(
+                    search_result["Result"])
+    assert indexer.search_all(
+        queries, audio_basename=audio_basename, case_sensitive=case_sensitive,
+        timing_error=timing_error) == expected_results
+
+
+@pytest.mark.parametrize(("kwargs"), [
+    {},
+    {"anagram": True, "subsequence": True},
+    {"missing_word_tolerance": 1, "time_range": (0.02, None)},
+])
+@pytest.mark.parametrize(("queries"), [
+    "this", ["this", "is", "are called to", "This some This", "absent"],
+])
+def test_search_all_in_processes(indexer, queries, kwargs):
+    assert indexer.search_all(queries, workers=2, **kwargs) == (
+        indexer.search_all(queries, **kwargs))
@@ -1,4 +1,6 @@
 from SimpleAudioIndexer import SimpleAudioIndexer as sai
+from SimpleAudioIndexer import _PartialSearchValidator as Validator
+from SimpleAudioIndexer import _edit_distance as EditDistance
 from SimpleAudioIndexer import _WordBlock as WordBlock
 import os
 import pytest
@@ -252,3 +254,248 @@ def test_search_gen_mix_1(indexer):
     actual_results = list(indexer.search_gen(**actual_kwargs))
     assert ((expected_results == actual_results) or
             (expected_results in actual_results))
+
+
+@pytest.mark.parametrize(("case_sensitive", "words", "positions"), [
+    (True, ["This"], [0, 4]),
+    (False, ["this"], [0, 4]),
+    (True, ["this"], []),
+    (False, ["this", "in"], [0, 4, 5]),
+    (False, ["this", "absent"], [])
+])
+def test_inverted_index_candidate_positions(indexer, case_sensitive, words,
+                                            positions):
+    audio_index = indexer._get_inverted_index(
+        case_sensitive).get_audio_index("test.wav")
+    assert audio_index.candidate_positions(
+        [audio_index.get_matching_term_ids(word) for word in words]
+    ) == positions
+
+
+@pytest.mark.parametrize(("word", "anagrams"), [
+    ("siht", ["this"]),
+    ("sit", []),
+    ("hits", ["this"]),
+    ("emos", ["some"]),
+    ("absent", []),
+])
+def test_anagram_term_ids(indexer, word, anagrams):
+    audio_index = indexer._get_inverted_index(
+        case_sensitive=False).get_audio_index("test.wav")
+    assert [audio_index.terms[term_id] for term_id in
+            audio_index.get_anagram_term_ids(word)] == anagrams
+
+
+def test_search_gen_absent_word(indexer):
+    assert list(indexer.search_gen("this absent")) == []
+
+
+def test_inverted_index_is_cached(indexer):
+    inverted_index = indexer._get_inverted_index(case_sensitive=False)
+    list(indexer.search_gen("this is", subsequence=True))
+    assert indexer._get_inverted_index(case_sensitive=False) is inverted_index
+    audio_index = inverted_index.get_audio_index("test.wav")
+    assert [audio_index.get_word(i) for i in range(2)] == ["this", "is"]
+    indexer._reset_search_indexes()
+    assert indexer._get_inverted_index(
+        case_sensitive=False) is not inverted_index
+
+
+@pytest.mark.parametrize(("word", "subsequence_of", "supersequence_of"), [
+    ("ths", ["this"], []),
+    ("garbages", [], ["garbage"]),
+    ("thisin", [], ["this", "is", "in"]),
+    ("this", ["this"], ["this", "is"]),
+    ("xyz", [], []),
+])
+def test_subsequence_supersequence_term_ids(indexer, word, subsequence_of,
+                                            supersequence_of):
+    audio_index = indexer._get_inverted_index(
+        case_sensitive=False).get_audio_index("test.wav")
+    assert sorted(audio_index.get_subsequence_term_ids(word)) == [
+        audio_index.term_id_of[term] for term in subsequence_of]
+    assert sorted(audio_index.get_supersequence_term_ids(word)) == [
+        audio_index.term_id_of[term] for term in supersequence_of]
+
+
+@pytest.mark.parametrize(("kwargs"), [
+    {},
+    {"anagram": True},
+    {"subsequence": True, "supersequence": True},
+])
+@pytest.mark.parametrize(("sub", "sup"), [
+    (["are", "called", "to"], ["are", "called", "to"]),
+    (["are", "called", "to"], ["are", "to", "called"]),
+    (["are", "called", "are"], ["are", "called", "era", "are"]),
+    (["this", "is"], ["tihs", "is", "is"]),
+    (["ae", "caled"], ["are", "called"]),
+])
+def test_partial_search_validator_incremental(indexer, sub, sup, kwargs):
+    validator = Validator(sub, **kwargs)
+    for _ in range(2):
+        for i, element in enumerate(sup):
+            validator.push(element)
+            assert validator.is_valid() == indexer._partial_search_validator(
+                sub, sup[:i + 1], **kwargs)
+        validator.reset()
+
+
+@pytest.mark.parametrize(("time_range", "missing_word_tolerance",
+                          "expected_result"), [
+    (None, 0, [(0.01, 0.05), (0.3, 0.4)]),
+    ((0.01, 0.3), 0, [(0.01, 0.05), (0.3, 0.4)]),
+    ((0.02, None), 0, [(0.3, 0.4)]),
+    ((None, 0.29), 1, [(0.01, 0.05)]),
+    ((0.5, 1.0), 0, []),
+])
+def test_search_gen_time_range(indexer, time_range, missing_word_tolerance,
+                               expected_result):
+    assert [result["Result"] for result in indexer.search_gen(
+        "this", audio_basename="test.wav", time_range=time_range,
+        missing_word_tolerance=missing_word_tolerance)] == expected_result
+    assert indexer.search_all(
+        ["this", "in"], audio_basename="test.wav",
+        time_range=time_range)["this"].get("test.wav", []) == expected_result
+
+
+@pytest.mark.parametrize(("start", "end", "expected_words"), [
+    (None, None, ["This", "is", "some", "garbage", "This", "in"]),
+    (0.1, 0.3, ["some", "garbage", "This"]),
+    (0.09, None, ["some", "garbage", "This", "in"]),
+    (None, 0.04, ["This"]),
+    (0.6, None, []),
+])
+def test_words_between(indexer, start, end, expected_words):
+    assert [word_block.word for word_block in indexer.words_between(
+        "test.wav", start, end)] == expected_words
+    assert indexer.words_between("absent.wav", start, end) == []
+
+
+@pytest.mark.parametrize(("query", "max_edit_distance", "expected_result"), [
+    ("Amerikans", 0, []),
+    ("Amerikans", 1, [("small_audio.wav", (0.21, 1.07))]),
+    ("promiss in", 1, [("small_audio.wav", (2.33, 2.93))]),
+    ("tis", 1, [("test.wav", (0.01, 0.05)), ("test.wav", (0.05, 0.08)),
+                ("test.wav", (0.3, 0.4)), ("small_audio.wav", (2.17, 2.33))]),
+    ("garbaj", 1, []),
+    ("garbaj", 2, [("test.wav", (0.21, 0.26))]),
+])
+def test_search_gen_max_edit_distance(indexer, query, max_edit_distance,
+                                      expected_result):
+    assert sorted(
+        (result["File Name"], result["Result"])
+        for result in indexer.search_gen(
+            query, max_edit_distance=max_edit_distance)) == sorted(
+                expected_result)
+
+
+@pytest.mark.parametrize(("word"), ["this", "thus", "in", "garbage", "x", ""])
+@pytest.mark.parametrize(("max_edit_distance"), [1, 2, 3])
+def test_edit_distance_term_ids(indexer, word, max_edit_distance):
+    audio_index = indexer._get_inverted_index(
+        case_sensitive=False).get_audio_index("small_audio.wav")
+    assert audio_index.get_edit_distance_term_ids(word, max_edit_distance) == (
+        set(term_id for term_id, term in enumerate(audio_index.terms)
+            if EditDistance(word, term) <= max_edit_distance))
+
+
+@pytest.mark.parametrize(("query", "phonetic", "expected_result"), [
+    ("leaves", False, []),
+    ("leaves", True, [("small_audio.wav", (3.09, 3.89))]),
+    ("Promiss in our", True, [("small_audio.wav", (2.33, 3.09))]),
+    ("dis", True, []),
+    ("thys", True, [("test.wav", (0.01, 0.05)), ("test.wav", (0.3, 0.4)),
+                    ("small_audio.wav", (2.17, 2.33))]),
+])
+def test_search_gen_phonetic(indexer, query, phonetic, expected_result):
+    assert sorted(
+        (result["File Name"], result["Result"])
+        for result in indexer.search_gen(query, phonetic=phonetic)) == sorted(
+            expected_result)
+
+
+confident_timestamp = {
+    'confident.wav': [WordBlock(word=word, start=start, end=end,
+                                confidence=confidence)
+                      for word, start, end, confidence in [
+                          ['hello', 0.1, 0.2, 0.9],
+                          ['world', 0.2, 0.3, 0.4],
+                          ['hello', 0.5, 0.6, 0.5],
+                          ['world', 0.6, 0.7, 0.95],
+                          ['hello', 1.0, 1.1, None],
+                          ['world', 1.1, 1.2, None]]],
+    'unsure.wav': [WordBlock(word='hello', start=0.1, end=0.2,
+                             confidence=0.2)]}
+
+
+@pytest.mark.parametrize(("query", "min_confidence", "expected_result"), [
+    ("hello", None, [("confident.wav", (0.1, 0.2)),
+                     ("confident.wav", (0.5, 0.6)),
+                     ("confident.wav", (1.0, 1.1)),
+                     ("unsure.wav", (0.1, 0.2))]),
+    ("hello", 0.5, [("confident.wav", (0.1, 0.2)),
+                    ("confident.wav", (0.5, 0.6)),
+                    ("confident.wav", (1.0, 1.1))]),
+    ("hello world", 0.3, [("confident.wav", (0.1, 0.3)),
+                          ("confident.wav", (0.5, 0.7)),
+                          ("confident.wav", (1.0, 1.2))]),
+    ("hello world", 0.96, [("confident.wav", (1.0, 1.2))]),
+])
+def test_search_gen_min_confidence(indexer, monkeypatch, query,
+                                   min_confidence, expected_result):
+    monkeypatch.setattr(indexer, 'get_timestamps',
+                        lambda: confident_timestamp)
+    assert sorted(
+        (result["File Name"], result["Result"])
+        for result in indexer.search_gen(
+            query, min_confidence=min_confidence)) == expected_result
+    assert sorted(
+        (audio_basename, result)
+        for query_results in indexer.search_all(
+            [query, "absent"], min_confidence=min_confidence).values()
+        for audio_basename in query_results
+        for result in query_results[audio_basename]) == expected_result
+
+
+@pytest.mark.parametrize(("query", "top_k", "expected_result"), [
+    ("hello", 2, [("confident.wav", (0.1, 0.2), 0.9),
+                  ("confident.wav", (0.5, 0.6), 0.5)]),
+    ("hello", 10, [("confident.wav", (0.1, 0.2), 0.9),
+                   ("confident.wav", (0.5, 0.6), 0.5),
+                   ("unsure.wav", (0.1, 0.2), 0.2),
+                   ("confident.wav", (1.0, 1.1), None)]),
+    ("hello world", 1, [("confident.wav", (0.5, 0.7), 0.725)]),
+    ("hello", 0, []),
+])
+def test_search_top(indexer, monkeypatch, query, top_k, expected_result):
+    monkeypatch.setattr(indexer, 'get_timestamps',
+                        lambda: confident_timestamp)
+    assert [(result["File Name"], result["Result"], result["Confidence"])
+            for result in indexer.search_top(query, top_k=top_k)] == (
+                expected_result)
+
+
+alternative_timestamp = {
+    'alternatives.wav': [
+        WordBlock(word='hello', start=0.1, end=0.2),
+        WordBlock(word='word', start=0.2, end=0.3,
+                  alternatives=[('world', 0.92), ('whirled', 0.9)]),
+        WordBlock(word='world', start=0.5, end=0.6)]}
+
+
+@pytest.mark.parametrize(("query", "kwargs", "expected_result"), [
+    ("hello world", {}, []),
+    ("hello world", {"alternatives": True}, [(0.1, 0.3)]),
+    ("world", {"alternatives": True}, [(0.2, 0.3), (0.5, 0.6)]),
+    ("world", {"alternatives": True, "min_confidence": 0.95}, [(0.5, 0.6)]),
+    ("hello whirled", {"alternatives": True}, [(0.1, 0.3)]),
+    ("hello world", {"alternatives": True, "missing_word_tolerance": 1},
+     [(0.1, 0.3)]),
+])
+def test_search_gen_alternatives(indexer, monkeypatch, query, kwargs,
+                                 expected_result):
+    monkeypatch.setattr(indexer, 'get_timestamps',
+                        lambda: alternative_timestamp)
+    assert [result["Result"]
+            for result in indexer.search_gen(query, **kwargs)] == (
+                expected_result)
@@ -126,3 +126,63 @@ def test_search_regexp_5(indexer, pattern, audio_basename):
                                      audio_basename)) > len(expected_result)
     assert set(expected_result.keys()).issubset(set(
         indexer.search_regexp(pattern).keys()))
+
+
+@pytest.mark.parametrize(("pattern", "expected_result"), [
+    (r'Americans', {"Americans": {"small_audio.wav": [(0.21, 1.07)]}}),
+    (r'mer', {"mer": {"small_audio.wav": [(0.21, 1.07)]}}),
+    (r'Americans are', {"Americans are": {
+        "small_audio.wav": [(0.21, 1.25)]}}),
+    (r'lives$', {"lives": {"small_audio.wav": [(3.09, 3.89)]}}),
+])
+def test_search_regexp_word_boundaries(indexer, pattern, expected_result):
+    assert indexer.search_regexp(pattern) == expected_result
+
+
+def test_search_regexp_transcript_is_cached(indexer):
+    indexer.search_regexp(r'in')
+    audio_index = indexer._get_inverted_index(
+        case_sensitive=True).get_audio_index("test.wav")
+    transcript, word_offsets = audio_index.get_transcript()
+    assert transcript == "This is some garbage This in"
+    assert list(word_offsets) == [0, 5, 8, 13, 21, 26]
+    indexer.search_regexp(r'is')
+    assert audio_index.get_transcript()[0] is transcript
+
+
+@pytest.mark.parametrize(("pattern", "time_range", "expected_result"), [
+    (r'This', (0.1, None), {"This": {"test.wav": [(0.3, 0.4)]}}),
+    (r'is \w+', (0.04, 0.2), {"is some": {"test.wav": [(0.05, 0.2)]}}),
+    (r'is \w+', (0.04, 0.05), {}),
+    (r'garbage$', (0.21, 0.21), {"garbage": {"test.wav": [(0.21, 0.26)]}}),
+    (r'in', (1.0, 2.0), {}),
+    (r'^is \w+', (0.04, 0.2), {"is some": {"test.wav": [(0.05, 0.2)]}}),
+    (r'^This', None, {"This": {"test.wav": [(0.01, 0.05)]}}),
+    (r'^This', (0.3, None), {"This": {"test.wav": [(0.3, 0.4)]}}),
+    (r'^', (1.0, 2.0), {}),
+    (r'x*', (0.5, 2.0), {}),
+])
+def test_search_regexp_time_range(indexer, pattern, time_range,
+                                  expected_result):
+    assert indexer.search_regexp(pattern, "test.wav",
+                                 time_range=time_range) == expected_result
+
+
+@pytest.mark.parametrize(("pattern", "time_range"), [
+    (r'in', None), (r'[a-z]+ [a-z]+', None), (r'\w+', (0.1, 2.0)),
+])
+def test_search_regexp_in_processes(indexer, pattern, time_range):
+    assert indexer.search_regexp(pattern, time_range=time_range,
+                                 workers=2) == (
+        indexer.search_regexp(pattern, time_range=time_range))
+
+
+@pytest.mark.parametrize(("pattern", "expected_result"), [
+    (r'Th', {"Th": {"test.wav": [(0.01, 0.05), (0.3, 0.4)]}}),
+    (r'^\w+', {"Americans": {"small_audio.wav": [(0.21, 1.07)]},
+               "This": {"test.wav": [(0.01, 0.05)]}}),
+])
+def test_search_regexp_match_within_first_word(indexer, pattern,
+                                               expected_result):
+    # Such matches used to end at the ending second of the audio file.
+    assert indexer.search_regexp(pattern) == expected_result
@@ -1,8 +1,14 @@
 from SimpleAudioIndexer import SimpleAudioIndexer as sai
+from SimpleAudioIndexer import _TimestampColumns as Columns
 from SimpleAudioIndexer import _WordBlock as WordBlock
 import os
+import pickle
+import shutil
+import tempfile
 import pytest
 
+mkdir = os.mkdir
+
 timestamp = {
     'test.wav': [
         [['This', 0.01, 0.05],
@@ -92,3 +98,528 @@ def indexer(monkeypatch):
 def test_get_timestamped_audio(indexer):
     indexer._timestamp_regulator()
     assert indexer.get_timestamps() == expected_result
+
+
+def test_timestamps_are_columnar(indexer):
+    indexer._timestamp_regulator()
+    columns = indexer.get_timestamps()["test.wav"]
+    assert columns.terms == ["This", "is", "some", "garbage", "in", "other",
+                             "test"]
+    assert list(columns.term_ids) == [0, 1, 2, 3, 0, 4, 2, 5, 6]
+    assert list(columns.starts) == [1, 5, 10, 21, 30, 40, 51, 90, 110]
+    assert columns[-1] == WordBlock(word="test", start=1.1, end=1.12)
+    assert repr(columns[:1]) == '[("This", 0.01, 0.05)]'
+
+
+@pytest.fixture
+def indexed_audio_file():
+    # tmpdir can't be used since `os.mkdir` is monkeypatched.
+    file_descriptor, indexed_audio_file = tempfile.mkstemp()
+    os.close(file_descriptor)
+    yield indexed_audio_file
+    os.remove(indexed_audio_file)
+
+
+def test_save_load_indexed_audio(indexer, indexed_audio_file):
+    indexer._timestamp_regulator()
+    indexer.save_indexed_audio(indexed_audio_file)
+    loaded_indexer = sai(mode="cmu", src_dir="src_dir")
+    loaded_indexer.load_indexed_audio(indexed_audio_file)
+    assert loaded_indexer.get_timestamps() == expected_result
+
+
+def test_load_indexed_audio_of_word_block_lists(indexer, indexed_audio_file):
+    with open(indexed_audio_file, "wb") as f:
+        pickle.dump(expected_result, f, pickle.HIGHEST_PROTOCOL)
+    indexer.load_indexed_audio(indexed_audio_file)
+    assert indexer.get_timestamps() == expected_result
+
+
+def test_phonetic_keys_are_saved(indexer, indexed_audio_file, monkeypatch):
+    indexer._timestamp_regulator()
+    indexer.save_indexed_audio(indexed_audio_file)
+    phonetic_keys = indexer.get_timestamps()["test.wav"].phonetic_keys
+    assert phonetic_keys == ["0S", "IS", "SM", "KRBJ", "IN", "O0R", "TST"]
+    monkeypatch.setattr("SimpleAudioIndexer._phonetic_key", None)
+    indexer.load_indexed_audio(indexed_audio_file)
+    assert indexer.get_timestamps()["test.wav"].phonetic_keys == phonetic_keys
+
+
+def test_timestamp_extractor_ibm_confidences(indexer):
+    audio_json = {"results": [{"alternatives": [{
+        "timestamps": [["hello", 0.1, 0.2], ["world", 0.2, 0.35]],
+        "word_confidence": [["hello", 0.912], ["world", 0.5]]}]}, {
+        "alternatives": [{"timestamps": [["again", 1.0, 1.5]]}]}]}
+    word_blocks = indexer._timestamp_extractor_ibm("test000.wav", audio_json)
+    assert [(word_block.word, word_block.confidence)
+            for word_block in word_blocks] == [
+                ("hello", 0.912), ("world", 0.5), ("again", None)]
+
+
+def test_timestamp_extractor_cmu_confidences(indexer):
+    word_blocks = indexer._timestamp_extractor_cmu("test.wav", [
+        ["<s>", "0.000", "0.100", "0.998"],
+        ["hello(2)", "0.100", "0.200", "0.873"],
+        ["world", "0.200", "0.350", "1.000"]])
+    assert [(word_block.word, word_block.confidence)
+            for word_block in word_blocks] == [("hello", 0.873),
+                                               ("world", 1.0)]
+
+
+def test_out_of_range_confidences(indexer, indexed_audio_file):
+    word_blocks = indexer._timestamp_extractor_cmu("test.wav", [
+        ["hello", "0.100", "0.200", "7.25"],
+        ["world", "0.200", "0.350", "-0.5"],
+        ["again", "0.350", "0.400", "6.5535"]])
+    assert [word_block.confidence for word_block in word_blocks] == [
+        1.0, 0.0, 1.0]
+    columns = Columns(word_blocks[:2] + [
+        WordBlock(word="more", start=0.4, end=0.5, confidence=6.5535),
+        WordBlock(word="nan", start=0.5, end=0.6, confidence=float("nan"),
+                  alternatives=(("man", 1.5),))])
+    assert [word_block.confidence for word_block in columns] == [
+        1.0, 0.0, 1.0, None]
+    assert columns[-1].alternatives == (("man", 1.0),)
+    indexer.get_timestamps()["test.wav"] = columns
+    indexer.save_indexed_audio(indexed_audio_file)
+    indexer.load_indexed_audio(indexed_audio_file)
+    assert list(indexer.get_timestamps()["test.wav"]) == list(columns)
+    assert [search_result["Result"] for search_result in indexer.search_gen(
+        "nan", min_confidence=1.5)] == [(0.5, 0.6)]
+    assert list(indexer.search_gen("more", min_confidence=1.5)) == []
+    assert [search_result["Result"] for search_result in indexer.search_gen(
+        "world", min_confidence=-1)] == [(0.2, 0.35)]
+
+
+def test_timestamp_extractor_ibm_misaligned_word_alternatives(indexer):
+    audio_json = {"results": [{
+        "alternatives": [{
+            "timestamps": [["hello", 0.1, 0.2], ["word", 0.2, 0.35],
+                           ["wide", 0.35, 0.5], ["web", 1.0, 1.2]]}],
+        "word_alternatives": [
+            {"start_time": 0.19, "end_time": 0.36, "alternatives": [
+                {"word": "word", "confidence": 0.93},
+                {"word": "world", "confidence": 0.91}]},
+            {"start_time": 0.2, "end_time": 0.5, "alternatives": [
+                {"word": "worldwide", "confidence": 0.9},
+                {"word": "world", "confidence": 0.9}]},
+            {"start_time": 0.9, "end_time": 0.95, "alternatives": [
+                {"word": "webb", "confidence": 0.9}]}]}]}
+    word_blocks = indexer._timestamp_extractor_ibm("test000.wav", audio_json)
+    assert [word_block.alternatives for word_block in word_blocks] == [
+        (),
+        (("world", 0.91), ("worldwide", 0.9)),
+        (("worldwide", 0.9), ("world", 0.9)),
+        (("webb", 0.9),)]
+
+
+def test_confidences_are_saved(indexer, indexed_audio_file):
+    columns = Columns([WordBlock(word="hello", start=0.1, end=0.2,
+                                 confidence=0.75),
+                       WordBlock(word="world", start=0.2, end=0.3)])
+    with open(indexed_audio_file, "wb") as f:
+        pickle.dump({"test.wav": columns}, f, pickle.HIGHEST_PROTOCOL)
+    indexer.load_indexed_audio(indexed_audio_file)
+    assert [word_block.confidence for word_block in
+            indexer.get_timestamps()["test.wav"]] == [0.75, None]
+
+
+def test_timestamp_extractor_ibm_word_alternatives(indexer,
+                                                   indexed_audio_file):
+    audio_json = {"results": [{
+        "alternatives": [{
+            "timestamps": [["hello", 0.1, 0.2], ["word", 0.2, 0.35]]}],
+        "word_alternatives": [
+            {"start_time": 0.2, "end_time": 0.35, "alternatives": [
+                {"word": "word", "confidence": 0.93},
+                {"word": "world", "confidence": 0.91}]}]}]}
+    word_blocks = indexer._timestamp_extractor_ibm("test000.wav", audio_json)
+    assert [word_block.alternatives for word_block in word_blocks] == [
+        (), (("world", 0.91),)]
+    with open(indexed_audio_file, "wb") as f:
+        pickle.dump({"test.wav": Columns(word_blocks)}, f,
+                    pickle.HIGHEST_PROTOCOL)
+    indexer.load_indexed_audio(indexed_audio_file)
+    assert [word_block.alternatives for word_block in
+            indexer.get_timestamps()["test.wav"]] == [(), (("world", 0.91),)]
+
+
+def test_indexed_audio_is_binary(indexer, indexed_audio_file):
+    indexer._timestamp_regulator()
+    indexer.save_indexed_audio(indexed_audio_file)
+    with open(indexed_audio_file, "rb") as f:
+        assert f.read(4) == b"SAIX"
+    indexer.load_indexed_audio(indexed_audio_file)
+    columns = indexer.get_timestamps()["test.wav"]
+    assert columns.terms == ["This", "is", "some", "garbage", "in", "other",
+                             "test"]
+    assert list(columns.starts) == [1, 5, 10, 21, 30, 40, 51, 90, 110]
+    assert indexer.search_all(["this", "some"]) == {
+        "this": {"test.wav": [(0.01, 0.05), (0.3, 0.4)]},
+        "some": {"test.wav": [(0.1, 0.2), (0.51, 0.54)]}}
+    assert list(indexer.search_regexp("other")) == ["other"]
+    columns.append(WordBlock(word="more", start=1.2, end=1.3))
+    assert columns[-1] == WordBlock(word="more", start=1.2, end=1.3)
+
+
+def test_save_loaded_indexed_audio_to_its_path(indexer, indexed_audio_file):
+    indexer._timestamp_regulator()
+    indexer.save_indexed_audio(indexed_audio_file)
+    indexer.load_indexed_audio(indexed_audio_file)
+    indexer.search_all(["this", "some"])
+    indexer.get_timestamps()["new.wav"] = Columns([
+        WordBlock(word="new", start=0.1, end=0.2)])
+    indexer.save_indexed_audio(indexed_audio_file)
+    loaded_indexer = sai(mode="cmu", src_dir="src_dir")
+    loaded_indexer.load_indexed_audio(indexed_audio_file)
+    assert loaded_indexer.get_timestamps() == dict(
+        expected_result, **{"new.wav": [WordBlock(word="new", start=0.1,
+                                                  end=0.2)]})
+
+
+def test_indexed_audio_of_unsupported_version(indexer, indexed_audio_file):
+    indexer._timestamp_regulator()
+    indexer.save_indexed_audio(indexed_audio_file)
+    with open(indexed_audio_file, "r+b") as f:
+        f.seek(4)
+        f.write(b"\xff\xff")
+    with pytest.raises(ValueError):
+        indexer.load_indexed_audio(indexed_audio_file)
+
+
+def test_convert_indexed_audio(indexer, indexed_audio_file):
+    with open(indexed_audio_file, "wb") as f:
+        pickle.dump(expected_result, f, pickle.HIGHEST_PROTOCOL)
+    indexer.convert_indexed_audio(indexed_audio_file, indexed_audio_file)
+    with open(indexed_audio_file, "rb") as f:
+        assert f.read(4) == b"SAIX"
+    indexer.load_indexed_audio(indexed_audio_file)
+    assert indexer.get_timestamps() == expected_result
+
+
+@pytest.fixture
+def indexed_audio_dir(indexer, monkeypatch):
+    # Sharded indexes are directories, so `os.mkdir` is restored.
+    monkeypatch.setattr(os, 'mkdir', mkdir)
+    indexed_audio_dir = tempfile.mkdtemp()
+    yield indexed_audio_dir
+    shutil.rmtree(indexed_audio_dir)
+
+
+def test_save_load_sharded_indexed_audio(indexer, indexed_audio_dir):
+    indexer._timestamp_regulator()
+    indexer.save_indexed_audio(indexed_audio_dir, files_per_shard=2)
+    assert sorted(os.listdir(indexed_audio_dir)) == [
+        "00000.shard", "00001.shard", "manifest.json"]
+    loaded_indexer = sai(mode="cmu", src_dir="src_dir")
+    loaded_indexer.load_indexed_audio(indexed_audio_dir)
+    timestamps = loaded_indexer.get_timestamps()
+    assert not any(timestamps.is_loaded(audio_basename)
+                   for audio_basename in expected_result)
+    assert sorted(timestamps) == sorted(expected_result)
+    assert list(loaded_indexer.search_gen("another",
+                                          audio_basename="another.wav")) == [
+        {"Query": "another", "File Name": "another.wav",
+         "Result": (0.2, 0.5)},
+        {"Query": "another", "File Name": "another.wav",
+         "Result": (0.71, 1.01)}]
+    assert [audio_basename for audio_basename in expected_result
+            if timestamps.is_loaded(audio_basename)] == (
+        [audio_basename for audio_basename in timestamps.shard_of
+         if timestamps.shard_of[audio_basename] ==
+         timestamps.shard_of["another.wav"]])
+    assert dict(timestamps) == expected_result
+    assert loaded_indexer.search_regexp("other") == indexer.search_regexp(
+        "other")
+
+
+def test_sharded_indexed_audio_cache_is_bounded(indexer, indexed_audio_dir):
+    indexer._timestamp_regulator()
+    indexer.save_indexed_audio(indexed_audio_dir, files_per_shard=1)
+    indexer.load_indexed_audio(indexed_audio_dir, max_cached_bytes=0)
+    timestamps = indexer.get_timestamps()
+    for audio_basename in expected_result:
+        assert timestamps[audio_basename] == expected_result[audio_basename]
+        assert [loaded_basename for loaded_basename in expected_result
+                if timestamps.is_loaded(loaded_basename)] == [audio_basename]
+    del timestamps["test.wav"]
+    timestamps["new.wav"] = Columns([WordBlock(word="new", start=0.1,
+                                               end=0.2)])
+    assert sorted(timestamps) == ["another.wav", "new.wav", "other.wav"]
+    assert indexer.search_all(["new", "test"]) == {"new": {
+        "new.wav": [(0.1, 0.2)]}}
+
+
+def test_save_loaded_sharded_indexed_audio_to_its_dir(
+        indexer, indexed_audio_dir):
+    indexer._timestamp_regulator()
+    indexer.save_indexed_audio(indexed_audio_dir, files_per_shard=1)
+    indexer.load_indexed_audio(indexed_audio_dir)
+    indexer.search_all(["this", "another"])
+    indexer.get_timestamps()["new.wav"] = Columns([
+        WordBlock(word="new", start=0.1, end=0.2)])
+    indexer.save_indexed_audio(indexed_audio_dir, files_per_shard=5)
+    assert sorted(os.listdir(indexed_audio_dir)) == [
+        "00000.shard", "manifest.json"]
+    expected_timestamps = dict(expected_result, **{"new.wav": [
+        WordBlock(word="new", start=0.1, end=0.2)]})
+    assert dict(indexer.get_timestamps()) == expected_timestamps
+    indexer.save_indexed_audio(indexed_audio_dir, files_per_shard=2)
+    loaded_indexer = sai(mode="cmu", src_dir="src_dir")
+    loaded_indexer.load_indexed_audio(indexed_audio_dir)
+    assert dict(loaded_indexer.get_timestamps()) == expected_timestamps
+
+
+def test_journal(indexer, indexed_audio_file):
+    indexer.open_journal(indexed_audio_file)
+    indexer._timestamp_regulator()
+    journaled_indexer = sai(mode="cmu", src_dir="src_dir")
+    journaled_indexer.open_journal(indexed_audio_file)
+    assert journaled_indexer.get_timestamps() == expected_result
+    size = os.path.getsize(indexed_audio_file)
+    indexer.get_timestamps()["test.wav"].append(
+        WordBlock(word="more", start=1.2, end=1.3))
+    indexer.compact_journal()
+    assert os.path.getsize(indexed_audio_file) < size
+    journaled_indexer.open_journal(indexed_audio_file)
+    assert journaled_indexer.get_timestamps()["test.wav"][-1] == WordBlock(
+        word="more", start=1.2, end=1.3)
+
+
+def test_journal_is_closed_upon_loading(indexer, indexed_audio_file,
+                                        indexed_audio_dir):
+    indexer.open_journal(indexed_audio_file, compaction_segments=0)
+    indexer._timestamp_regulator()
+    loaded_file = os.path.join(indexed_audio_dir, "loaded")
+    sai(mode="cmu", src_dir="src_dir").save_indexed_audio(loaded_file)
+    size = os.path.getsize(indexed_audio_file)
+    indexer.load_indexed_audio(loaded_file)
+    with pytest.raises(AssertionError):
+        indexer.compact_journal()
+    indexer._timestamp_regulator()
+    assert os.path.getsize(indexed_audio_file) == size
+    journaled_indexer = sai(mode="cmu", src_dir="src_dir")
+    journaled_indexer.open_journal(indexed_audio_file)
+    assert journaled_indexer.get_timestamps() == expected_result
+
+
+def test_journal_is_compacted(indexer, indexed_audio_file):
+    indexer.open_journal(indexed_audio_file, compaction_segments=2)
+    indexer._timestamp_regulator()
+    journaled_indexer = sai(mode="cmu", src_dir="src_dir")
+    journaled_indexer.open_journal(indexed_audio_file,
+                                   compaction_segments=None)
+    assert journaled_indexer.get_timestamps() == expected_result
+    assert journaled_indexer._SimpleAudioIndexer__journal.segment_count == 1
+
+
+def test_journal_recovers_from_partial_segment(indexer, indexed_audio_file):
+    indexer.open_journal(indexed_audio_file)
+    indexer._timestamp_regulator()
+    size = os.path.getsize(indexed_audio_file)
+    with open(indexed_audio_file, "ab") as f:
+        f.write(b"SAIJ\0\0\0\0\xff")
+    journaled_indexer = sai(mode="cmu", src_dir="src_dir")
+    journaled_indexer.open_journal(indexed_audio_file)
+    assert journaled_indexer.get_timestamps() == expected_result
+    assert os.path.getsize(indexed_audio_file) == size
+    with open(indexed_audio_file, "r+b") as f:
+        f.truncate(size - 8)
+    journaled_indexer.open_journal(indexed_audio_file)
+    assert len(journaled_indexer.get_timestamps()) == 2
+
+
+@pytest.mark.parametrize(("compression"), ["varint", "zlib"])
+def test_save_load_packed_indexed_audio(indexer, indexed_audio_file,
+                                        compression):
+    indexer._timestamp_regulator()
+    indexer.get_timestamps()["test.wav"].append(
+        WordBlock(word="more", start=1.2, end=1.1, confidence=0.5,
+                  alternatives=(("mode", 0.25),)))
+    indexer.save_indexed_audio(indexed_audio_file, compression=compression)
+    with open(indexed_audio_file, "rb") as f:
+        assert f.read(4) == b"SAIP"
+    loaded_indexer = sai(mode="cmu", src_dir="src_dir")
+    loaded_indexer.load_indexed_audio(indexed_audio_file)
+    timestamps = loaded_indexer.get_timestamps()
+    assert timestamps == indexer.get_timestamps()
+    assert timestamps["test.wav"].terms == indexer.get_timestamps()[
+        "test.wav"].terms
+    assert [(word_block.confidence, word_block.alternatives)
+            for word_block in timestamps["test.wav"]][-2:] == [
+        (None, ()), (0.5, (("mode", 0.25),))]
+
+
+def test_packed_indexed_audio_is_smaller(indexer, indexed_audio_file):
+    indexer._timestamp_regulator()
+    indexer.save_indexed_audio(indexed_audio_file)
+    size = os.path.getsize(indexed_audio_file)
+    indexer.save_indexed_audio(indexed_audio_file, compression="varint")
+    assert os.path.getsize(indexed_audio_file) * 3 < size
+    with pytest.raises(ValueError):
+        indexer.save_indexed_audio(indexed_audio_file, compression="gzip")
+
+
+def test_save_load_sqlite_indexed_audio(indexer, indexed_audio_file):
+    indexer._timestamp_regulator()
+    indexer.get_timestamps()["test.wav"].append(
+        WordBlock(word="More", start=1.2, end=1.3, confidence=0.5,
+                  alternatives=(("mode", 0.25),)))
+    indexer.save_indexed_audio(indexed_audio_file, sqlite=True)
+    loaded_indexer = sai(mode="cmu", src_dir="src_dir")
+    loaded_indexer.load_indexed_audio(indexed_audio_file)
+    timestamps = loaded_indexer.get_timestamps()
+    assert not any(timestamps.is_loaded(audio_basename)
+                   for audio_basename in timestamps)
+    queries = ["more", "More", "this in", "other", "some other", "absent"]
+    for case_sensitive in (False, True):
+        assert loaded_indexer.search_all(
+            queries, case_sensitive=case_sensitive) == indexer.search_all(
+                queries, case_sensitive=case_sensitive)
+    if timestamps.has_fts:
+        assert sorted(audio_basename for audio_basename in timestamps
+                      if timestamps.is_loaded(audio_basename)) == [
+            "other.wav", "test.wav"]
+    assert dict(timestamps) == indexer.get_timestamps()
+    assert [(word_block.confidence, word_block.alternatives)
+            for word_block in timestamps["test.wav"]][-2:] == [
+        (None, ()), (0.5, (("mode", 0.25),))]
+
+
+def test_sqlite_indexed_audio_single_query_reads_matching_files(
+        indexer, indexed_audio_file, monkeypatch):
+    indexer._timestamp_regulator()
+    indexer.save_indexed_audio(indexed_audio_file, sqlite=True)
+    loaded_indexer = sai(mode="cmu", src_dir="src_dir")
+    loaded_indexer.load_indexed_audio(indexed_audio_file, max_cached_bytes=0)
+    timestamps = loaded_indexer.get_timestamps()
+    if not timestamps.has_fts:
+        pytest.skip("SQLite was built without FTS5")
+    read_file_ids = list()
+    read_columns = type(timestamps)._read_columns
+    monkeypatch.setattr(
+        type(timestamps), "_read_columns", lambda self, file_id: (
+            read_file_ids.append(file_id) or read_columns(self, file_id)))
+    for query in ("another", "THIS is", "some other", "absent"):
+        del read_file_ids[:]
+        assert loaded_indexer.search_all(query) == indexer.search_all(query)
+        assert list(loaded_indexer.search_gen(query)) == list(
+            indexer.search_gen(query))
+        # The most recently read audio file may be cached instead.
+        assert set(read_file_ids) <= set(
+            timestamps.file_ids[audio_basename]
+            for audio_basename in timestamps.match([query.lower().split()]))
+    assert read_file_ids == []
+
+
+def test_sqlite_indexed_audio_is_prefiltered_in_processes(
+        indexer, indexed_audio_file, monkeypatch):
+    indexer._timestamp_regulator()
+    indexer.save_indexed_audio(indexed_audio_file, sqlite=True)
+    loaded_indexer = sai(mode="cmu", src_dir="src_dir")
+    loaded_indexer.load_indexed_audio(indexed_audio_file, max_cached_bytes=0)
+    timestamps = loaded_indexer.get_timestamps()
+    if not timestamps.has_fts:
+        pytest.skip("SQLite was built without FTS5")
+    read_file_ids = list()
+    read_columns = type(timestamps)._read_columns
+    monkeypatch.setattr(
+        type(timestamps), "_read_columns", lambda self, file_id: (
+            read_file_ids.append(file_id) or read_columns(self, file_id)))
+    queries = ["another", "some other", "absent"]
+    assert loaded_indexer.search_all(queries, workers=2) == (
+        indexer.search_all(queries))
+    assert sorted(read_file_ids) == sorted(
+        timestamps.file_ids[audio_basename]
+        for audio_basename in ("another.wav", "test.wav"))
+    del read_file_ids[:]
+    assert loaded_indexer.search_all(queries, workers=2, anagram=True) == (
+        indexer.search_all(queries, anagram=True))
+    assert len(read_file_ids) == 3
+
+
+def test_sqlite_indexed_audio_is_written_through(indexer,
+                                                 indexed_audio_file):
+    indexer._timestamp_regulator()
+    indexer.save_indexed_audio(indexed_audio_file, sqlite=True)
+    indexer.load_indexed_audio(indexed_audio_file, max_cached_bytes=0)
+    timestamps = indexer.get_timestamps()
+    del timestamps["test.wav"]
+    timestamps["new.wav"] = [WordBlock(word="new", start=0.1, end=0.2)]
+    for audio_basename in timestamps:
+        timestamps[audio_basename]
+        assert [loaded_basename for loaded_basename in timestamps
+                if timestamps.is_loaded(loaded_basename)] == [audio_basename]
+    reloaded_indexer = sai(mode="cmu", src_dir="src_dir")
+    reloaded_indexer.load_indexed_audio(indexed_audio_file)
+    assert sorted(reloaded_indexer.get_timestamps()) == [
+        "another.wav", "new.wav", "other.wav"]
+    assert reloaded_indexer.search_all(["new", "test"]) == {"new": {
+        "new.wav": [(0.1, 0.2)]}}
+
+
+def test_merge_indexed_audio(indexer, indexed_audio_file, indexed_audio_dir):
+    indexer._timestamp_regulator()
+    timestamps = indexer.get_timestamps()
+    first_file = os.path.join(indexed_audio_dir, "first")
+    second_file = os.path.join(indexed_audio_dir, "second")
+    with open(first_file, "wb") as f:
+        pickle.dump({"test.wav": list(timestamps["test.wav"]),
+                     "other.wav": [WordBlock(word="old", start=0.1,
+                                             end=0.2)]},
+                    f, pickle.HIGHEST_PROTOCOL)
+    del timestamps["test.wav"]
+    indexer.save_indexed_audio(second_file, sqlite=True)
+    sai.merge_indexed_audio([first_file, second_file], indexed_audio_file)
+    indexer.load_indexed_audio(indexed_audio_file)
+    assert list(indexer.get_timestamps()) == ["another.wav", "other.wav",
+                                              "test.wav"]
+    assert indexer.get_timestamps() == expected_result
+    with pytest.raises(ValueError):
+        sai.merge_indexed_audio([first_file, second_file],
+                                indexed_audio_file, on_conflict="error")
+
+
+def test_merge_indexed_audio_into_a_merged_one(indexer, indexed_audio_dir,
+                                               monkeypatch):
+    indexer._timestamp_regulator()
+    first_file = os.path.join(indexed_audio_dir, "first")
+    second_file = os.path.join(indexed_audio_dir, "second")
+    indexer.save_indexed_audio(first_file)
+    indexer.save_indexed_audio(second_file, sqlite=True)
+    size = os.path.getsize(first_file)
+    with pytest.raises(ValueError):
+        sai.merge_indexed_audio(
+            [first_file, second_file],
+            os.path.join(indexed_audio_dir, ".", "first"))
+    assert os.path.getsize(first_file) == size
+    closed_sources = list()
+    monkeypatch.setattr("SimpleAudioIndexer._SqliteTimestamps.close",
+                        lambda self: closed_sources.append(
+                            self.connection.close()))
+    sai.merge_indexed_audio([first_file, second_file],
+                            os.path.join(indexed_audio_dir, "merged"))
+    assert closed_sources == [None]
+
+
+def test_timestamp_regulator_of_split_manifest(indexer, monkeypatch):
+    monkeypatch.setitem(indexer.__dict__,
+                        "_SimpleAudioIndexer__split_manifest", {
+                            "test.wav": [("test000.wav", 0, 0.5),
+                                         ("test001.wav", 0.5, 0.62)],
+                            "another.wav": [("another000.wav", 0, 0.51),
+                                            ("another001.wav", 0.51, 0.5)]})
+    monkeypatch.setattr(indexer, '_list_audio_files', None)
+    monkeypatch.setattr(indexer, '_get_audio_duration_seconds', None)
+    indexer._timestamp_regulator()
+    assert indexer.get_timestamps() == expected_result
+
+
+def test_timestamp_regulator_offsets_are_cumulative(indexer, monkeypatch):
+    monkeypatch.setitem(indexer.__dict__,
+                        "_SimpleAudioIndexer__timestamps_unregulated",
+                        {"another.wav": timestamp["another.wav"] +
+                         timestamp["another.wav"][:1]})
+    indexer._timestamp_regulator()
+    assert [word_block.start for word_block in
+            indexer.get_timestamps()["another.wav"]] == [0.2, 0.71, 1.21]